@@ -0,0 +1,423 @@
+"""
+两个模拟器的回归基准测试：
+    python benchmarks/run_benchmarks.py                  # 运行并与 benchmarks/baseline.json 比较
+    python benchmarks/run_benchmarks.py --save           # 运行并把结果保存为新的基线
+    python benchmarks/run_benchmarks.py --only partition --threshold 0.3
+任一指标比基线差超过 threshold 时以退出码 1 结束；基线不存在时以退出码 2 结束，需先用 --save 生成。
+基线与机器有关，不随仓库提交，应在同一台机器上生成和比较。
+--only 只运行一部分指标，--save 时只更新已有基线中的这部分，不能用来生成新的基线。
+
+指标单位为 ops/s(越大越好)或 ms(越小越好)。每项重复 repeat 次取最好的一次。
+界面重绘用不做任何绘制的 StubWidget 代替 Tk 控件，不需要显示器；未安装 tkinter 时跳过。
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+if not __package__:
+    # 从仓库根目录导入两个模拟器包
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dynamicparition.memory_manager import MemoryManager
+from dynamicparition.slab import SlabCache
+from dynamicpaging.simulation.paging_simulation import PagingSimulation, POLICIES, PAGE_TABLE_COMPACT
+from dynamicpaging.simulation.timeline import Timeline
+from dynamicpaging.simulation.trace_generator import zipf_trace
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+DEFAULT_THRESHOLD = 0.25  # 比基线差 25% 以上视为退化
+DEFAULT_REPEAT = 5
+UNIT_RATE = "ops/s"
+UNIT_MS = "ms"
+
+ALGORITHMS = ("first_fit", "best_fit", "worst_fit")
+FRAGMENT_COUNTS = (16, 256, 2048)  # 分区：空闲碎片数
+PARTITION_OPS = 1000  # 分区：每项的分配/释放次数
+UNDO_HISTORY = 2000  # 分区：撤销/重做时的历史长度
+SLAB_CLASSES = (8, 16, 32)  # 分区：反复出现的申请大小，也是 slab 层的大小类
+SLAB_ARENA = 65536  # 分区：碎片之后留出的大块空闲区，放得下全部申请
+PAGING_FRAMES = (4, 16, 64)
+PAGING_PAGES = 256
+PAGING_LENGTH = 200000
+GUI_PAGES = 64
+GUI_FRAMES = 32
+GUI_REDRAWS = 50  # 全量重绘的次数，取平均
+GUI_BATCH = 5000  # 高速播放时一拍执行的访问数
+GUI_BATCHES = 10
+
+
+class StubWidget:
+    """代替 Tk 控件：任何方法调用都只计数，创建图元时返回递增的编号，不做任何绘制。"""
+
+    def __init__(self, width=800):
+        self.width = width
+        self.calls = 0
+
+    def winfo_width(self):
+        return self.width
+
+    def get_children(self):
+        return ()
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self._call
+
+    def _call(self, *args, **kwargs):
+        self.calls += 1
+        return self.calls
+
+
+# ---------- 动态分区 ----------
+def fragmented_manager(fragments):
+    """
+    构造有 fragments 个大小为 2 的空闲碎片、与已分配块交替排列的 MemoryManager，
+    历史只保留当前状态。
+    """
+    manager = MemoryManager(fragments * 4)
+    # 直接构造状态：逐次分配会让历史快照的开销随碎片数平方增长
+    manager.free_blocks = [{"start": 4 * i, "size": 2} for i in range(fragments)]
+    manager.allocated_blocks = {i + 1: {"start": 4 * i + 2, "size": 2} for i in range(fragments)}
+    manager.next_process_id = fragments + 1
+    manager.history = []
+    manager.current_history_index = -1
+    manager.save_state()
+    return manager
+
+
+def bench_partition_alloc_free():
+    """各算法在不同碎片数下的分配、释放(含快照与合并)和单独合并的吞吐量。"""
+    metrics = {}
+    perf = time.perf_counter
+    for fragments in FRAGMENT_COUNTS:
+        for algorithm in ALGORITHMS:
+            manager = fragmented_manager(fragments)
+            alloc_time = free_time = merge_time = 0.0
+            for i in range(PARTITION_OPS):
+                start = perf()
+                pid = manager.allocate(1, algorithm)
+                alloc_time += perf() - start
+                if i % 2:
+                    start = perf()
+                    manager.deallocate(pid)
+                    free_time += perf() - start
+                else:
+                    # 不经过 deallocate 的快照，只测合并本身
+                    block = manager.allocated_blocks.pop(pid)
+                    manager.free_blocks.append(dict(block))
+                    start = perf()
+                    manager._merge_blocks()
+                    merge_time += perf() - start
+            half = PARTITION_OPS // 2
+            metrics[f"partition.{algorithm}.alloc.f{fragments}"] = (PARTITION_OPS / alloc_time, UNIT_RATE)
+            metrics[f"partition.{algorithm}.free.f{fragments}"] = (half / free_time, UNIT_RATE)
+            metrics[f"partition.{algorithm}.merge.f{fragments}"] = (half / merge_time, UNIT_RATE)
+    return metrics
+
+
+def bench_partition_slab():
+    """
+    申请大小只有 SLAB_CLASSES 几种时，最佳适应直接分区分配与经 slab 层分配的吞吐量。
+    用 replay 回放，只保存一次快照，测的是分配/释放本身。
+    """
+    metrics = {}
+    for fragments in FRAGMENT_COUNTS:
+        rng = random.Random(fragments)
+        ops = []
+        live = []
+        next_pid = fragments + 1
+        for _ in range(PARTITION_OPS):
+            if live and rng.random() < 0.5:
+                ops.append(("deallocate", live.pop(rng.randrange(len(live)))))
+            else:
+                ops.append(("allocate", rng.choice(SLAB_CLASSES), "best_fit"))
+                live.append(next_pid)
+                next_pid += 1
+        for name, slab in (("partition", None), ("slab", SlabCache(SLAB_CLASSES))):
+            manager = fragmented_manager(fragments)
+            manager.total_memory += SLAB_ARENA
+            manager.free_blocks.append({"start": fragments * 4, "size": SLAB_ARENA})
+            manager.slab = slab
+            start = time.perf_counter()
+            manager.replay(ops)
+            elapsed = time.perf_counter() - start
+            metrics[f"partition.{name}.recurring.f{fragments}"] = (len(ops) / elapsed, UNIT_RATE)
+    return metrics
+
+
+def bench_partition_undo_redo():
+    manager = fragmented_manager(256)
+    for _ in range(UNDO_HISTORY // 2):
+        manager.deallocate(manager.allocate(1, "first_fit"))
+    start = time.perf_counter()
+    undone = 0
+    while manager.undo():
+        undone += 1
+    middle = time.perf_counter()
+    redone = 0
+    while manager.redo():
+        redone += 1
+    end = time.perf_counter()
+    return {
+        "partition.undo": (undone / (middle - start), UNIT_RATE),
+        "partition.redo": (redone / (end - middle), UNIT_RATE),
+    }
+
+
+def bench_partition_gui():
+    from dynamicparition.memory_simulation import MemorySimulator
+
+    metrics = {}
+    for fragments in (16, 256):
+        gui = MemorySimulator.__new__(MemorySimulator)
+        gui.memory = fragmented_manager(fragments)
+        gui.canvas = StubWidget()
+        gui.free_table = StubWidget()
+        gui.alloc_table = StubWidget()
+        gui.usage_label = StubWidget()
+        gui.frag_label = StubWidget()
+        gui.slab_label = StubWidget()
+        start = time.perf_counter()
+        for _ in range(GUI_REDRAWS):
+            gui.update_display()
+        metrics[f"partition.gui.update_display.f{fragments}"] = (
+            (time.perf_counter() - start) * 1e3 / GUI_REDRAWS, UNIT_MS)
+    return metrics
+
+
+# ---------- 请求分页 ----------
+def bench_paging_run_trace():
+    """run_trace 在各置换算法和块数下的吞吐量(访问次数/秒)。"""
+    pages = zipf_trace(PAGING_LENGTH, PAGING_PAGES, seed=1)
+    metrics = {}
+    for policy in POLICIES:
+        for frames in PAGING_FRAMES:
+            sim = PagingSimulation(PAGING_PAGES, list(range(frames)), policy)
+            start = time.perf_counter()
+            sim.run_trace(None, pages, None)
+            metrics[f"paging.{policy}.run_trace.frames{frames}"] = (
+                PAGING_LENGTH / (time.perf_counter() - start), UNIT_RATE)
+    return metrics
+
+
+def bench_paging_execute():
+    """逐次 execute(写日志)的吞吐量，即界面单步执行时引擎部分的开销。"""
+    length = 20000
+    pages = zipf_trace(length, PAGING_PAGES, seed=2)
+    sim = PagingSimulation(PAGING_PAGES, list(range(16)))
+    start = time.perf_counter()
+    for page_no in pages:
+        sim.execute("load", page_no, 0)
+    return {"paging.FIFO.execute.frames16": (length / (time.perf_counter() - start), UNIT_RATE)}
+
+
+def stub_paging_gui(num_pages, num_frames):
+    """在 StubWidget 上构造 PagingAnimationGUI，只包含重绘用到的状态。"""
+    from dynamicpaging.gui.paging_animation_gui import PagingAnimationGUI
+
+    gui = PagingAnimationGUI.__new__(PagingAnimationGUI)
+    gui.root = StubWidget()
+    gui.sim = PagingSimulation(num_pages, list(range(num_frames)), page_table_type=PAGE_TABLE_COMPACT)
+    gui.canvas = StubWidget()
+    gui.log_text = StubWidget()
+    gui.page_table_labels = [[StubWidget() for _ in range(4)] for _ in range(num_pages)]
+    gui.timeline = Timeline(gui.sim)
+    gui.playing = False
+    gui.play_job = None
+    gui.log_seq_shown = 0
+    gui.log_line_count = 0
+    gui.frame_items = {}
+    gui.page_items = {}
+    gui.frame_owner = {}
+    gui.page_frame_shown = {}
+    gui.draw_static_scene()
+    gui.update_page_table_display()
+    return gui
+
+
+def bench_paging_gui():
+    metrics = {}
+    gui = stub_paging_gui(GUI_PAGES, GUI_FRAMES)
+    pages = zipf_trace(GUI_BATCH * GUI_BATCHES, GUI_PAGES, seed=3)
+
+    # 手动执行：时间线记录 + 增量刷新(不做动画)
+    start = time.perf_counter()
+    for page_no in pages[:2000]:
+        gui.show_access(page_no, gui.timeline.record("load", page_no, 0), animate=False)
+    metrics["paging.gui.access_refresh"] = ((time.perf_counter() - start) * 1e3 / 2000, UNIT_MS)
+
+    start = time.perf_counter()
+    for _ in range(GUI_REDRAWS):
+        gui.update_canvas_state()
+        gui.update_page_table_display()
+    metrics["paging.gui.full_redraw"] = ((time.perf_counter() - start) * 1e3 / GUI_REDRAWS, UNIT_MS)
+
+    # 高速播放的一拍：批量执行后只刷新涉及的页
+    gui.timeline = Timeline(gui.sim, ["load"] * len(pages), pages, [0] * len(pages))
+    start = time.perf_counter()
+    for _ in range(GUI_BATCHES):
+        gui.play_batch(GUI_BATCH)
+    metrics[f"paging.gui.play_batch{GUI_BATCH}"] = ((time.perf_counter() - start) * 1e3 / GUI_BATCHES, UNIT_MS)
+    return metrics
+
+
+# 名称 -> (分组, 函数, 是否需要 tkinter)
+BENCHMARKS = {
+    "partition_alloc_free": ("partition", bench_partition_alloc_free, False),
+    "partition_undo_redo": ("partition", bench_partition_undo_redo, False),
+    "partition_slab": ("partition", bench_partition_slab, False),
+    "partition_gui": ("partition", bench_partition_gui, True),
+    "paging_run_trace": ("paging", bench_paging_run_trace, False),
+    "paging_execute": ("paging", bench_paging_execute, False),
+    "paging_gui": ("paging", bench_paging_gui, True),
+}
+
+
+def _better(unit, a, b):
+    """a 是否优于 b。"""
+    return a > b if unit == UNIT_RATE else a < b
+
+
+def run_benchmarks(groups=None, repeat=DEFAULT_REPEAT, log=print):
+    """
+    运行基准测试，每项重复 repeat 次取最好值。
+    :param groups: 只运行这些分组(partition / paging)，None 表示全部
+    :return: {指标名: {"value": 数值, "unit": 单位}}
+    """
+    try:
+        import tkinter  # noqa: F401
+        has_tk = True
+    except ImportError:
+        has_tk = False
+    results = {}
+    for name, (group, func, needs_tk) in BENCHMARKS.items():
+        if groups and group not in groups:
+            continue
+        if needs_tk and not has_tk:
+            log(f"跳过 {name}：未安装 tkinter")
+            continue
+        start = time.perf_counter()
+        best = {}
+        for _ in range(repeat):
+            # 与 timeit 一样，计时期间关闭垃圾回收以减少抖动
+            gc.collect()
+            gc.disable()
+            try:
+                metrics = func()
+            finally:
+                gc.enable()
+            for metric, (value, unit) in metrics.items():
+                if metric not in best or _better(unit, value, best[metric][0]):
+                    best[metric] = (value, unit)
+        for metric, (value, unit) in best.items():
+            results[metric] = {"value": value, "unit": unit}
+        log(f"{name}: {len(best)} 项，{time.perf_counter() - start:.1f}s")
+    return results
+
+
+def compare(baseline, results, threshold=DEFAULT_THRESHOLD):
+    """
+    与基线比较。
+    :return: [(指标名, 基线值, 本次值, 相对变化)]，相对变化为正表示变好；只返回变差超过 threshold 的指标
+    """
+    regressions = []
+    for metric, now in results.items():
+        base = baseline.get(metric)
+        if base is None or base["unit"] != now["unit"] or not base["value"]:
+            continue
+        if now["unit"] == UNIT_RATE:
+            change = now["value"] / base["value"] - 1
+        else:
+            change = base["value"] / now["value"] - 1 if now["value"] else 0.0
+        if change < -threshold:
+            regressions.append((metric, base["value"], now["value"], change))
+    return regressions
+
+
+def load_baseline(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)["metrics"]
+
+
+def save_baseline(path, results):
+    """保存基线；文件已存在时只更新本次运行过的指标(例如只运行了 --only 的一组)。"""
+    if os.path.exists(path):
+        merged = load_baseline(path)
+        merged.update(results)
+        results = merged
+    data = {
+        "python": platform.python_version(),
+        "machine": platform.platform(),
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "metrics": results,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2, sort_keys=True)
+
+
+def format_results(results, baseline=None):
+    lines = [f"{'指标':<44}{'数值':>14}  {'单位':<6}{'相对基线':>10}"]
+    for metric in sorted(results):
+        now = results[metric]
+        change = ""
+        base = (baseline or {}).get(metric)
+        if base and base["value"] and now["value"]:
+            ratio = now["value"] / base["value"] if now["unit"] == UNIT_RATE else base["value"] / now["value"]
+            change = f"{ratio - 1:+.1%}"
+        lines.append(f"{metric:<44}{now['value']:>14.4g}  {now['unit']:<6}{change:>10}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="动态分区与请求分页模拟器的回归基准测试")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="基线 JSON 文件")
+    parser.add_argument("--save", action="store_true", help="把本次结果保存为基线")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="允许的最大退化比例，默认 0.25")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="每项重复次数，取最好值")
+    parser.add_argument("--only", choices=("partition", "paging"), action="append", help="只运行某一组")
+    parser.add_argument("--output", help="另外把本次结果写到这个 JSON 文件")
+    args = parser.parse_args(argv)
+
+    # 先检查基线，避免跑完全部基准才发现无从比较
+    exists = os.path.exists(args.baseline)
+    if not exists and not args.save:
+        print(f"基线 {args.baseline} 不存在，请先在本机用 --save 生成", file=sys.stderr)
+        return 2
+    if not exists and args.only:
+        print("--only 只运行部分指标，不能用来生成新的基线", file=sys.stderr)
+        return 2
+
+    results = run_benchmarks(args.only, args.repeat, log=lambda text: print(text, file=sys.stderr))
+    baseline = None if args.save else load_baseline(args.baseline)
+    print(format_results(results, baseline))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2, sort_keys=True)
+    if baseline is None:
+        save_baseline(args.baseline, results)
+        print(f"已保存基线 {args.baseline}")
+        return 0
+
+    missing = sorted(set(results) - set(baseline))
+    if missing:
+        print(f"基线中没有 {len(missing)} 项指标，未比较：{', '.join(missing)}")
+
+    regressions = compare(baseline, results, args.threshold)
+    for metric, base, now, change in regressions:
+        print(f"退化：{metric} {base:.4g} -> {now:.4g} ({change:+.1%})")
+    if regressions:
+        print(f"{len(regressions)} 项指标比基线差超过 {args.threshold:.0%}")
+        return 1
+    print("没有超过阈值的退化")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
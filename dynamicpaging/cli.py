@@ -0,0 +1,350 @@
+"""
+请求分页模拟的命令行入口，不需要图形界面：
+    python -m dynamicpaging run   --generate zipf --length 100000 --pages 64 --frames 8
+    python -m dynamicpaging run   --trace trace.txt --pages 64 --frames 8 --tlb 16
+    python -m dynamicpaging sweep --generate loop --length 10000 --pages 32 --frames 1-32
+    python -m dynamicpaging bench --length 1000000
+    python -m dynamicpaging huge  --generate phased --length 100000 --pages 1024 --frames 256
+    python -m dynamicpaging serve --port 8765
+    python -m dynamicpaging loadgen --spawn --kind paging --connections 8
+    python -m dynamicpaging loadgen --spawn --batch 25000 --workers 2
+    python -m dynamicpaging gui
+run、bench、gui 可加 --profile out.json / --cprofile 统计各方法的耗时(见 simtools/instrumentation.py)。
+run、sweep 可加 --cache DIR，重复的组合直接从结果缓存读出(见 simtools/result_cache.py)。
+只有 gui 子命令会导入 tkinter。
+"""
+import argparse
+import json
+import sys
+import time
+
+from simtools.protocol import KINDS, DEFAULT_PORT, OFFLOAD_THRESHOLD, SESSION_HISTORY, SPAWN_WORKERS
+from .simulation.huge_pages import HUGE_FACTOR
+from .simulation.paging_simulation import (PagingSimulation, POLICIES, POLICY_FIFO, POLICY_OPT,
+                                           BLOCK_SIZE, MEMORY_SIZE, MAX_PAGES)
+from .simulation.trace_reader import TRACE_FORMATS, TRACE_TEXT
+
+
+def _add_trace_arguments(parser):
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--trace", help="访问串文件")
+    source.add_argument("--generate", help="生成合成访问串：uniform / zipf / sequential / loop / phased")
+    parser.add_argument("--format", default=TRACE_TEXT, choices=TRACE_FORMATS, help="访问串文件格式")
+    parser.add_argument("--length", type=int, default=100000, help="生成的访问串长度")
+    parser.add_argument("--pages", type=int, default=MAX_PAGES, help="作业页数")
+    parser.add_argument("--seed", type=int, default=None, help="生成访问串的随机数种子")
+    parser.add_argument("--page-size", type=int, default=BLOCK_SIZE, help="页大小(字节)")
+
+
+def _generate(name, length, num_pages, seed):
+    from .simulation.trace_generator import GENERATORS
+
+    if name not in GENERATORS:
+        raise SystemExit(f"未知的访问串生成器 {name}，可选 {tuple(GENERATORS)}")
+    if name in ("sequential", "loop"):
+        return GENERATORS[name](length, num_pages)
+    if name == "phased":
+        working_set = max(1, num_pages // 4)
+        return GENERATORS[name](length, num_pages, working_set, max(1, length // 10), seed=seed)
+    return GENERATORS[name](length, num_pages, seed=seed)
+
+
+def _load_trace(args):
+    """
+    读入(或生成)完整的访问串，OPT 和结果缓存需要整条访问串。
+    :return: (ops, pages, offsets)，生成的访问串只有页号，ops 和 offsets 为 None
+    """
+    if args.generate:
+        return None, _generate(args.generate, args.length, args.pages, args.seed), None
+    from .simulation.trace_reader import iter_trace
+
+    ops, pages, offsets = [], [], []
+    for op, page_no, offset in iter_trace(args.trace, args.format, args.page_size):
+        ops.append(op)
+        pages.append(page_no)
+        offsets.append(offset)
+    return ops, pages, offsets
+
+
+def _load_pages(args):
+    """读入(或生成)完整的页号序列，sweep 只需要页号。"""
+    return _load_trace(args)[1]
+
+
+def _parse_frames(text):
+    """块数列表：'8'、'1-16' 或 '2,4,8'。"""
+    values = []
+    for part in text.split(","):
+        if "-" in part:
+            low, high = part.split("-")
+            values.extend(range(int(low), int(high) + 1))
+        else:
+            values.append(int(part))
+    return values
+
+
+def _print(data, as_json):
+    if as_json:
+        print(json.dumps(data, ensure_ascii=False, indent=2))
+        return
+    for key, value in data.items():
+        if isinstance(value, float):
+            value = f"{value:.6g}"
+        print(f"{key:>24}: {value}")
+
+
+def _add_cache_arguments(parser):
+    parser.add_argument("--cache", metavar="DIR", help="结果缓存目录，相同的访问串和配置不再重复运行")
+    parser.add_argument("--cache-size", type=int, default=256, help="结果缓存的大小上限(MB)")
+
+
+def _open_cache(args):
+    if not args.cache:
+        return None
+    from simtools.result_cache import ResultCache
+
+    return ResultCache(args.cache, args.cache_size * 1024 * 1024)
+
+
+def _add_profile_arguments(parser):
+    parser.add_argument("--profile", metavar="PATH", help="统计各方法的调用次数与耗时并导出为 JSON")
+    parser.add_argument("--cprofile", action="store_true", help="同时开启 cProfile")
+
+
+def _profiled(args, classes, func):
+    """按 --profile / --cprofile 挂接 classes 后运行 func()，统计表输出到 stderr。"""
+    if not (args.profile or args.cprofile):
+        return func()
+    from simtools.instrumentation import profile_call
+
+    result, inst = profile_call(classes, func, args.profile, args.cprofile)
+    print(inst.format_report(), file=sys.stderr)
+    return result
+
+
+def cmd_run(args):
+    tlb = None
+    if args.tlb:
+        from .simulation.tlb import TLB
+
+        tlb = TLB(args.tlb)
+    sim = PagingSimulation(args.pages, list(range(args.frames)), args.policy, page_size=args.page_size,
+                           memory_size=max(args.memory_size, args.frames * args.page_size), tlb=tlb)
+    cache = _open_cache(args)
+    if args.trace and args.policy != POLICY_OPT and cache is None:
+        # FIFO 可以流式读取，任意大小的访问串文件只占常数内存
+        from .simulation.trace_reader import run_trace_file
+
+        def run():
+            return run_trace_file(sim, args.trace, args.format)
+    else:
+        # OPT 和结果缓存需要完整访问串；读写类型和页内地址一并传入，脏页写回才能统计
+        ops, pages, offsets = _load_trace(args)
+
+        def run():
+            return sim.run_trace(ops, pages, offsets, cache=cache)
+    start = time.perf_counter()
+    result = _profiled(args, (PagingSimulation,), run)
+    elapsed = time.perf_counter() - start
+    data = result.summary()
+    data["seconds"] = elapsed
+    data["references_per_second"] = result.accesses / elapsed if elapsed else 0.0
+    _print(data, args.json)
+
+
+def cmd_sweep(args):
+    from .simulation.sweep import run_sweep
+
+    pages = _load_pages(args)
+    name = args.trace or args.generate
+    result = run_sweep({name: pages}, _parse_frames(args.frames), args.policies.split(","),
+                       max_workers=args.workers, cache=_open_cache(args))
+    if args.json:
+        print(json.dumps({"points": result.points, "anomalies": result.anomalies}, ensure_ascii=False, indent=2))
+        return
+    print(f"{'访问串':<12}{'算法':<6}{'块数':>6}{'缺页':>10}{'缺页率':>10}")
+    for trace, policy, frames, faults, rate in result.table():
+        print(f"{trace:<12}{policy:<6}{frames:>6}{faults:>10}{rate:>10.4f}")
+    for trace, f1, f2, faults1, faults2 in result.anomalies:
+        print(f"Belady 异常：{trace} 块数 {f1} -> {f2} 时缺页 {faults1} -> {faults2}")
+
+
+def cmd_bench(args):
+    from .simulation.trace_generator import zipf_trace
+
+    pages = zipf_trace(args.length, args.pages, seed=args.seed)
+
+    def bench():
+        rows = {}
+        for policy in args.policies.split(","):
+            best = None
+            for _ in range(args.repeat):
+                sim = PagingSimulation(args.pages, list(range(args.frames)), policy)
+                start = time.perf_counter()
+                sim.run_trace(None, pages, None)
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            rows[f"{policy}_references_per_second"] = args.length / best if best else 0.0
+        return rows
+
+    _print(_profiled(args, (PagingSimulation,), bench), args.json)
+
+
+def cmd_huge(args):
+    from .simulation.huge_pages import compare_page_sizes
+
+    pages = _load_pages(args)
+    options = {"page_size": args.page_size, "sample_interval": args.sample_interval}
+    if args.promote is not None:
+        options["promote_threshold"] = args.promote
+    if args.demote is not None:
+        options["demote_threshold"] = args.demote
+    try:
+        results = compare_page_sizes(pages, args.pages, args.frames, args.huge_factor, args.tlb, **options)
+    except ValueError as exc:
+        raise SystemExit(str(exc))
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        return
+    print(f"{'配置':<10}{'缺页':>10}{'读盘':>10}{'升级':>8}{'降级':>8}{'TLB 命中率':>12}"
+          f"{'遍历访存':>10}{'平均覆盖(KB)':>14}{'页表峰值(B)':>12}")
+    for name, r in results.items():
+        print(f"{name:<10}{r['faults']:>10}{r['disk_reads']:>10}{r['promotions']:>8}{r['demotions']:>8}"
+              f"{r['tlb_hit_rate']:>12.4f}{r['walk_refs']:>10}{r['avg_tlb_reach_bytes'] / 1024:>14.1f}"
+              f"{r['peak_page_table_bytes']:>12}")
+
+
+def cmd_serve(args):
+    import asyncio
+
+    from simtools.server import serve
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.unix, args.workers, args.offload_threshold,
+                          args.max_history or None))
+    except KeyboardInterrupt:
+        pass
+
+
+def cmd_loadgen(args):
+    import asyncio
+
+    from simtools.load_client import run_load
+
+    data = asyncio.run(run_load(args.host, args.port, args.unix, args.kind, args.connections, args.sessions,
+                                args.requests, args.window, args.batch, args.idle_sessions, args.seed,
+                                spawn=args.spawn, workers=args.workers))
+    if args.json:
+        print(json.dumps(data, ensure_ascii=False, indent=2))
+        return
+    server = data.pop("server")
+    _print(data, False)
+    print(f"{'server':>24}: {server}")
+
+
+def _add_address_arguments(parser):
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--unix", metavar="PATH", help="使用 Unix 套接字而不是 TCP")
+
+
+def cmd_gui(args):
+    from .main import main
+
+    if getattr(args, "profile", None) or getattr(args, "cprofile", False):
+        from .gui.paging_animation_gui import PagingAnimationGUI
+
+        _profiled(args, (PagingSimulation, PagingAnimationGUI), main)
+    else:
+        main()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m dynamicpaging", description="请求分页存储管理模拟")
+    sub = parser.add_subparsers(dest="command")
+
+    run = sub.add_parser("run", help="运行一条访问串并输出统计")
+    _add_trace_arguments(run)
+    run.add_argument("--frames", type=int, default=8, help="分配给作业的块数")
+    run.add_argument("--policy", default=POLICY_FIFO, choices=POLICIES)
+    run.add_argument("--memory-size", type=int, default=MEMORY_SIZE, help="物理内存大小(字节)")
+    run.add_argument("--tlb", type=int, default=0, help="TLB 表项数，0 表示不使用 TLB")
+    run.add_argument("--json", action="store_true", help="以 JSON 输出")
+    _add_profile_arguments(run)
+    _add_cache_arguments(run)
+    run.set_defaults(func=cmd_run)
+
+    sweep = sub.add_parser("sweep", help="扫描块数 × 置换算法，检测 Belady 异常")
+    _add_trace_arguments(sweep)
+    sweep.add_argument("--frames", default="1-16", help="块数列表，如 1-16 或 2,4,8")
+    sweep.add_argument("--policies", default=",".join(POLICIES))
+    sweep.add_argument("--workers", type=int, default=None, help="进程数，0 表示串行")
+    sweep.add_argument("--json", action="store_true", help="以 JSON 输出")
+    _add_cache_arguments(sweep)
+    sweep.set_defaults(func=cmd_sweep)
+
+    bench = sub.add_parser("bench", help="测量 run_trace 的吞吐量")
+    bench.add_argument("--length", type=int, default=1000000)
+    bench.add_argument("--pages", type=int, default=256)
+    bench.add_argument("--frames", type=int, default=32)
+    bench.add_argument("--policies", default=",".join(POLICIES))
+    bench.add_argument("--seed", type=int, default=1)
+    bench.add_argument("--repeat", type=int, default=3, help="重复次数，取最快的一次")
+    bench.add_argument("--json", action="store_true", help="以 JSON 输出")
+    _add_profile_arguments(bench)
+    bench.set_defaults(func=cmd_bench)
+
+    huge = sub.add_parser("huge", help="比较只用基本页、全用大页、按访问密度升降级三种配置")
+    _add_trace_arguments(huge)
+    huge.add_argument("--frames", type=int, default=256, help="物理块(基本页大小)总数")
+    huge.add_argument("--huge-factor", type=int, default=HUGE_FACTOR, help="大页包含的基本页数")
+    huge.add_argument("--tlb", type=int, default=64, help="TLB 表项数")
+    huge.add_argument("--promote", type=float, default=None, help="adaptive 配置的升级阈值(区内驻留页比例)")
+    huge.add_argument("--demote", type=float, default=None, help="adaptive 配置的降级阈值(采样周期内访问过的页比例)")
+    huge.add_argument("--sample-interval", type=int, default=1000, help="降级检查的周期(访问次数)")
+    huge.add_argument("--json", action="store_true", help="以 JSON 输出")
+    huge.set_defaults(func=cmd_huge)
+
+    serve = sub.add_parser("serve", help="以 JSON lines 协议提供多会话模拟服务")
+    _add_address_arguments(serve)
+    serve.add_argument("--workers", type=int, default=None, help="执行大 batch 的进程数，0 表示不用进程池")
+    serve.add_argument("--offload-threshold", type=int, default=OFFLOAD_THRESHOLD,
+                       help="batch 操作数达到该值时交给进程池")
+    serve.add_argument("--max-history", type=int, default=SESSION_HISTORY,
+                       help="分区会话保留的撤销历史条数，0 表示不限制")
+    serve.set_defaults(func=cmd_serve)
+
+    loadgen = sub.add_parser("loadgen", help="对模拟服务做吞吐量压测")
+    _add_address_arguments(loadgen)
+    loadgen.add_argument("--spawn", action="store_true", help="在本进程内启动服务再压测")
+    loadgen.add_argument("--workers", type=int, default=SPAWN_WORKERS,
+                         help="--spawn 启动的服务执行大 batch 的进程数，0 表示不用进程池")
+    loadgen.add_argument("--kind", default=KINDS[1], choices=KINDS)
+    loadgen.add_argument("--connections", type=int, default=4)
+    loadgen.add_argument("--sessions", type=int, default=4, help="每个连接的会话数")
+    loadgen.add_argument("--requests", type=int, default=10000, help="每个连接的请求数")
+    loadgen.add_argument("--window", type=int, default=64, help="每个连接最多在途的请求数")
+    loadgen.add_argument("--batch", type=int, default=0, help="大于 0 时每个请求为含这么多操作的 batch")
+    loadgen.add_argument("--idle-sessions", type=int, default=0, help="先创建这么多空闲会话")
+    loadgen.add_argument("--seed", type=int, default=None)
+    loadgen.add_argument("--json", action="store_true", help="以 JSON 输出")
+    loadgen.set_defaults(func=cmd_loadgen)
+
+    gui = sub.add_parser("gui", help="启动图形界面")
+    _add_profile_arguments(gui)
+    gui.set_defaults(func=cmd_gui)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command is None:
+        # 不带子命令时与 main.py 一样启动图形界面
+        cmd_gui(args)
+        return 0
+    args.func(args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
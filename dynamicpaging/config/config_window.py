@@ -1,20 +1,16 @@
 import tkinter as tk
 from tkinter import messagebox
-from simulation.paging_simulation import PagingSimulation
-from gui.paging_animation_gui import PagingAnimationGUI
-
-MEMORY_SIZE = 64 * 1024  # 64KB
-BLOCK_SIZE = 1024  # 每块 1KB
-MAX_BLOCKS = MEMORY_SIZE // BLOCK_SIZE  # 64
-MAX_PAGES = 64  # 作业最多可有 64 页(页号范围 0~63)
-OFFSET_MAX = BLOCK_SIZE  # 页内地址最大值(0~1023)
+from ..simulation.paging_simulation import MEMORY_SIZE, BLOCK_SIZE, MAX_PAGES
+from ..gui.paging_animation_gui import PagingAnimationGUI
+
 ANIMATION_DURATION = 800  # 动画持续时间(毫秒)
 
 
 # --------------------------
 # 配置窗口：用户输入
-#  1. 作业页数(1~64)
-#  2. 给作业分配的具体物理块号(逗号分隔)
+#  1. 页大小、物理内存大小、最大页数(内存几何参数)
+#  2. 作业页数(1~最大页数)
+#  3. 给作业分配的具体物理块号(逗号分隔)
 # --------------------------
 class ConfigWindow:
     def __init__(self, root):
@@ -29,30 +25,63 @@ class ConfigWindow:
         # 将Frame容器放置在窗口中，并设置内边距
         frm.pack(padx=20, pady=20)
 
-        # 创建一个标签，显示文本"作业页数(1~64):"
-        tk.Label(frm, text="作业页数(1~64):").grid(row=0, column=0, pady=5, sticky=tk.E)
+        # 内存几何参数：页大小(字节)、物理内存大小(KB)、最大页数
+        tk.Label(frm, text="页大小(字节):").grid(row=0, column=0, pady=5, sticky=tk.E)
+        self.entry_page_size = tk.Entry(frm, width=10)
+        self.entry_page_size.grid(row=0, column=1, pady=5, sticky=tk.W)
+        self.entry_page_size.insert(0, str(BLOCK_SIZE))
+
+        tk.Label(frm, text="物理内存大小(KB):").grid(row=1, column=0, pady=5, sticky=tk.E)
+        self.entry_memory_size = tk.Entry(frm, width=10)
+        self.entry_memory_size.grid(row=1, column=1, pady=5, sticky=tk.W)
+        self.entry_memory_size.insert(0, str(MEMORY_SIZE // 1024))
+
+        tk.Label(frm, text="最大页数:").grid(row=2, column=0, pady=5, sticky=tk.E)
+        self.entry_max_pages = tk.Entry(frm, width=10)
+        self.entry_max_pages.grid(row=2, column=1, pady=5, sticky=tk.W)
+        self.entry_max_pages.insert(0, str(MAX_PAGES))
+
+        # 创建一个标签，显示文本"作业页数(1~最大页数):"
+        tk.Label(frm, text="作业页数(1~最大页数):").grid(row=3, column=0, pady=5, sticky=tk.E)
         # 创建一个Entry控件，用于输入作业页数
         self.entry_pages = tk.Entry(frm, width=10)
         # 将Entry控件放置在窗口中，并设置内边距
-        self.entry_pages.grid(row=0, column=1, pady=5, sticky=tk.W)
+        self.entry_pages.grid(row=3, column=1, pady=5, sticky=tk.W)
         # 设置默认值为8页
         self.entry_pages.insert(0, "8")
 
         # 创建一个标签，显示文本"分配的物理块号(逗号分隔,如5,8,9,1):"
-        tk.Label(frm, text="分配的物理块号(逗号分隔,如5,8,9,1):").grid(row=1, column=0, pady=5, sticky=tk.E)
+        tk.Label(frm, text="分配的物理块号(逗号分隔,如5,8,9,1):").grid(row=4, column=0, pady=5, sticky=tk.E)
         # 创建一个Entry控件，用于输入分配的物理块号
         self.entry_frames = tk.Entry(frm, width=20)
         # 将Entry控件放置在窗口中，并设置内边距
-        self.entry_frames.grid(row=1, column=1, pady=5, sticky=tk.W)
+        self.entry_frames.grid(row=4, column=1, pady=5, sticky=tk.W)
         # 设置默认值为5,8,9,1
         self.entry_frames.insert(0, "5,8,9,1")
 
         # 创建一个按钮，点击后调用start_sim方法
         btn_start = tk.Button(frm, text="开始模拟", command=self.start_sim)
         # 将按钮放置在窗口中，并设置内边距
-        btn_start.grid(row=2, column=0, columnspan=2, pady=15)
+        btn_start.grid(row=5, column=0, columnspan=2, pady=15)
 
     def start_sim(self):
+        # 解析内存几何参数
+        geometry = []
+        for entry, name in ((self.entry_page_size, "页大小"),
+                            (self.entry_memory_size, "物理内存大小"),
+                            (self.entry_max_pages, "最大页数")):
+            value = entry.get().strip()
+            if not value.isdigit() or int(value) <= 0:
+                messagebox.showerror("输入错误", f"{name}必须是正整数！")
+                return
+            geometry.append(int(value))
+        page_size, memory_kb, max_pages = geometry
+        memory_size = memory_kb * 1024
+        if memory_size < page_size:
+            messagebox.showerror("输入错误", "物理内存大小不能小于页大小！")
+            return
+        max_blocks = memory_size // page_size
+
         # 获取用户输入的作业页数
         pages_str = self.entry_pages.get().strip()
         # 获取用户输入的物理块号列表
@@ -64,9 +93,9 @@ class ConfigWindow:
 
         # 将作业页数转换为整数
         num_pages = int(pages_str)
-        # 检查作业页数是否在1~MAX_PAGES之间
-        if not (1 <= num_pages <= MAX_PAGES):
-            messagebox.showerror("输入错误", f"作业页数必须在1~{MAX_PAGES}之间！")
+        # 检查作业页数是否在1~max_pages之间
+        if not (1 <= num_pages <= max_pages):
+            messagebox.showerror("输入错误", f"作业页数必须在1~{max_pages}之间！")
             return
 
         # 解析物理块号列表
@@ -82,10 +111,10 @@ class ConfigWindow:
             messagebox.showerror("输入错误", "请至少输入一个物理块号。")
             return
 
-        # 检查物理块号是否在0~MAX_BLOCKS-1之间
+        # 检查物理块号是否在0~max_blocks-1之间
         for fno in allocated_frames_list:
-            if fno < 0 or fno >= MAX_BLOCKS:
-                messagebox.showerror("输入错误", f"块号 {fno} 超出 [0..{MAX_BLOCKS - 1}] 范围！")
+            if fno < 0 or fno >= max_blocks:
+                messagebox.showerror("输入错误", f"块号 {fno} 超出 [0..{max_blocks - 1}] 范围！")
                 return
 
         # 去重（如果用户输入重复的块号，这里可做处理）
@@ -98,4 +127,5 @@ class ConfigWindow:
 
         # 启动模拟界面
         self.sim_window = tk.Toplevel(self.root)
-        PagingAnimationGUI(self.sim_window, num_pages, allocated_frames_list)
\ No newline at end of file
+        PagingAnimationGUI(self.sim_window, num_pages, allocated_frames_list,
+                           page_size=page_size, memory_size=memory_size)
\ No newline at end of file
@@ -1,17 +1,44 @@
+import random
 import tkinter as tk
-from simulation.paging_simulation import PagingSimulation
+from tkinter import filedialog
+from ..simulation.paging_simulation import (PagingSimulation, BLOCK_SIZE, MEMORY_SIZE, PAGE_TABLE_COMPACT,
+                                            FLAG_VALID, FLAG_MODIFIED, ACCESS_INVALID)
+from ..simulation.stack_distance import StackDistanceAnalyzer
+from ..simulation.trace_reader import iter_trace, TRACE_TEXT
+from ..simulation.trace_generator import zipf_trace
+from ..simulation.timeline import Timeline
 
 ANIMATION_DURATION = 800  # 动画持续时间(毫秒)
+LOG_DISPLAY_LINES = 500  # 日志框最多显示的行数，超出时删除最早的行
+
+# 自动播放
+PLAY_TICK = 50  # 高速播放时每次重绘的间隔(毫秒)
+PLAY_MAX_SPEED = 100000  # 最高速度(次/秒)
+PLAY_MAX_BATCH = 20000  # 每次重绘最多执行的访问数，保证界面事件能及时处理
+GENERATED_TRACE_LENGTH = 5000  # “生成”按钮产生的访问串长度
 
 
 # --------------------------
 # 动画界面：用户输入(页号、页内地址、操作)后执行
 # --------------------------
 class PagingAnimationGUI:
-    def __init__(self, root, num_pages, allocated_frames_list):
+    # 可由 Instrumentation 挂接统计耗时的重绘方法(全量刷新与增量刷新分开统计)
+    INSTRUMENTED_METHODS = {
+        "update_canvas_state": None,
+        "update_page_table_display": None,
+        "refresh_canvas_page": None,
+        "refresh_page_row": None,
+        "update_log_display": None,
+        "play_batch": None,
+    }
+
+    def __init__(self, root, num_pages, allocated_frames_list, page_size=BLOCK_SIZE, memory_size=MEMORY_SIZE):
         self.root = root
         self.root.title("请求分页管理模拟")
-        self.sim = PagingSimulation(num_pages, allocated_frames_list)
+        # 界面需要逐页显示，使用数组页表以便零拷贝读取快照
+        self.sim = PagingSimulation(num_pages, allocated_frames_list,
+                                    page_size=page_size, memory_size=memory_size,
+                                    page_table_type=PAGE_TABLE_COMPACT)
 
         # 主框架
         main_frame = tk.Frame(self.root)
@@ -38,6 +65,34 @@ class PagingAnimationGUI:
         self.btn_exec = tk.Button(input_frame, text="执行", command=self.on_execute)
         self.btn_exec.pack(side=tk.LEFT, padx=10)
 
+        # 访问串自动播放区
+        play_frame = tk.Frame(main_frame)
+        play_frame.pack(side=tk.TOP, fill=tk.X, pady=5)
+
+        tk.Button(play_frame, text="载入访问串", command=self.on_load_trace).pack(side=tk.LEFT, padx=2)
+        tk.Button(play_frame, text="生成访问串", command=self.on_generate_trace).pack(side=tk.LEFT, padx=2)
+        self.btn_play = tk.Button(play_frame, text="播放", width=6, command=self.on_play_pause)
+        self.btn_play.pack(side=tk.LEFT, padx=2)
+        tk.Button(play_frame, text="撤销", command=self.on_undo).pack(side=tk.LEFT, padx=2)
+        tk.Button(play_frame, text="单步", command=self.on_step).pack(side=tk.LEFT, padx=2)
+
+        tk.Label(play_frame, text="速度(次/秒)：").pack(side=tk.LEFT, padx=(10, 0))
+        self.speed_var = tk.IntVar(value=1)
+        tk.Scale(play_frame, from_=1, to=PLAY_MAX_SPEED, orient=tk.HORIZONTAL, length=200,
+                 variable=self.speed_var, showvalue=True).pack(side=tk.LEFT)
+
+        self.play_status = tk.Label(play_frame, text="未载入访问串")
+        self.play_status.pack(side=tk.LEFT, padx=10)
+
+        # 时间轴：拖动即跳转到访问串中的任意位置
+        timeline_frame = tk.Frame(main_frame)
+        timeline_frame.pack(side=tk.TOP, fill=tk.X)
+        tk.Label(timeline_frame, text="时间轴：").pack(side=tk.LEFT)
+        self.scrub_var = tk.IntVar(value=0)
+        self.scrubber = tk.Scale(timeline_frame, from_=0, to=0, orient=tk.HORIZONTAL, showvalue=True,
+                                 variable=self.scrub_var, command=self.on_scrub)
+        self.scrubber.pack(side=tk.LEFT, fill=tk.X, expand=True)
+
         # 创建左右分栏
         content_frame = tk.Frame(main_frame)
         content_frame.pack(side=tk.TOP, fill=tk.BOTH, expand=True, pady=5)
@@ -74,9 +129,24 @@ class PagingAnimationGUI:
         self.btn_reset = tk.Button(log_frame, text="重置", command=self.on_reset)
         self.btn_reset.pack(side=tk.LEFT, padx=10)
 
+        self.btn_curve = tk.Button(log_frame, text="缺页率曲线", command=self.show_miss_ratio_curve)
+        self.btn_curve.pack(side=tk.LEFT, padx=5)
+
+        # 时间线：手动输入和自动播放的访问都记录在这里，可撤销、跳转
+        self.timeline = Timeline(self.sim)
+        self.playing = False
+        self.play_job = None
+
+        # 日志框中已显示的最后一条记录序号和当前行数
+        self.log_seq_shown = 0
+        self.log_line_count = 0
+
         # 可视化数据
-        self.frame_rects = []  # (rect_id, text_id, frame_no)
-        self.page_rects = []  # (rect_id, text_id, page_no)
+        self.frame_items = {}  # frame_no -> (rect_id, text_id)
+        self.page_items = {}  # page_no -> (rect_id, text_id)
+        # 画布上每个物理块当前显示的页，以及每页显示在哪个块上
+        self.frame_owner = {}
+        self.page_frame_shown = {}
 
         # 初始化显示
         self.draw_static_scene()
@@ -98,6 +168,8 @@ class PagingAnimationGUI:
                 label = tk.Label(parent, text="", relief="ridge", width=12)
                 label.grid(row=row+1, column=col, padx=1, pady=1)
                 row_labels.append(label)
+            # 页号列不会变化，只在创建时设置
+            row_labels[0].config(text=f"P{row}")
             self.page_table_labels.append(row_labels)
 
     def draw_static_scene(self):
@@ -112,7 +184,7 @@ class PagingAnimationGUI:
         for frame_no in self.sim.allocated_frames_list:
             rect_id = self.canvas.create_rectangle(x0, y0, x0 + w, y0 + h, fill="#f0f0f0")
             text_id = self.canvas.create_text(x0 + w / 2, y0 + h / 2, text=f"Frame {frame_no}", font=("Arial", 10))
-            self.frame_rects.append((rect_id, text_id, frame_no))
+            self.frame_items[frame_no] = (rect_id, text_id)
             x0 += (w + gap)
             count += 1
             if count % 8 == 0:
@@ -127,7 +199,7 @@ class PagingAnimationGUI:
         for page_no in range(self.sim.num_pages):
             rect_id = self.canvas.create_rectangle(x0, y0, x0 + w, y0 + h, fill="#e0ffff")
             text_id = self.canvas.create_text(x0 + w / 2, y0 + h / 2, text=f"P{page_no}", font=("Arial", 10))
-            self.page_rects.append((rect_id, text_id, page_no))
+            self.page_items[page_no] = (rect_id, text_id)
             x0 += (w + gap)
             count += 1
             if count % 8 == 0:
@@ -137,46 +209,86 @@ class PagingAnimationGUI:
         self.update_canvas_state()
 
     def update_canvas_state(self):
-        """更新画布状态"""
+        """全量更新画布状态(初始化和重置时使用)"""
         # 所有块先恢复"空"状态
-        for (rect_id, text_id, frame_no) in self.frame_rects:
-            self.canvas.itemconfig(rect_id, fill="#f0f0f0")
-            self.canvas.itemconfig(text_id, text=f"Frame {frame_no}")
+        for frame_no in self.frame_items:
+            self.clear_frame_item(frame_no)
+        self.page_frame_shown = {}
 
         # 所有页根据 valid 来变色
-        for (rect_id, text_id, page_no) in self.page_rects:
-            entry = self.sim.page_table[page_no]
-            if entry.valid:
-                if entry.modified:
-                    self.canvas.itemconfig(rect_id, fill="#ffebcd")  # 已修改页
-                else:
-                    self.canvas.itemconfig(rect_id, fill="#b3ecff")  # 有效页
-                    # 在对应的物理块上显示
-                    if entry.frame is not None:
-                        for (f_rect, f_text, f_no) in self.frame_rects:
-                            if f_no == entry.frame:
-                                self.canvas.itemconfig(f_rect, fill="#caffca")
-                                self.canvas.itemconfig(f_text, text=f"Frame {f_no}\n<-P{page_no}")
+        flags, frames = self.sim.get_page_table_views()
+        for page_no in self.page_items:
+            self.refresh_canvas_page(page_no, flags, frames)
+
+    def refresh_canvas_page(self, page_no, flags=None, frames=None):
+        """只更新一页在画布上的颜色及其所在物理块，O(1)。"""
+        if flags is None:
+            flags, frames = self.sim.get_page_table_views()
+        rect_id, _ = self.page_items[page_no]
+        frame_no = frames[page_no]
+        valid = flags[page_no] & FLAG_VALID
+
+        # 该页之前显示在别的块上(已被淘汰或换了块)：若那个块还显示着它，恢复为空
+        old_frame = self.page_frame_shown.pop(page_no, None)
+        if old_frame is not None and (not valid or old_frame != frame_no) \
+                and self.frame_owner.get(old_frame) == page_no:
+            self.clear_frame_item(old_frame)
+
+        if valid:
+            if flags[page_no] & FLAG_MODIFIED:
+                self.canvas.itemconfig(rect_id, fill="#ffebcd")  # 已修改页
             else:
-                self.canvas.itemconfig(rect_id, fill="#e0ffff")
+                self.canvas.itemconfig(rect_id, fill="#b3ecff")  # 有效页
+            # 在对应的物理块上显示
+            item = self.frame_items.get(int(frame_no))
+            if item is not None:
+                f_rect, f_text = item
+                self.canvas.itemconfig(f_rect, fill="#caffca")
+                self.canvas.itemconfig(f_text, text=f"Frame {frame_no}\n<-P{page_no}")
+                self.frame_owner[int(frame_no)] = page_no
+                self.page_frame_shown[page_no] = int(frame_no)
+        else:
+            self.canvas.itemconfig(rect_id, fill="#e0ffff")
+
+    def clear_frame_item(self, frame_no):
+        """把一个物理块恢复为"空"状态"""
+        f_rect, f_text = self.frame_items[frame_no]
+        self.canvas.itemconfig(f_rect, fill="#f0f0f0")
+        self.canvas.itemconfig(f_text, text=f"Frame {frame_no}")
+        self.frame_owner.pop(frame_no, None)
 
     def update_page_table_display(self):
-        """更新页表显示"""
-        for row, entry in enumerate(self.sim.page_table):
-            # 页号
-            self.page_table_labels[row][0].config(text=f"P{row}")
-            
-            # 状态
-            status = "已加载" if entry.valid else "未加载"
-            self.page_table_labels[row][1].config(text=status)
-            
-            # 物理块号
-            frame = str(entry.frame) if entry.frame is not None else "-"
-            self.page_table_labels[row][2].config(text=frame)
-            
-            # 修改位
-            modified = "是" if entry.modified else "否"
-            self.page_table_labels[row][3].config(text=modified)
+        """全量更新页表显示(初始化和重置时使用)"""
+        flags, frames = self.sim.get_page_table_views()
+        for row in range(self.sim.num_pages):
+            self.refresh_page_row(row, flags, frames)
+
+    def refresh_page_row(self, row, flags=None, frames=None):
+        """只更新页表中的一行"""
+        if flags is None:
+            flags, frames = self.sim.get_page_table_views()
+        labels = self.page_table_labels[row]
+
+        # 状态
+        status = "已加载" if flags[row] & FLAG_VALID else "未加载"
+        labels[1].config(text=status)
+
+        # 物理块号
+        frame = str(frames[row]) if frames[row] >= 0 else "-"
+        labels[2].config(text=frame)
+
+        # 修改位
+        modified = "是" if flags[row] & FLAG_MODIFIED else "否"
+        labels[3].config(text=modified)
+
+    def changed_pages(self, page_no, replaced_page):
+        """一次访问后需要刷新的页：被淘汰的页在前，访问的页在后(它可能复用了同一块)。"""
+        pages = []
+        if replaced_page is not None:
+            pages.append(replaced_page)
+        if 0 <= page_no < self.sim.num_pages:
+            pages.append(page_no)
+        return pages
 
     def on_execute(self):
         page_str = self.entry_page_no.get().strip()
@@ -186,30 +298,46 @@ class PagingAnimationGUI:
         if not page_str.isdigit() or not offset_str.isdigit():
             self.log("页号/页内地址必须是整数！")
             return
+        # 手动输入的访问追加在时间线当前位置，之后可重做的访问被丢弃
+        self.stop_playback()
         page_no = int(page_str)
-        offset = int(offset_str)
+        self.show_access(page_no, self.timeline.record(op, page_no, int(offset_str)))
+        self.update_play_status()
 
-        msg, replaced_page, loaded_page = self.sim.execute(op, page_no, offset)
+    def show_access(self, page_no, result, animate=True):
+        """根据一次 execute 的结果刷新界面；animate 为 False 时不做闪烁动画，立即更新画布。"""
+        msg, replaced_page, loaded_page = result
         self.update_log_display()
-        self.update_page_table_display()
+        # 只刷新本次访问涉及的页：访问的页(装入/修改位)和被淘汰的页
+        changed = self.changed_pages(page_no, replaced_page)
+        for p in changed:
+            self.refresh_page_row(p)
 
-        # 执行动画
-        self.animate_replacement(replaced_page, loaded_page)
+        if animate:
+            self.animate_replacement(replaced_page, loaded_page, changed)
+        else:
+            self.refresh_canvas_pages(changed)
 
-    def animate_replacement(self, replaced_page, loaded_page):
+    def animate_replacement(self, replaced_page, loaded_page, changed=None):
         # 被淘汰的页 -> 红色闪烁
         if replaced_page is not None:
-            for (rect_id, text_id, p_no) in self.page_rects:
-                if p_no == replaced_page:
-                    self.flash_color(rect_id, from_color="#e0ffff", to_color="red", duration=ANIMATION_DURATION)
+            rect_id, _ = self.page_items[replaced_page]
+            self.flash_color(rect_id, from_color="#e0ffff", to_color="red", duration=ANIMATION_DURATION)
 
         # 新加载的页 -> 绿色闪烁
         if loaded_page is not None:
-            for (rect_id, text_id, p_no) in self.page_rects:
-                if p_no == loaded_page:
-                    self.flash_color(rect_id, from_color="#e0ffff", to_color="green", duration=ANIMATION_DURATION)
+            rect_id, _ = self.page_items[loaded_page]
+            self.flash_color(rect_id, from_color="#e0ffff", to_color="green", duration=ANIMATION_DURATION)
+
+        if changed is None:
+            self.root.after(ANIMATION_DURATION, self.update_canvas_state)
+        else:
+            self.root.after(ANIMATION_DURATION, lambda: self.refresh_canvas_pages(changed))
 
-        self.root.after(ANIMATION_DURATION, self.update_canvas_state)
+    def refresh_canvas_pages(self, pages):
+        flags, frames = self.sim.get_page_table_views()
+        for p in pages:
+            self.refresh_canvas_page(p, flags, frames)
 
     def flash_color(self, rect_id, from_color, to_color, duration=500):
         """颜色闪烁动画"""
@@ -217,20 +345,232 @@ class PagingAnimationGUI:
         self.canvas.itemconfig(rect_id, fill=to_color)
         self.root.after(half, lambda: self.canvas.itemconfig(rect_id, fill=from_color))
 
+    # ---------- 访问串自动播放 ----------
+    def set_trace(self, ops, pages, offsets):
+        """设置要播放的访问串，以模拟器当前状态为时间线起点(不重置模拟器)。"""
+        self.stop_playback()
+        self.timeline = Timeline(self.sim, ops, pages, offsets)
+        self.update_play_status()
+
+    def on_load_trace(self):
+        """载入 "op page offset" 格式的访问串文件。"""
+        path = filedialog.askopenfilename(parent=self.root, filetypes=[("访问串", "*.txt *.trace"), ("全部", "*")])
+        if not path:
+            return
+        ops, pages, offsets = [], [], []
+        try:
+            for op, page_no, offset in iter_trace(path, TRACE_TEXT, self.sim.page_size):
+                ops.append(op)
+                pages.append(page_no)
+                offsets.append(offset)
+        except (OSError, ValueError) as e:
+            self.log(f"载入访问串失败：{e}")
+            self.update_log_display()
+            return
+        self.set_trace(ops, pages, offsets)
+        self.log(f"载入访问串 {path}，共 {len(pages)} 次访问")
+        self.update_log_display()
+
+    def on_generate_trace(self):
+        """生成一条 Zipf 分布的访问串，约四分之一的访问为写操作。"""
+        n = GENERATED_TRACE_LENGTH
+        rng = random.Random()
+        pages = zipf_trace(n, self.sim.num_pages, seed=rng.randrange(1 << 30))
+        ops = ["save" if rng.random() < 0.25 else "load" for _ in range(n)]
+        offsets = [rng.randrange(self.sim.page_size) for _ in range(n)]
+        self.set_trace(ops, pages, offsets)
+        self.log(f"生成 Zipf 访问串，共 {n} 次访问")
+        self.update_log_display()
+
+    def on_play_pause(self):
+        if self.playing:
+            self.stop_playback()
+        elif self.timeline.position < len(self.timeline):
+            self.playing = True
+            self.btn_play.config(text="暂停")
+            self.play_tick()
+
+    def on_step(self):
+        """暂停状态下执行访问串中的下一次访问(带动画)。"""
+        self.stop_playback()
+        result = self.timeline.redo()
+        if result is not None:
+            self.show_access(self.timeline.pages[self.timeline.position - 1], result)
+            self.update_play_status()
+
+    def on_undo(self):
+        """撤销最近一次访问：从最近的检查点恢复并重放。"""
+        self.stop_playback()
+        if self.timeline.position > 0:
+            self.timeline.undo()
+            self.log(f"撤销，回到第 {self.timeline.position} 次访问之后")
+            self.refresh_after_seek()
+
+    def on_scrub(self, value):
+        """拖动时间轴：跳转到对应位置。播放时程序更新滑块也会触发这里，位置相同则忽略。"""
+        k = int(float(value))
+        if k == self.timeline.position:
+            return
+        self.stop_playback()
+        self.timeline.seek(k)
+        self.log(f"跳转到第 {k} 次访问之后")
+        self.refresh_after_seek()
+
+    def refresh_after_seek(self):
+        self.update_canvas_state()
+        self.update_page_table_display()
+        self.update_log_display()
+        self.update_play_status()
+
+    def stop_playback(self):
+        self.playing = False
+        if self.play_job is not None:
+            self.root.after_cancel(self.play_job)
+            self.play_job = None
+        self.btn_play.config(text="播放")
+
+    def play_single(self, animate):
+        result = self.timeline.step()
+        self.show_access(self.timeline.pages[self.timeline.position - 1], result, animate=animate)
+
+    def play_tick(self):
+        """
+        播放一拍。低速时每拍执行一次访问，间隔足够时带动画；
+        高速时每 PLAY_TICK 毫秒用 run_trace 批量执行一段访问，只重绘一次，
+        每拍的工作量有上限，其余时间交还给 Tk 事件循环。
+        """
+        self.play_job = None
+        if not self.playing:
+            return
+        speed = max(1, self.speed_var.get())
+        batch = speed * PLAY_TICK // 1000
+        if batch <= 1:
+            interval = 1000 // speed
+            self.play_single(animate=interval >= ANIMATION_DURATION)
+        else:
+            self.play_batch(min(batch, PLAY_MAX_BATCH))
+            interval = PLAY_TICK
+        self.update_play_status()
+        if self.timeline.position >= len(self.timeline):
+            self.stop_playback()
+            self.log("访问串播放完毕")
+            self.update_log_display()
+            return
+        self.play_job = self.root.after(interval, self.play_tick)
+
+    def play_batch(self, count):
+        """通过时间线(内部为 run_trace)连续执行 count 次访问，之后只刷新其间涉及的页。"""
+        start = self.timeline.position
+        result = self.timeline.advance(count)
+        end = self.timeline.position
+        pages = self.timeline.pages[start:end]
+
+        status = result.status
+        self.log(f"批量执行第 {start + 1}~{end} 次访问：缺页 {result.faults} 次，"
+                 f"置换 {result.replacements} 次")
+        self.update_log_display()
+
+        changed = {p for p, s in zip(pages, status) if s != ACCESS_INVALID}
+        changed.update(v for v in result.victims if v >= 0)
+        if len(changed) * 2 > self.sim.num_pages:
+            self.update_canvas_state()
+            self.update_page_table_display()
+        else:
+            self.refresh_canvas_pages(changed)
+            for p in changed:
+                self.refresh_page_row(p)
+
+    def update_play_status(self):
+        total = len(self.timeline)
+        if total:
+            self.play_status.config(text=f"进度 {self.timeline.position}/{total}")
+        else:
+            self.play_status.config(text="未载入访问串")
+        self.scrubber.config(to=total)
+        self.scrub_var.set(self.timeline.position)
+
     def on_reset(self):
+        self.stop_playback()
         self.sim.reset()
+        # 保留访问串，从头开始
+        tl = self.timeline
+        self.timeline = Timeline(self.sim, tl.ops, tl.pages, tl.offsets)
+        self.update_play_status()
+        self.log_text.delete("1.0", tk.END)
+        self.log_line_count = 0
         self.log("重置模拟器")
         self.update_canvas_state()
         self.update_page_table_display()
         self.update_log_display()
 
+    def show_miss_ratio_curve(self):
+        """对已执行的访问串做一次栈距离分析，绘制 LRU 在 1~N 个物理块下的缺页率曲线。"""
+        history = self.timeline.valid_pages()
+        if not history:
+            self.log("尚无访问记录，无法绘制缺页率曲线")
+            self.update_log_display()
+            return
+        analyzer = StackDistanceAnalyzer(history)
+        curve = analyzer.miss_ratio_curve(max(analyzer.distinct_pages, len(self.sim.allocated_frames_list)))
+
+        win = tk.Toplevel(self.root)
+        win.title("LRU 缺页率曲线(栈距离分析)")
+        width, height = 480, 300
+        left, top, right, bottom = 50, 20, width - 20, height - 40
+        canvas = tk.Canvas(win, width=width, height=height, bg="white")
+        canvas.pack(side=tk.TOP, padx=5, pady=5)
+
+        # 坐标轴
+        canvas.create_line(left, bottom, right, bottom)
+        canvas.create_line(left, bottom, left, top)
+        canvas.create_text(left - 10, top, text="1.0", anchor=tk.E, font=("Arial", 8))
+        canvas.create_text(left - 10, bottom, text="0", anchor=tk.E, font=("Arial", 8))
+        canvas.create_text((left + right) / 2, height - 15, text="物理块数", font=("Arial", 9))
+
+        n = len(curve)
+        step = (right - left) / max(n - 1, 1)
+        points = []
+        for i, (frames, faults, ratio) in enumerate(curve):
+            x = left + i * step
+            y = bottom - ratio * (bottom - top)
+            points.extend((x, y))
+            canvas.create_oval(x - 2, y - 2, x + 2, y + 2, fill="#2196F3", outline="")
+            if n <= 16 or frames % max(n // 16, 1) == 0:
+                canvas.create_text(x, bottom + 10, text=str(frames), font=("Arial", 8))
+        if len(points) >= 4:
+            canvas.create_line(*points, fill="#2196F3", width=2)
+
+        # 当前分配块数的位置
+        k = len(self.sim.allocated_frames_list)
+        if 1 <= k <= n:
+            x = left + (k - 1) * step
+            canvas.create_line(x, top, x, bottom, fill="red", dash=(3, 3))
+            canvas.create_text(x + 3, top, text=f"当前 {k} 块", anchor=tk.NW, fill="red", font=("Arial", 8))
+
+        def export():
+            path = filedialog.asksaveasfilename(parent=win, defaultextension=".csv",
+                                                filetypes=[("CSV", "*.csv")])
+            if path:
+                analyzer.export_csv(path, n)
+
+        tk.Button(win, text="导出CSV", command=export).pack(side=tk.BOTTOM, pady=5)
+
     def log(self, text):
         self.sim.log(text)
 
     def update_log_display(self):
-        self.log_text.delete("1.0", tk.END)
-        for line in self.sim.log_lines:
-            self.log_text.insert(tk.END, line + "\n")
+        """只追加新产生的日志行，并删除超出 LOG_DISPLAY_LINES 的最早行。"""
+        records = self.sim.log_records_since(self.log_seq_shown)
+        if not records:
+            return
+        fmt = self.sim.format_log_record
+        self.log_text.insert(tk.END, "".join(fmt(r) + "\n" for r in records))
+        self.log_seq_shown = records[-1][0]
+        self.log_line_count += len(records)
+        excess = self.log_line_count - LOG_DISPLAY_LINES
+        if excess > 0:
+            self.log_text.delete("1.0", f"{excess + 1}.0")
+            self.log_line_count -= excess
         self.log_text.see(tk.END)
 
 
@@ -1,12 +1,20 @@
-import tkinter as tk
-from config.config_window import ConfigWindow
+import os
+import sys
 
 
 def main():
+    # tkinter 只在真正启动图形界面时才导入
+    import tkinter as tk
+    from .config.config_window import ConfigWindow
+
     root = tk.Tk()
     app = ConfigWindow(root)
     root.mainloop()
 
 
 if __name__ == "__main__":
+    if not __package__:
+        # 直接运行 python main.py 时，把上级目录加入搜索路径后按包导入
+        sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        from dynamicpaging.main import main
     main()
@@ -0,0 +1,63 @@
+"""
+分页会话在模拟服务(simtools/server.py)中的操作：创建 PagingSimulation、执行 batch、快照，
+以及 access 单步操作。服务端按会话类型 paging 找到本模块。
+"""
+from collections import deque
+
+from simtools.protocol import KIND_PAGING, RequestError
+from .simulation.paging_simulation import PagingSimulation, POLICY_FIFO, BLOCK_SIZE, MEMORY_SIZE
+
+KIND = KIND_PAGING
+SESSION_LOG_CAPACITY = 16  # 分页会话保留的日志条数
+
+
+def create(request, max_history):
+    """
+    create 请求：num_pages, frames, policy, page_size, memory_size。
+    :param max_history: 分页会话没有撤销历史，忽略
+    """
+    frames = request.get("frames")
+    if not isinstance(frames, list):
+        raise RequestError("paging 会话需要 frames 块号列表")
+    engine = PagingSimulation(int(request["num_pages"]), frames, request.get("policy", POLICY_FIFO),
+                              page_size=int(request.get("page_size", BLOCK_SIZE)),
+                              memory_size=int(request.get("memory_size", MEMORY_SIZE)))
+    # 空闲会话只保存引擎对象本身，日志缓冲区缩小到 SESSION_LOG_CAPACITY 条
+    engine.log_records = deque(engine.log_records, maxlen=SESSION_LOG_CAPACITY)
+    return engine
+
+
+def run_batch(engine, request):
+    """batch 请求：pages, ops, offsets(后两者可省略)，返回统计摘要。出错时恢复到执行前的状态。"""
+    pages = request.get("pages")
+    if not isinstance(pages, list):
+        raise RequestError("paging 的 batch 需要 pages 列表")
+    checkpoint = engine.checkpoint()
+    try:
+        result = engine.run_trace(request.get("ops"), pages, request.get("offsets"))
+    except Exception:
+        engine.restore(checkpoint)
+        raise
+    return result.summary()
+
+
+def snapshot(engine):
+    return {
+        "policy": engine.policy,
+        "frames": engine.allocated_frames_list,
+        "resident": [[p, e.frame, e.modified] for p, e in engine.page_table.valid_items()],
+        "fifo": list(engine.fifo_queue),
+        "dirty_evictions": engine.dirty_evictions,
+        "log": engine.log_lines,
+    }
+
+
+def op_access(engine, request):
+    msg, replaced, loaded = engine.execute(request.get("access", "load"), int(request["page"]),
+                                           int(request.get("offset", 0)))
+    return {"message": msg, "replaced": replaced, "loaded": loaded}
+
+
+OPS = {
+    "access": op_access,
+}
@@ -0,0 +1,328 @@
+from array import array
+from collections import deque
+
+from .paging_simulation import BLOCK_SIZE
+from .tlb import TLB, TLB_RANDOM
+
+HUGE_FACTOR = 16  # 一个大页由多少个连续且对齐的基本页(块)组成
+PTE_SIZE = 8  # 页表项字节数
+
+# 预设配置：只用基本页、缺页即整区装入大页、按访问密度升降级
+CONFIG_BASE = "base"
+CONFIG_HUGE = "huge"
+CONFIG_ADAPTIVE = "adaptive"
+CONFIGS = (CONFIG_BASE, CONFIG_HUGE, CONFIG_ADAPTIVE)
+
+
+class HugePageSimulation:
+    """
+    混合页大小的请求分页：基本页大小为 page_size，大页由 huge_factor 个基本页组成，
+    占用 huge_factor 个连续且按大页对齐的物理块。页号空间按大页划分为区，
+    区 r 覆盖基本页 [r * huge_factor, (r + 1) * huge_factor)。
+
+    页表为两级：每个区在目录中占一个页表项；区内有基本页映射时才分配一张
+    huge_factor 项的叶子页表，整区映射为大页时只用目录项。TLB 未命中时的页表遍历
+    基本页需访问 2 次内存，大页 1 次。
+
+    升级：区内驻留的基本页达到 promote_threshold * huge_factor 时，选一组已用块最少的
+    对齐物理块(必要时淘汰其中别的页)，把整区装成一个大页，未驻留的基本页随之读入。
+    降级：每 sample_interval 次访问检查一次，采样周期内被访问过的基本页比例低于
+    demote_threshold 的大页拆回基本页，只保留被访问过的页。
+    置换按映射(基本页或大页)做 FIFO。
+    """
+
+    def __init__(self, num_pages, num_frames, huge_factor=HUGE_FACTOR, page_size=BLOCK_SIZE,
+                 promote_threshold=0.75, demote_threshold=0.25, sample_interval=1000, tlb=None):
+        """
+        :param num_pages: 作业的基本页数
+        :param num_frames: 物理块(基本页大小)总数
+        :param huge_factor: 大页包含的基本页数
+        :param page_size: 基本页大小，字节
+        :param promote_threshold: 升级所需的区内驻留页比例，None 表示不使用大页
+        :param demote_threshold: 降级阈值(采样周期内被访问过的页比例)，None 表示不降级
+        :param sample_interval: 降级检查及 TLB 覆盖范围采样的周期(访问次数)
+        :param tlb: 基本页和大页共用的 TLB，默认 64 项全相联
+        """
+        if huge_factor < 2 or num_frames < huge_factor:
+            raise ValueError(f"大页包含的基本页数 {huge_factor} 不合法或超过物理块数 {num_frames}")
+        if (promote_threshold is not None and demote_threshold is not None
+                and demote_threshold >= promote_threshold):
+            raise ValueError(f"降级阈值 {demote_threshold} 必须小于升级阈值 {promote_threshold}")
+        self.num_pages = num_pages
+        self.num_frames = num_frames
+        self.huge_factor = huge_factor
+        self.page_size = page_size
+        self.promote_threshold = promote_threshold
+        self.demote_threshold = demote_threshold
+        self.sample_interval = sample_interval
+        self.tlb = tlb if tlb is not None else TLB(64)
+        self.num_regions = -(-num_pages // huge_factor)
+        # 区内驻留页数达到该值时升级
+        self.promote_count = (None if promote_threshold is None
+                              else max(1, int(promote_threshold * huge_factor + 0.999999)))
+
+        self.used = bytearray(num_frames)
+        self.free_count = num_frames
+        self._hint = 0
+        # 物理块上的基本页(-1 表示空闲或属于大页)
+        self.frame_page = array("i", [-1]) * num_frames
+        self.base_frame = {}  # 基本页 -> 帧号
+        self.region_resident = {}  # 区 -> 驻留的基本页数(即该区的叶子页表是否存在)
+        self.huge_slot = {}  # 大页所在的区 -> 起始帧号
+        self.huge_touched = {}  # 大页所在的区 -> 本采样周期内访问过的区内页偏移
+        self.slot_region = {}  # 大页的起始帧号 -> 区
+        # FIFO 中为 (映射键, 入队序号)：基本页的键为 page << 1，大页为 (region << 1) | 1。
+        # fifo_stamp 记录现存映射入队时的序号，映射撤销后旧项过期，出队时跳过；
+        # 同一页撤销后重新映射会以新序号入队，旧项不会把它提前淘汰
+        self.fifo = deque()
+        self.fifo_stamp = {}
+        self._stamp = 0
+
+        self.accesses = 0
+        self.faults = 0
+        self.promotions = 0
+        self.demotions = 0
+        self.promotion_reads = 0  # 升级时为补齐大页读入的基本页数
+        self.evictions = 0
+        self.walk_refs = 0  # TLB 未命中时页表遍历的内存访问次数
+        self.peak_leaf_tables = 0
+        self._reach_samples = []
+
+    def access(self, page_no):
+        """访问基本页 page_no，返回是否缺页。"""
+        if page_no < 0 or page_no >= self.num_pages:
+            raise ValueError(f"访问页 {page_no} 超出作业页范围(0~{self.num_pages - 1})")
+        self.accesses += 1
+        region = page_no // self.huge_factor
+        fault = False
+        if region in self.huge_slot:
+            key = (region << 1) | 1
+            self.huge_touched[region].add(page_no % self.huge_factor)
+            walk = 1
+        else:
+            key = page_no << 1
+            walk = 2
+            if page_no not in self.base_frame:
+                fault = True
+                self.faults += 1
+                self._map_base(page_no, self._allocate_frame())
+                if (self.promote_count is not None and self.region_resident[region] >= self.promote_count
+                        and self._promote(region)):
+                    key = (region << 1) | 1
+                    walk = 1
+        tlb = self.tlb
+        if tlb.lookup(key) is None:
+            self.walk_refs += walk
+            tlb.insert(key, 0)
+        if self.accesses % self.sample_interval == 0:
+            self._sample()
+        return fault
+
+    def run(self, pages):
+        """依次访问页号序列，返回 report()。"""
+        pages = pages.tolist() if hasattr(pages, "tolist") else pages
+        for p in pages:
+            self.access(p)
+        return self.report()
+
+    # ---------- 物理块 ----------
+    def _allocate_frame(self):
+        """分配编号最小的空闲块，没有时按 FIFO 淘汰映射直到腾出一块。"""
+        while self.free_count == 0:
+            self._evict_next()
+        frame = self.used.find(0, self._hint)
+        if frame < 0:
+            frame = self.used.find(0)
+        self.used[frame] = 1
+        self.free_count -= 1
+        self._hint = frame + 1
+        return frame
+
+    def _free_frame(self, frame):
+        self.used[frame] = 0
+        self.frame_page[frame] = -1
+        self.free_count += 1
+        if frame < self._hint:
+            self._hint = frame
+
+    def _evict_next(self):
+        while True:
+            key, stamp = self.fifo.popleft()
+            if self.fifo_stamp.get(key) == stamp:
+                break
+        if key & 1:
+            self._unmap_huge(key >> 1)
+        else:
+            self._unmap_base(key >> 1)
+        self.evictions += 1
+
+    def _enqueue(self, key):
+        self._stamp += 1
+        self.fifo_stamp[key] = self._stamp
+        self.fifo.append((key, self._stamp))
+        # 过期项多于现存映射时整理一次；每个映射至少占一块，队列长度因此不超过物理块数的两倍左右
+        if len(self.fifo) > 2 * len(self.fifo_stamp) + self.huge_factor:
+            stamps = self.fifo_stamp
+            self.fifo = deque(item for item in self.fifo if stamps.get(item[0]) == item[1])
+
+    # ---------- 映射 ----------
+    def _map_base(self, page_no, frame):
+        region = page_no // self.huge_factor
+        self.base_frame[page_no] = frame
+        self.frame_page[frame] = page_no
+        count = self.region_resident.get(region, 0) + 1
+        self.region_resident[region] = count
+        if count == 1 and len(self.region_resident) > self.peak_leaf_tables:
+            self.peak_leaf_tables = len(self.region_resident)
+        self._enqueue(page_no << 1)
+
+    def _unmap_base(self, page_no):
+        region = page_no // self.huge_factor
+        self._free_frame(self.base_frame.pop(page_no))
+        count = self.region_resident[region] - 1
+        if count:
+            self.region_resident[region] = count
+        else:
+            del self.region_resident[region]
+        del self.fifo_stamp[page_no << 1]
+        self.tlb.invalidate(page_no << 1)
+
+    def _unmap_huge(self, region):
+        start = self.huge_slot.pop(region)
+        del self.huge_touched[region]
+        del self.slot_region[start]
+        for f in range(start, start + self.huge_factor):
+            self._free_frame(f)
+        del self.fifo_stamp[(region << 1) | 1]
+        self.tlb.invalidate((region << 1) | 1)
+
+    def _promote(self, region):
+        """
+        把区 region 升级为大页：选一组已用块最少的对齐物理块，腾空后整区装入。
+        :return: 是否升级(末尾不满一个大页的区只能用基本页)
+        """
+        factor = self.huge_factor
+        if (region + 1) * factor > self.num_pages:
+            return False
+        first = region * factor
+        own = set(range(first, first + factor))
+        best, best_cost = None, factor + 1
+        for start in range(0, self.num_frames - factor + 1, factor):
+            cost = 0
+            for f in range(start, start + factor):
+                if self.used[f] and self.frame_page[f] not in own:
+                    cost += 1
+            if cost < best_cost:
+                best, best_cost = start, cost
+                if cost == 0:
+                    break
+        resident_offsets = {p - first for p in own if p in self.base_frame}
+
+        # 本区原有的基本页迁入大页，不算淘汰
+        for p in own:
+            if p in self.base_frame:
+                self._unmap_base(p)
+        # 腾空目标块组中别的映射
+        for f in range(best, best + factor):
+            if not self.used[f]:
+                continue
+            p = self.frame_page[f]
+            if p >= 0:
+                self._unmap_base(p)
+            else:
+                self._unmap_huge(self.slot_region[f - f % factor])
+            self.evictions += 1
+
+        for f in range(best, best + factor):
+            self.used[f] = 1
+        self.free_count -= factor
+        self.huge_slot[region] = best
+        self.slot_region[best] = region
+        self.huge_touched[region] = resident_offsets
+        self._enqueue((region << 1) | 1)
+        self.promotions += 1
+        self.promotion_reads += factor - len(resident_offsets)
+        return True
+
+    def _demote(self, region):
+        """把大页拆回基本页：采样周期内被访问过的页留在原物理块上，其余块释放。"""
+        start = self.huge_slot.pop(region)
+        touched = self.huge_touched.pop(region)
+        del self.slot_region[start]
+        del self.fifo_stamp[(region << 1) | 1]
+        self.tlb.invalidate((region << 1) | 1)
+        first = region * self.huge_factor
+        for offset in range(self.huge_factor):
+            frame = start + offset
+            if offset in touched:
+                self._map_base(first + offset, frame)
+            else:
+                self._free_frame(frame)
+        self.demotions += 1
+
+    def _sample(self):
+        self._reach_samples.append(self.tlb_reach())
+        if self.demote_threshold is None:
+            return
+        limit = self.demote_threshold * self.huge_factor
+        for region in list(self.huge_slot):
+            if len(self.huge_touched[region]) < limit:
+                self._demote(region)
+            else:
+                self.huge_touched[region] = set()
+
+    # ---------- 统计 ----------
+    def tlb_reach(self):
+        """TLB 当前表项覆盖的内存字节数。"""
+        reach = 0
+        for tlb_set in self.tlb.sets:
+            keys = tlb_set.keys if self.tlb.policy == TLB_RANDOM else tlb_set
+            for key in keys:
+                reach += self.huge_factor if key & 1 else 1
+        return reach * self.page_size
+
+    def page_table_bytes(self, leaf_tables=None):
+        """页表占用的字节数：页目录加上有基本页映射的区的叶子页表。"""
+        if leaf_tables is None:
+            leaf_tables = len(self.region_resident)
+        return (self.num_regions + leaf_tables * self.huge_factor) * PTE_SIZE
+
+    def report(self):
+        samples = self._reach_samples
+        return {
+            "accesses": self.accesses,
+            "faults": self.faults,
+            "fault_rate": self.faults / self.accesses if self.accesses else 0.0,
+            "disk_reads": self.faults + self.promotion_reads,
+            "promotions": self.promotions,
+            "demotions": self.demotions,
+            "evictions": self.evictions,
+            "huge_pages": len(self.huge_slot),
+            "tlb_hit_rate": self.tlb.hit_rate,
+            "walk_refs": self.walk_refs,
+            "tlb_reach_bytes": self.tlb_reach(),
+            "avg_tlb_reach_bytes": sum(samples) / len(samples) if samples else self.tlb_reach(),
+            "page_table_bytes": self.page_table_bytes(),
+            "peak_page_table_bytes": self.page_table_bytes(self.peak_leaf_tables),
+        }
+
+
+def compare_page_sizes(pages, num_pages, num_frames, huge_factor=HUGE_FACTOR, tlb_entries=64, **kwargs):
+    """
+    用同一访问串分别运行 CONFIGS 中的三种配置：
+    base 只用基本页；huge 缺页即把整区装成大页且不降级；adaptive 按访问密度升降级。
+    :return: {配置名: report()}
+    """
+    settings = {
+        CONFIG_BASE: {"promote_threshold": None, "demote_threshold": None},
+        CONFIG_HUGE: {"promote_threshold": 1 / huge_factor, "demote_threshold": None},
+        CONFIG_ADAPTIVE: {},
+    }
+    pages = pages.tolist() if hasattr(pages, "tolist") else list(pages)
+    results = {}
+    for name in CONFIGS:
+        options = dict(kwargs)
+        options.update(settings[name])
+        sim = HugePageSimulation(num_pages, num_frames, huge_factor, tlb=TLB(tlb_entries), **options)
+        results[name] = sim.run(pages)
+    return results
@@ -0,0 +1,131 @@
+from collections import OrderedDict
+
+# 默认时间参数(纳秒)
+DISK_READ_LATENCY = 8_000_000  # 从磁盘读入一页
+DISK_WRITE_LATENCY = 8_000_000  # 把一页写回磁盘
+MEMORY_ACCESS_TIME = 100  # 一次内存访问
+RECLAIM_TIME = 2_000  # 从空闲/修改页链表收回一页(软缺页)
+
+
+class IOCostModel:
+    """
+    缺页 I/O 代价模型，参照 VAX/VMS 的页缓冲：
+    被淘汰的干净页进入空闲页链表，脏页进入修改页链表，页内容仍留在内存中；
+    再次访问时可直接收回(软缺页)，不必读盘。修改页链表超出容量时最早的页要同步写回，
+    此外每 flush_interval 次访问由后台成批写回 flush_batch 个修改页。
+    两个链表容量都为 0 时退化为无缓冲：脏页淘汰时同步写回，缺页都要读盘。
+    """
+
+    def __init__(self, read_latency=DISK_READ_LATENCY, write_latency=DISK_WRITE_LATENCY,
+                 memory_time=MEMORY_ACCESS_TIME, reclaim_time=RECLAIM_TIME,
+                 free_list_size=0, modified_list_size=0, flush_interval=0, flush_batch=8,
+                 page_size=1024):
+        """
+        :param free_list_size: 空闲页链表容量(页)
+        :param modified_list_size: 修改页链表容量(页)
+        :param flush_interval: 后台写回的周期(访问次数)，0 表示不做后台写回
+        :param flush_batch: 每次后台写回的最大页数
+        :param page_size: 页大小，用于统计磁盘流量字节数；交给 PagingSimulation 时会改为其页大小
+        """
+        self.read_latency = read_latency
+        self.write_latency = write_latency
+        self.memory_time = memory_time
+        self.reclaim_time = reclaim_time
+        self.free_list_size = free_list_size
+        self.modified_list_size = modified_list_size
+        self.flush_interval = flush_interval
+        self.flush_batch = flush_batch
+        self.page_size = page_size
+        self.reset()
+
+    def reset(self):
+        self.free_list = OrderedDict()
+        self.modified_list = OrderedDict()
+        self.accesses = 0
+        self.hard_faults = 0
+        self.soft_faults = 0
+        self.disk_reads = 0
+        self.sync_writes = 0  # 在缺页处理路径上同步写回的页数
+        self.background_writes = 0  # 后台写回的页数
+        self.total_time = 0
+
+    def access(self):
+        """记一次内存访问，并按周期触发后台写回。"""
+        self.accesses += 1
+        self.total_time += self.memory_time
+        if self.flush_interval and self.accesses % self.flush_interval == 0:
+            self.flush(self.flush_batch)
+
+    def page_in(self, page_no):
+        """
+        装入页 page_no 的代价。
+        :return: 该页装入后是否仍是脏页(从修改页链表收回时为 True)
+        """
+        if page_no in self.free_list:
+            del self.free_list[page_no]
+            self.soft_faults += 1
+            self.total_time += self.reclaim_time
+            return False
+        if page_no in self.modified_list:
+            del self.modified_list[page_no]
+            self.soft_faults += 1
+            self.total_time += self.reclaim_time
+            return True
+        self.hard_faults += 1
+        self.disk_reads += 1
+        self.total_time += self.read_latency
+        return False
+
+    def page_out(self, page_no, dirty):
+        """淘汰页 page_no：脏页进修改页链表(或同步写回)，干净页进空闲页链表。"""
+        if dirty:
+            if self.modified_list_size <= 0:
+                self._write_sync()
+            else:
+                self.modified_list[page_no] = None
+                if len(self.modified_list) > self.modified_list_size:
+                    oldest, _ = self.modified_list.popitem(last=False)
+                    self._write_sync()
+                    self._add_free(oldest)
+                return
+        self._add_free(page_no)
+
+    def flush(self, max_pages):
+        """后台写回最早的 max_pages 个修改页，写完后它们成为空闲页链表中的干净页。"""
+        for _ in range(min(max_pages, len(self.modified_list))):
+            page_no, _ = self.modified_list.popitem(last=False)
+            self.background_writes += 1
+            self._add_free(page_no)
+
+    def _write_sync(self):
+        self.sync_writes += 1
+        self.total_time += self.write_latency
+
+    def _add_free(self, page_no):
+        if self.free_list_size <= 0:
+            return
+        self.free_list[page_no] = None
+        if len(self.free_list) > self.free_list_size:
+            self.free_list.popitem(last=False)
+
+    @property
+    def disk_writes(self):
+        return self.sync_writes + self.background_writes
+
+    @property
+    def effective_access_time(self):
+        """平均每次访问的时间(纳秒)，后台写回不计入。"""
+        return self.total_time / self.accesses if self.accesses else 0.0
+
+    def report(self):
+        return {
+            "accesses": self.accesses,
+            "hard_faults": self.hard_faults,
+            "soft_faults": self.soft_faults,
+            "disk_reads": self.disk_reads,
+            "sync_writes": self.sync_writes,
+            "background_writes": self.background_writes,
+            "disk_read_bytes": self.disk_reads * self.page_size,
+            "disk_write_bytes": self.disk_writes * self.page_size,
+            "effective_access_time": self.effective_access_time,
+        }
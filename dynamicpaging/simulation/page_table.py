@@ -0,0 +1,201 @@
+from array import array
+
+# NumPy 可选，第一次生成快照视图时才导入(导入引擎本身不付出 NumPy 的启动开销)；
+# None 表示没有安装，没有时快照视图使用 memoryview
+np = False
+
+# 紧凑页表的标志位
+FLAG_VALID = 0x01
+FLAG_MODIFIED = 0x02
+
+PAGE_TABLE_SPARSE = "sparse"
+PAGE_TABLE_COMPACT = "compact"
+PAGE_TABLE_TYPES = (PAGE_TABLE_SPARSE, PAGE_TABLE_COMPACT)
+
+
+class PageTableEntry:
+    """页表项：valid、frame、modified"""
+
+    def __init__(self, valid=False, frame=None, modified=False):
+        self.valid = valid
+        self.frame = frame
+        self.modified = modified
+
+
+class _InvalidEntry(PageTableEntry):
+    """未访问过的页共用的只读无效页表项。"""
+
+    def __setattr__(self, name, value):
+        if name in self.__dict__:
+            raise AttributeError("未分配的页表项是只读的，请先调用 touch()")
+        super().__setattr__(name, value)
+
+
+INVALID_ENTRY = _InvalidEntry()
+
+
+class SparsePageTable:
+    """
+    哈希页表：只为被访问过的页分配页表项，页被淘汰后即回收，
+    占用内存随工作集而不是作业页数增长。
+    按下标读取未分配的页时返回共享的只读无效项，写入前需 touch()。
+    """
+
+    def __init__(self, num_pages):
+        self.num_pages = num_pages
+        self.entries = {}
+
+    def __len__(self):
+        return self.num_pages
+
+    def __getitem__(self, page_no):
+        if page_no < 0 or page_no >= self.num_pages:
+            raise IndexError(f"页号 {page_no} 超出范围(0~{self.num_pages - 1})")
+        return self.entries.get(page_no, INVALID_ENTRY)
+
+    def __iter__(self):
+        """按页号顺序遍历全部页(含未分配的页)，只适合页数较少时用于显示。"""
+        entries = self.entries
+        for page_no in range(self.num_pages):
+            yield entries.get(page_no, INVALID_ENTRY)
+
+    def touch(self, page_no):
+        """取得页表项，不存在时分配一个新的无效项。"""
+        entry = self.entries.get(page_no)
+        if entry is None:
+            entry = self.entries[page_no] = PageTableEntry()
+        return entry
+
+    def discard(self, page_no):
+        """回收页表项。"""
+        self.entries.pop(page_no, None)
+
+    def valid_items(self):
+        """返回 [(页号, 页表项), ...]，只包含当前有效(已装入)的页。"""
+        return [(p, e) for p, e in self.entries.items() if e.valid]
+
+    def clear(self):
+        self.entries.clear()
+
+    def snapshot_views(self):
+        """返回 (flags, frames)，格式与 CompactPageTable 相同；哈希页表需要按页号生成一份。"""
+        flags = bytearray(self.num_pages)
+        frames = array("i", [-1]) * self.num_pages
+        for p, e in self.entries.items():
+            if e.valid:
+                flags[p] = FLAG_VALID | (FLAG_MODIFIED if e.modified else 0)
+                frames[p] = e.frame
+        return _readonly_view(flags, "B"), _readonly_view(frames, "i")
+
+
+class _CompactEntry:
+    """紧凑页表中某一页的页表项视图，读写直接落到底层数组上。"""
+    __slots__ = ("_table", "_page")
+
+    def __init__(self, table, page_no):
+        self._table = table
+        self._page = page_no
+
+    @property
+    def valid(self):
+        return bool(self._table.flags[self._page] & FLAG_VALID)
+
+    @valid.setter
+    def valid(self, value):
+        flags = self._table.flags
+        if value:
+            flags[self._page] |= FLAG_VALID
+        else:
+            flags[self._page] &= ~FLAG_VALID & 0xFF
+
+    @property
+    def modified(self):
+        return bool(self._table.flags[self._page] & FLAG_MODIFIED)
+
+    @modified.setter
+    def modified(self, value):
+        flags = self._table.flags
+        if value:
+            flags[self._page] |= FLAG_MODIFIED
+        else:
+            flags[self._page] &= ~FLAG_MODIFIED & 0xFF
+
+    @property
+    def frame(self):
+        frame = self._table.frames[self._page]
+        return None if frame < 0 else frame
+
+    @frame.setter
+    def frame(self, value):
+        self._table.frames[self._page] = -1 if value is None else value
+
+
+class CompactPageTable:
+    """
+    数组页表：flags 为 bytearray(每页 1 字节，valid / modified 标志位)，
+    frames 为 array('i')(每页 4 字节，-1 表示未装入)，每页共 5 字节。
+    接口与 SparsePageTable 相同，按下标取得的是直接读写数组的页表项视图；
+    snapshot_views() 返回零拷贝的只读视图，适合 GUI 频繁刷新。
+    """
+
+    def __init__(self, num_pages):
+        self.num_pages = num_pages
+        self.flags = bytearray(num_pages)
+        self.frames = array("i", [-1]) * num_pages
+
+    def __len__(self):
+        return self.num_pages
+
+    def __getitem__(self, page_no):
+        if page_no < 0 or page_no >= self.num_pages:
+            raise IndexError(f"页号 {page_no} 超出范围(0~{self.num_pages - 1})")
+        return _CompactEntry(self, page_no)
+
+    def __iter__(self):
+        for page_no in range(self.num_pages):
+            yield _CompactEntry(self, page_no)
+
+    def touch(self, page_no):
+        return self[page_no]
+
+    def discard(self, page_no):
+        self.flags[page_no] = 0
+        self.frames[page_no] = -1
+
+    def valid_items(self):
+        return [(p, _CompactEntry(self, p)) for p, f in enumerate(self.flags) if f & FLAG_VALID]
+
+    def clear(self):
+        self.flags[:] = bytes(self.num_pages)
+        self.frames[:] = array("i", [-1]) * self.num_pages
+
+    def snapshot_views(self):
+        """返回 (flags, frames) 只读视图，不复制数据；有 NumPy 时为 NumPy 数组。"""
+        return _readonly_view(self.flags, "B"), _readonly_view(self.frames, "i")
+
+
+def _load_numpy():
+    global np
+    if np is False:
+        try:
+            import numpy as np
+        except ImportError:
+            np = None
+    return np
+
+
+def _readonly_view(buffer, typecode):
+    if _load_numpy() is not None:
+        view = np.frombuffer(buffer, dtype=np.uint8 if typecode == "B" else np.int32)
+        view.flags.writeable = False
+        return view
+    return memoryview(buffer).toreadonly()
+
+
+def make_page_table(kind, num_pages):
+    """按类型创建页表：PAGE_TABLE_SPARSE 或 PAGE_TABLE_COMPACT。"""
+    if kind == PAGE_TABLE_SPARSE:
+        return SparsePageTable(num_pages)
+    if kind == PAGE_TABLE_COMPACT:
+        return CompactPageTable(num_pages)
+    raise ValueError(f"未知的页表类型 {kind}，可选 {PAGE_TABLE_TYPES}")
@@ -1,46 +1,206 @@
+import copy
+import heapq
+import pickle
+import random
+import sys
 import time
+from array import array
+from bisect import bisect_right
+from collections import deque
+from itertools import repeat
 
+from .page_table import (PageTableEntry, SparsePageTable, CompactPageTable, make_page_table,
+                         FLAG_VALID, FLAG_MODIFIED, PAGE_TABLE_SPARSE, PAGE_TABLE_COMPACT)
+from .tlb import TLB, effective_access_time
+
+# 默认内存几何参数，可在构造 PagingSimulation 时通过 page_size / memory_size 覆盖
 MEMORY_SIZE = 64 * 1024  # 64KB
 BLOCK_SIZE = 1024  # 每块 1KB
 MAX_BLOCKS = MEMORY_SIZE // BLOCK_SIZE  # 64
 MAX_PAGES = 64  # 作业最多可有 64 页(页号范围 0~63)
 OFFSET_MAX = BLOCK_SIZE  # 页内地址最大值(0~1023)
+LOG_CAPACITY = 1000  # 日志环形缓冲区最多保留的记录条数
+
+# 支持的页面置换算法
+POLICY_FIFO = "FIFO"
+POLICY_OPT = "OPT"  # Belady 最佳置换，需要预先知道完整访问串
+POLICIES = (POLICY_FIFO, POLICY_OPT)
+
+# run_trace 中每次访问的结果标志
+ACCESS_MISS = 0  # 缺页
+ACCESS_HIT = 1  # 命中
+ACCESS_INVALID = 2  # 页号或页内地址越界，未执行
+
+
+def compute_next_use(pages):
+    """
+    一次逆向扫描求出每次访问之后该页的下一次访问位置。
+    next_use[i] 为 pages[i] 在 i 之后再次出现的下标，不再出现时为 len(pages)。
+    """
+    n = len(pages)
+    next_use = [n] * n
+    last_seen = {}
+    for i in range(n - 1, -1, -1):
+        p = pages[i]
+        next_use[i] = last_seen.get(p, n)
+        last_seen[p] = i
+    return next_use
+
+
+def _as_list(seq):
+    """
+    把访问序列转成新的 list：NumPy 数组用 tolist() 避免逐元素装箱，None 原样返回。
+    传入的 list 也复制一份(逐元素复制指针，相对逐次访问的开销可以忽略)，
+    Timeline 等会保存并修改结果的调用方不会改动调用者手里的访问串。
+    """
+    if seq is None:
+        return None
+    if isinstance(seq, list):
+        return seq[:]
+    if hasattr(seq, "tolist"):
+        return seq.tolist()
+    return list(seq)
+
+
+class TraceResult:
+    """
+    run_trace 的结果，按访问下标存放紧凑数组：
+    status[i] 为 ACCESS_MISS / ACCESS_HIT / ACCESS_INVALID，
+    victims[i] 为被淘汰的页号(无淘汰为 -1)，phys_addrs[i] 为物理地址(越界为 -1)。
+    """
+
+    def __init__(self, n):
+        self.status = bytearray(n)
+        self.victims = array("i", [-1]) * n
+        self.phys_addrs = array("q", [-1]) * n
+        self.accesses = n
+        self.hits = 0
+        self.faults = 0
+        self.replacements = 0
+        self.dirty_evictions = 0  # 被淘汰时已修改、需要写回的页数
+        self.invalid = 0
+        # 启用 TLB 时的快表命中/未命中次数
+        self.tlb_hits = 0
+        self.tlb_misses = 0
 
+    @property
+    def fault_rate(self):
+        valid = self.accesses - self.invalid
+        return self.faults / valid if valid else 0.0
 
-class PageTableEntry:
-    """页表项：valid、frame、modified"""
+    @property
+    def tlb_hit_rate(self):
+        total = self.tlb_hits + self.tlb_misses
+        return self.tlb_hits / total if total else 0.0
 
-    def __init__(self, valid=False, frame=None, modified=False):
-        self.valid = valid
-        self.frame = frame
-        self.modified = modified
+    def accumulate(self, other):
+        """把另一段结果的计数累加进来(不合并逐次访问数组)，用于分批运行。"""
+        self.accesses += other.accesses
+        self.hits += other.hits
+        self.faults += other.faults
+        self.replacements += other.replacements
+        self.dirty_evictions += other.dirty_evictions
+        self.invalid += other.invalid
+        self.tlb_hits += other.tlb_hits
+        self.tlb_misses += other.tlb_misses
+
+    def extend(self, other):
+        """把紧随其后的另一段结果接到末尾(逐次访问数组和计数都合并)。"""
+        self.status += other.status
+        self.victims.extend(other.victims)
+        self.phys_addrs.extend(other.phys_addrs)
+        self.accumulate(other)
+
+    def effective_access_time(self, **times):
+        """按快表命中率和缺页率计算有效访问时间(纳秒)，times 可覆盖 tlb_time 等参数。"""
+        return effective_access_time(self.tlb_hit_rate, self.fault_rate, **times)
+
+    def summary(self):
+        data = {
+            "accesses": self.accesses,
+            "hits": self.hits,
+            "faults": self.faults,
+            "replacements": self.replacements,
+            "dirty_evictions": self.dirty_evictions,
+            "invalid": self.invalid,
+            "fault_rate": self.fault_rate,
+        }
+        if self.tlb_hits or self.tlb_misses:
+            data["tlb_hit_rate"] = self.tlb_hit_rate
+            data["effective_access_time"] = self.effective_access_time()
+        return data
 
 
 class PagingSimulation:
     """
-    使用“局部置换”（FIFO）模拟请求分页。
+    使用“局部置换”模拟请求分页，默认 FIFO，可选 OPT。
     用户指定：num_pages(页数)、allocated_frames_list(给作业分配的具体物理块号)。
     """
 
-    def __init__(self, num_pages, allocated_frames_list):
+    # 可由 Instrumentation 挂接统计耗时的方法；find_free_frame 的查找长度为扫描的块数
+    INSTRUMENTED_METHODS = {
+        "execute": None,
+        "run_trace": None,
+        "find_free_frame": lambda self: self._free_frame_scan_length(),
+        "log": None,
+    }
+
+    def __init__(self, num_pages, allocated_frames_list, policy=POLICY_FIFO,
+                 page_size=BLOCK_SIZE, memory_size=MEMORY_SIZE, page_table_type=PAGE_TABLE_SPARSE,
+                 tlb=None, io_model=None, prefetcher=None):
         """
-        :param num_pages: 作业拥有的页数(1~64)
+        :param num_pages: 作业拥有的页数(默认界面限制为 1~64，引擎本身不限)
         :param allocated_frames_list: 给作业分配的具体物理块号(list[int])，如 [5,8,9,1]
+        :param policy: 页面置换算法，POLICIES 之一；OPT 需要预先知道完整访问串：用 execute_trace / run_trace
+                       一次给出整段，或先 load_trace 装入后再分段交给 run_trace / execute(Timeline 即如此)
+        :param page_size: 页(块)大小，字节
+        :param memory_size: 物理内存大小，字节；物理块数 = memory_size // page_size
+        :param page_table_type: PAGE_TABLE_SPARSE(哈希页表，适合大而稀疏的地址空间)
+                                或 PAGE_TABLE_COMPACT(数组页表，每页 5 字节，适合页数不多的 GUI)
+        :param tlb: 可选的 TLB 实例，放在页表之前做地址转换
+        :param io_model: 可选的 IOCostModel，统计缺页读盘、脏页写回的时间和磁盘流量
+        :param prefetcher: 可选的 Prefetcher，在按需调页之外预先装入页
         """
+        if policy not in POLICIES:
+            raise ValueError(f"未知的置换算法 {policy}，可选 {POLICIES}")
+        if page_size <= 0 or memory_size < page_size:
+            raise ValueError(f"页大小 {page_size} 与物理内存大小 {memory_size} 不合法")
         self.num_pages = num_pages
+        self.policy = policy
+        self.page_size = page_size
+        self.memory_size = memory_size
+        self.num_frames = memory_size // page_size
+        for fno in allocated_frames_list:
+            if fno < 0 or fno >= self.num_frames:
+                raise ValueError(f"块号 {fno} 超出 [0..{self.num_frames - 1}] 范围")
         # 给作业分配的块号（局部置换时只能用这些块）
         self.allocated_frames_list = allocated_frames_list
-        # 初始化页表(全部 invalid)
-        self.page_table = [PageTableEntry() for _ in range(num_pages)]
+        self.page_table_type = page_table_type
+        self.page_table = make_page_table(page_table_type, num_pages)
+        self.tlb = tlb
+        self.io_model = io_model
+        if io_model is not None:
+            io_model.page_size = page_size
+        self.prefetcher = prefetcher
+        # 已预取、尚未被访问的页
+        self.prefetched = set()
+        # 被淘汰时已修改的页数(含为预取而淘汰的页)
+        self.dirty_evictions = 0
+        # fork 之后与父/子作业共用的共享帧登记表
+        self.shared = None
 
         # FIFO 队列：记录已经装入内存的页号(先进先出)
-        self.fifo_queue = []
+        self.fifo_queue = deque()
         # 记录已经使用的帧号（仅在 allocated_frames_list 范围内）
         self.used_frames = set()
+        # OPT 所需的访问串信息，由 load_trace、execute_trace 或 run_trace 装入
+        self._clear_trace()
 
-        # 日志
-        self.log_lines = []
+        # 日志：环形缓冲区，每条记录为 (序号, 时间戳, 文本)，显示时才格式化
+        self.log_records = deque(maxlen=LOG_CAPACITY)
+        self._log_seq = 0
         self.log(f"初始化：作业共有 {num_pages} 页，分配块号 {allocated_frames_list}。")
+        self.prepage()
 
     def execute(self, op, page_no, offset):
         """
@@ -56,6 +216,16 @@ class PagingSimulation:
         replaced_page = None
         loaded_page = None
 
+        # OPT：取出本次访问之后该页的下一次访问位置
+        next_use = None
+        if self.policy == POLICY_OPT:
+            if self._next_use is None or self._trace_pos >= len(self._next_use):
+                msg = "OPT 置换需要预先给定完整访问串，请使用 execute_trace 或先调用 load_trace"
+                self.log(msg)
+                return msg, None, None
+            next_use = self._next_use[self._trace_pos]
+            self._trace_pos += 1
+
         # 检查页号范围
         if page_no < 0 or page_no >= self.num_pages:
             msg = f"访问页 {page_no} 超出作业页范围(0~{self.num_pages - 1})"
@@ -63,70 +233,557 @@ class PagingSimulation:
             return msg, None, None
 
         # 检查 offset 范围
-        if offset < 0 or offset >= BLOCK_SIZE:
-            msg = f"页内地址 {offset} 超出范围(0~{BLOCK_SIZE - 1})"
+        if offset < 0 or offset >= self.page_size:
+            msg = f"页内地址 {offset} 超出范围(0~{self.page_size - 1})"
             self.log(msg)
             return msg, None, None
 
-        # 获取页表项
-        entry = self.page_table[page_no]
+        if self.io_model is not None:
+            self.io_model.access()
+
+        # 先查快表：命中时可直接得到帧号，否则再查页表
+        tlb_note = ""
+        tlb_hit = False
+        if self.tlb is not None:
+            tlb_hit = self.tlb.lookup(page_no) is not None
+            tlb_note = "(快表命中)" if tlb_hit else "(快表未命中)"
+
+        # 获取页表项(首次访问时才分配)
+        entry = self.page_table.touch(page_no)
         # 如果页表项有效
         if entry.valid:
             # 命中
+            fault = False
+            if page_no in self.prefetched:
+                # 预取的页第一次被用到，避免了一次缺页
+                self.prefetched.discard(page_no)
+                self.prefetcher.useful += 1
+            cow_note = ""
+            if op == "save" and self.shared is not None and self.shared.is_shared(entry.frame):
+                # 写共享页：先复制一份私有的
+                old_frame = entry.frame
+                replaced_page = self._copy_on_write(page_no, entry)
+                cow_note = f", 写时复制 帧 {old_frame} -> {entry.frame}"
+                if replaced_page is not None:
+                    cow_note += f"(淘汰页 {replaced_page})"
+                tlb_hit = False
             frame = entry.frame
+            if self.tlb is not None and not tlb_hit:
+                self.tlb.insert(page_no, frame)
             # 计算物理地址
-            phys_addr = frame * BLOCK_SIZE + offset
+            phys_addr = frame * self.page_size + offset
             # 如果操作是保存
             if op == "save":
                 # 设置页表项为已修改
                 entry.modified = True
+            if next_use is not None:
+                self._touch_opt(page_no, next_use)
             # 构造消息
-            msg = f"操作：{op} 访问页 {page_no} -> 命中, 物理地址={phys_addr}, 无缺页 " + (
-                f"修改页 {page_no}" if entry.modified else "")
+            msg = f"操作：{op} 访问页 {page_no} -> 命中{tlb_note}, 物理地址={phys_addr}, 无缺页 " + (
+                f"修改页 {page_no}" if entry.modified else "") + cow_note
         else:
             # 缺页中断
+            fault = True
+            if self.prefetcher is not None:
+                self.prefetcher.demand_faults += 1
             msg = f"操作：{op} 访问页 {page_no} -> 缺页中断, "
-            # 如果 FIFO 队列尚未装满 allocated_frames_list 的容量
-            if len(self.fifo_queue) < len(self.allocated_frames_list):
+            # 如果已用帧尚未装满 allocated_frames_list 的容量
+            if len(self.used_frames) < len(self.allocated_frames_list):
                 # 找到空闲块
                 frame = self.find_free_frame()
                 msg += f"使用空闲帧 {frame}, "
+            elif not self.fifo_queue and self.shared is not None:
+                # 本作业的帧都被子作业的共享页占着：收回一个
+                frame = self.shared.reclaim(self)
+                msg += f"收回共享帧 {frame}, "
             else:
-                # FIFO 替换
-                # 弹出 FIFO 队列的第一个元素
-                replaced_page = self.fifo_queue.pop(0)
-                # 获取被替换的页表项
-                replaced_entry = self.page_table[replaced_page]
-                # 获取被替换的帧
-                freed_frame = replaced_entry.frame
-                # 设置被替换的页表项无效
-                replaced_entry.valid = False
-                # 设置被替换的页表项的帧为 None
-                replaced_entry.frame = None
-                # 设置被替换的页表项的修改状态为 False
-                replaced_entry.modified = False
-                # 从已使用帧列表中移除被替换的帧
-                self.used_frames.remove(freed_frame)
+                # 按置换算法选出被淘汰的页
+                replaced_page = self.choose_victim()
+                # 淘汰该页，取得被释放的帧
+                freed_frame = self._evict_page(replaced_page)
 
                 msg += f"淘汰页 {replaced_page}, 释放帧 {freed_frame}, "
                 # 设置当前帧为被替换的帧
                 frame = freed_frame
 
+            # 从修改页链表收回的页仍是脏页
+            reclaimed_dirty = self.io_model.page_in(page_no) if self.io_model is not None else False
             entry.valid = True
             entry.frame = frame
-            entry.modified = (op == "save")
+            entry.modified = (op == "save") or reclaimed_dirty
             loaded_page = page_no
 
-            self.fifo_queue.append(page_no)
+            if self.policy == POLICY_FIFO:
+                self.fifo_queue.append(page_no)
+            else:
+                self._touch_opt(page_no, next_use)
             self.used_frames.add(frame)
+            if self.tlb is not None:
+                self.tlb.insert(page_no, frame)
 
-            phys_addr = frame * BLOCK_SIZE + offset
+            phys_addr = frame * self.page_size + offset
             msg += f"装入页 {page_no}, 物理地址={phys_addr}"
             msg += f"  修改页 {page_no}" if entry.modified else ""
 
+        # 按预取器的建议预先装入页
+        if self.prefetcher is not None:
+            prefetched = self._prefetch(self.prefetcher.on_access(page_no, fault), page_no)
+            if prefetched:
+                msg += f", 预取页 {prefetched}"
+
         self.log(msg)
         return msg, replaced_page, loaded_page
 
+    def execute_trace(self, ops, pages, offsets):
+        """
+        按顺序执行一整段访问串，返回每次 execute 的结果列表。
+        OPT 需要预知未来访问：先对本段做一次逆向扫描求出下一次访问位置，运行结束后清除；
+        分段运行时改用 load_trace 装入整条访问串，再交给 run_trace / execute。
+        :param ops: 操作序列
+        :param pages: 页号序列
+        :param offsets: 页内地址序列
+        """
+        ops, pages, offsets = list(ops), list(pages), list(offsets)
+        if not (len(ops) == len(pages) == len(offsets)):
+            raise ValueError("ops、pages、offsets 长度必须一致")
+        if self.policy == POLICY_OPT:
+            self._load_trace(pages)
+        try:
+            return [self.execute(op, p, off) for op, p, off in zip(ops, pages, offsets)]
+        finally:
+            if self.policy == POLICY_OPT:
+                self._clear_trace()
+
+    def run_trace(self, ops, pages, offsets, cache=None):
+        """
+        批量执行访问串的快速路径：不写日志、不构造字符串，结果以紧凑数组返回。
+        与逐次调用 execute 的置换结果和最终页表状态完全一致。
+        :param ops: 操作序列，None 表示全部为只读访问
+        :param pages: 页号序列(list、array.array、NumPy 数组或任意可迭代对象)
+        :param offsets: 页内地址序列，None 表示全部为 0
+        :param cache: 可选的 ResultCache，先查缓存，命中时直接恢复运行后的状态
+        :return: TraceResult
+        """
+        if cache is not None:
+            return self._run_trace_cached(ops, pages, offsets, cache)
+        pages = _as_list(pages)
+        n = len(pages)
+        ops = _as_list(ops)
+        offsets = _as_list(offsets)
+        if (ops is not None and len(ops) != n) or (offsets is not None and len(offsets) != n):
+            raise ValueError("ops、pages、offsets 长度必须一致")
+        if self.prefetcher is not None or self.shared is not None:
+            return self._run_trace_by_execute(ops, pages, offsets)
+        result = TraceResult(n)
+        status = result.status
+        victims = result.victims
+        phys_addrs = result.phys_addrs
+
+        page_table = self.page_table
+        num_pages = self.num_pages
+        page_size = self.page_size
+        capacity = len(self.allocated_frames_list)
+        # 常驻页 -> 帧号、已修改的常驻页
+        valid_items = page_table.valid_items()
+        resident = {p: e.frame for p, e in valid_items}
+        dirty = {p for p, e in valid_items if e.modified}
+        free_frames = [f for f in self.allocated_frames_list if f not in self.used_frames]
+        free_frames.reverse()
+        io = self.io_model
+        tlb = self.tlb
+        if tlb is not None:
+            tlb_hits_before, tlb_misses_before = tlb.hits, tlb.misses
+        is_opt = self.policy == POLICY_OPT
+        # 已用 load_trace 装入完整访问串时，本段从 _trace_pos 处接着运行
+        preloaded = is_opt and self._next_use is not None
+        if is_opt:
+            if not preloaded:
+                self._load_trace(pages)
+            base = self._trace_pos
+            next_use = self._next_use
+            opt_next = self._opt_next
+            heap = self._opt_heap
+            heap_limit = 2 * capacity + 8
+        else:
+            fifo = self.fifo_queue
+
+        hits = faults = replacements = dirty_evictions = invalid = 0
+        ops_iter = repeat(None) if ops is None else ops
+        offsets_iter = repeat(0) if offsets is None else offsets
+        for i, op, page, off in zip(range(n), ops_iter, pages, offsets_iter):
+            if page < 0 or page >= num_pages or off < 0 or off >= page_size:
+                status[i] = ACCESS_INVALID
+                invalid += 1
+                continue
+            if io is not None:
+                io.access()
+            if tlb is not None:
+                tlb_hit = tlb.lookup(page) is not None
+            frame = resident.get(page)
+            if frame is not None:
+                hits += 1
+                status[i] = ACCESS_HIT
+                if tlb is not None and not tlb_hit:
+                    tlb.insert(page, frame)
+                if op == "save":
+                    dirty.add(page)
+                if is_opt:
+                    nu = next_use[base + i]
+                    opt_next[page] = nu
+                    heapq.heappush(heap, (-nu, page))
+            else:
+                faults += 1
+                if free_frames:
+                    frame = free_frames.pop()
+                else:
+                    if is_opt:
+                        while True:
+                            neg_next, victim = heapq.heappop(heap)
+                            if opt_next.get(victim) == -neg_next:
+                                del opt_next[victim]
+                                break
+                    else:
+                        victim = fifo.popleft()
+                    frame = resident.pop(victim)
+                    if victim in dirty:
+                        dirty.discard(victim)
+                        dirty_evictions += 1
+                        if io is not None:
+                            io.page_out(victim, True)
+                    elif io is not None:
+                        io.page_out(victim, False)
+                    replacements += 1
+                    victims[i] = victim
+                    if tlb is not None:
+                        tlb.invalidate(victim)
+                resident[page] = frame
+                if tlb is not None:
+                    tlb.insert(page, frame)
+                reclaimed_dirty = io.page_in(page) if io is not None else False
+                if op == "save" or reclaimed_dirty:
+                    dirty.add(page)
+                if is_opt:
+                    nu = next_use[base + i]
+                    opt_next[page] = nu
+                    heapq.heappush(heap, (-nu, page))
+                else:
+                    fifo.append(page)
+            if is_opt and len(heap) > heap_limit:
+                heap[:] = [(-nu, p) for p, nu in opt_next.items()]
+                heapq.heapify(heap)
+            phys_addrs[i] = frame * page_size + off
+
+        result.hits = hits
+        result.faults = faults
+        result.replacements = replacements
+        result.dirty_evictions = dirty_evictions
+        result.invalid = invalid
+        self.dirty_evictions += dirty_evictions
+        if tlb is not None:
+            result.tlb_hits = tlb.hits - tlb_hits_before
+            result.tlb_misses = tlb.misses - tlb_misses_before
+
+        # 把结果写回页表，使后续 execute / GUI 看到一致的状态
+        page_table.clear()
+        for p, frame in resident.items():
+            e = page_table.touch(p)
+            e.valid = True
+            e.frame = frame
+            e.modified = p in dirty
+        self.used_frames = set(resident.values())
+        if preloaded:
+            self._trace_pos = base + n
+            self._opt_heap = heap
+        elif is_opt:
+            self._clear_trace()
+        return result
+
+    def _run_trace_cached(self, ops, pages, offsets, cache):
+        """
+        键包含引擎源码版本、配置、起始状态(检查点)和整条访问串，命中时恢复结束时的检查点，
+        因此与真正运行一次的结果和状态相同(只是预取器路径不写日志)。
+        共享帧和用 load_trace 装入了完整访问串的 OPT 依赖检查点以外的状态，不经过缓存。
+        """
+        if self.shared is not None or self._next_use is not None:
+            return self.run_trace(ops, pages, offsets)
+        ops, pages, offsets = _as_list(ops), _as_list(pages), _as_list(offsets)
+        config = {
+            "policy": self.policy,
+            "num_pages": self.num_pages,
+            "frames": list(self.allocated_frames_list),
+            "page_size": self.page_size,
+            "memory_size": self.memory_size,
+            "components": [type(c).__name__ for c in (self.tlb, self.io_model, self.prefetcher) if c is not None],
+        }
+        version = cache.engine_version(self, self.page_table, self.tlb, self.io_model, self.prefetcher)
+        start = pickle.dumps(SimulationCheckpoint(self), pickle.HIGHEST_PROTOCOL)
+        key = cache.make_key("paging.run_trace", version, config, start, ops, pages, offsets)
+        cached = cache.get(key)
+        if cached is not None:
+            result, end = cached
+            end.restore_into(self)
+            return result
+        result = self.run_trace(ops, pages, offsets)
+        cache.put(key, (result, SimulationCheckpoint(self)))
+        return result
+
+    def load_trace(self, pages):
+        """
+        为 OPT 预先装入完整访问串，之后可以把它分成若干段依次交给 run_trace / execute，
+        置换结果与一次运行整段相同；reset() 时清除。FIFO 下无需调用。
+        """
+        self._load_trace(_as_list(pages))
+
+    def checkpoint(self):
+        """保存当前模拟状态的紧凑快照(不含日志)，可用 restore 恢复。"""
+        if self.shared is not None:
+            raise ValueError("fork 之后与其他作业共享帧的作业不支持检查点")
+        return SimulationCheckpoint(self)
+
+    def fork(self, allocated_frames_list, **kwargs):
+        """
+        写时复制地创建子作业：子作业的页表只复制父作业的有效页表项，指向同一批物理块，
+        父子双方都以只读方式共享这些块，任一方 "save" 共享页时才复制一份私有的。
+        稀疏页表下从未访问过的页不会产生任何页表项。
+        :param allocated_frames_list: 子作业自己的物理块号，不能与同族作业的块重叠
+        :param kwargs: 传给子作业构造函数的其他参数(tlb、io_model 等)
+        :return: 子作业 PagingSimulation
+        """
+        if self.policy != POLICY_FIFO:
+            raise ValueError("写时复制 fork 只支持 FIFO 置换")
+        if self.shared is None:
+            self.shared = SharedFrames(self.page_size)
+            self.shared.members.append(self)
+        taken = set()
+        for member in self.shared.members:
+            taken.update(member.allocated_frames_list)
+        overlap = taken.intersection(allocated_frames_list)
+        if overlap:
+            raise ValueError(f"块号 {sorted(overlap)} 已分配给同族作业")
+        child = PagingSimulation(self.num_pages, allocated_frames_list, policy=self.policy,
+                                 page_size=self.page_size, memory_size=self.memory_size,
+                                 page_table_type=self.page_table_type, **kwargs)
+        child.shared = self.shared
+        self.shared.members.append(child)
+        inherited = self.shared.share(self, child)
+        child.log(f"fork：与父作业共享 {inherited} 页(写时复制)")
+        self.log(f"fork：子作业共享本作业 {inherited} 页")
+        return child
+
+    def cow_report(self):
+        """写时复制统计，见 SharedFrames.report；未 fork 过时返回 None。"""
+        return self.shared.report() if self.shared is not None else None
+
+    def _copy_on_write(self, page_no, entry):
+        """
+        把共享页 page_no 复制到本作业的一个帧中(必要时淘汰一页，但不淘汰 page_no 本身)，
+        返回被淘汰的页号或 None。拿不到帧时(只有本页常驻)让其他作业放弃共享，原地写。
+        """
+        shared = self.shared
+        old_frame = entry.frame
+        replaced_page = None
+        if len(self.used_frames) < len(self.allocated_frames_list):
+            frame = self.find_free_frame()
+        else:
+            victim = next((p for p in self.fifo_queue if p != page_no), None)
+            if victim is not None:
+                self.fifo_queue.remove(victim)
+                frame = self._evict_page(victim)
+                replaced_page = victim
+            else:
+                frame = shared.reclaim(self)
+        if frame is None:
+            shared.unshare(old_frame)
+            return replaced_page
+        is_owner = shared.drop(old_frame, self)
+        entry.frame = frame
+        self.used_frames.add(frame)
+        if not is_owner:
+            # 复制出的私有页从此按本作业的 FIFO 参与置换
+            self.fifo_queue.append(page_no)
+        shared.cow_copies += 1
+        return replaced_page
+
+    def restore(self, checkpoint):
+        """恢复到 checkpoint 保存时的状态；同一快照可以反复恢复。"""
+        checkpoint.restore_into(self)
+
+    def _evict_page(self, page_no):
+        """淘汰常驻页 page_no，返回被释放的帧号。"""
+        # 获取被替换的页表项
+        entry = self.page_table[page_no]
+        # 获取被替换的帧
+        frame = entry.frame
+        if self.shared is not None:
+            # 共享给子作业的页被换出，子作业再访问时重新缺页
+            self.shared.unshare(frame)
+        if entry.modified:
+            self.dirty_evictions += 1
+        # 脏页需要写回(或进入修改页链表)
+        if self.io_model is not None:
+            self.io_model.page_out(page_no, entry.modified)
+        # 设置被替换的页表项无效、帧为 None、修改状态为 False
+        entry.valid = False
+        entry.frame = None
+        entry.modified = False
+        # 回收被替换的页表项，并使快表中的对应项失效
+        self.page_table.discard(page_no)
+        if self.tlb is not None:
+            self.tlb.invalidate(page_no)
+        # 从已使用帧列表中移除被替换的帧
+        self.used_frames.remove(frame)
+        # 预取后一直没被访问就被淘汰
+        if page_no in self.prefetched:
+            self.prefetched.discard(page_no)
+            self.prefetcher.wasted += 1
+        return frame
+
+    def _prefetch(self, pages, current_page, allow_evict=True):
+        """
+        预先装入 pages 中尚未驻留的页，按当前置换算法登记，需要时照常淘汰页，
+        但不会为预取淘汰刚访问的页 current_page。返回实际预取的页号列表。
+        """
+        loaded = []
+        capacity = len(self.allocated_frames_list)
+        for p in pages:
+            if p < 0 or p >= self.num_pages or self.page_table[p].valid:
+                continue
+            if len(self.used_frames) < capacity:
+                frame = self.find_free_frame()
+            elif not allow_evict or self._peek_victim() == current_page:
+                break
+            else:
+                frame = self._evict_page(self.choose_victim())
+            reclaimed_dirty = self.io_model.page_in(p) if self.io_model is not None else False
+            entry = self.page_table.touch(p)
+            entry.valid = True
+            entry.frame = frame
+            entry.modified = reclaimed_dirty
+            if self.policy == POLICY_FIFO:
+                self.fifo_queue.append(p)
+            else:
+                self._touch_opt(p, self._next_occurrence(p))
+            self.used_frames.add(frame)
+            self.prefetched.add(p)
+            self.prefetcher.issued += 1
+            loaded.append(p)
+        return loaded
+
+    def prepage(self):
+        """作业开始时按预取器给出的初始页做预调页，只使用空闲帧。"""
+        if self.prefetcher is None:
+            return
+        loaded = self._prefetch(self.prefetcher.initial_pages(), None, allow_evict=False)
+        if loaded:
+            self.log(f"预调页：装入页 {loaded}")
+
+    def _peek_victim(self):
+        """返回 choose_victim 将要淘汰的页，但不改变任何状态。"""
+        if self.policy == POLICY_FIFO:
+            return self.fifo_queue[0]
+        heap = self._opt_heap
+        while self._opt_next.get(heap[0][1]) != -heap[0][0]:
+            heapq.heappop(heap)
+        return heap[0][1]
+
+    def _next_occurrence(self, page_no):
+        """
+        OPT 下预取页的下一次访问位置(当前访问之后)。
+        不在已装入访问串的剩余部分中出现的页视为永不访问，返回访问串长度；
+        未装入访问串时同样视为永不访问，返回 sys.maxsize。
+        """
+        if self._next_use is None:
+            return sys.maxsize
+        occ = self._occurrences.get(page_no)
+        if occ:
+            i = bisect_right(occ, self._trace_pos - 1)
+            if i < len(occ):
+                return occ[i]
+        return len(self._next_use)
+
+    def _run_trace_by_execute(self, ops, pages, offsets):
+        """启用预取或有共享帧时 run_trace 的实现：逐次调用 execute(会写日志)，再整理成 TraceResult。"""
+        n = len(pages)
+        result = TraceResult(n)
+        tlb = self.tlb
+        if tlb is not None:
+            tlb_hits_before, tlb_misses_before = tlb.hits, tlb.misses
+        dirty_before = self.dirty_evictions
+        preloaded = self.policy == POLICY_OPT and self._next_use is not None
+        if self.policy == POLICY_OPT and not preloaded:
+            self._load_trace(pages)
+        try:
+            for i, page in enumerate(pages):
+                op = ops[i] if ops is not None else None
+                off = offsets[i] if offsets is not None else 0
+                if page < 0 or page >= self.num_pages or off < 0 or off >= self.page_size:
+                    result.status[i] = ACCESS_INVALID
+                    result.invalid += 1
+                    if self.policy == POLICY_OPT:
+                        self._trace_pos += 1
+                    continue
+                _, replaced_page, loaded_page = self.execute(op, page, off)
+                if loaded_page is None:
+                    result.status[i] = ACCESS_HIT
+                    result.hits += 1
+                else:
+                    result.faults += 1
+                if replaced_page is not None:
+                    result.victims[i] = replaced_page
+                    result.replacements += 1
+                result.phys_addrs[i] = self.page_table[page].frame * self.page_size + off
+        finally:
+            if self.policy == POLICY_OPT and not preloaded:
+                self._clear_trace()
+        result.dirty_evictions = self.dirty_evictions - dirty_before
+        if tlb is not None:
+            result.tlb_hits = tlb.hits - tlb_hits_before
+            result.tlb_misses = tlb.misses - tlb_misses_before
+        return result
+
+    def choose_victim(self):
+        """按当前置换算法选出被淘汰的页号(调用前内存必须已满)。"""
+        if self.policy == POLICY_FIFO:
+            return self.fifo_queue.popleft()
+        # OPT：堆顶是下一次访问最远的页，跳过已经过期的堆项
+        heap = self._opt_heap
+        while True:
+            neg_next, page = heapq.heappop(heap)
+            if self._opt_next.get(page) == -neg_next:
+                del self._opt_next[page]
+                return page
+
+    def _touch_opt(self, page_no, next_use):
+        """更新常驻页的下一次访问位置；过期堆项过多时按常驻页重建堆，保持堆大小为 O(k)。"""
+        self._opt_next[page_no] = next_use
+        heapq.heappush(self._opt_heap, (-next_use, page_no))
+        if len(self._opt_heap) > 2 * len(self.allocated_frames_list) + 8:
+            self._opt_heap = [(-nu, p) for p, nu in self._opt_next.items()]
+            heapq.heapify(self._opt_heap)
+
+    def _load_trace(self, pages):
+        # 重新装入时丢弃上一条访问串的全部状态
+        self._clear_trace()
+        self._next_use = compute_next_use(pages)
+        # 已常驻的页不在本段访问串中出现时视为永不再访问
+        self._opt_next = {p: len(pages) for p, _ in self.page_table.valid_items()}
+        for i in range(len(pages) - 1, -1, -1):
+            if pages[i] in self._opt_next:
+                self._opt_next[pages[i]] = i
+        self._opt_heap = [(-nu, p) for p, nu in self._opt_next.items()]
+        heapq.heapify(self._opt_heap)
+        # 预取时需要查任意页的下一次访问位置
+        if self.prefetcher is not None:
+            for i, p in enumerate(pages):
+                self._occurrences.setdefault(p, []).append(i)
+
+    def _clear_trace(self):
+        self._next_use = None
+        self._trace_pos = 0
+        self._opt_heap = []
+        self._opt_next = {}
+        self._occurrences = {}
+
     def find_free_frame(self):
         """
         在 allocated_frames_list 中找一个尚未使用的帧号返回(选最小或第一个可用)。
@@ -137,25 +794,257 @@ class PagingSimulation:
         # 理论上不会走到这里，因为若还没满就应该有可用帧
         return self.allocated_frames_list[0]
 
+    def _free_frame_scan_length(self):
+        for i, f in enumerate(self.allocated_frames_list):
+            if f not in self.used_frames:
+                return i + 1
+        return len(self.allocated_frames_list)
+
     def log(self, text):
-        timestamp = time.strftime("%H:%M:%S")
-        line = f"[{timestamp}] {text}"
-        self.log_lines.append(line)
+        self._log_seq += 1
+        self.log_records.append((self._log_seq, time.time(), text))
+
+    @staticmethod
+    def format_log_record(record):
+        """把一条日志记录格式化为 "[HH:MM:SS] 文本"。"""
+        _, ts, text = record
+        return f"[{time.strftime('%H:%M:%S', time.localtime(ts))}] {text}"
+
+    @property
+    def log_lines(self):
+        """缓冲区内全部日志的格式化文本(按需生成)。"""
+        return [self.format_log_record(r) for r in self.log_records]
+
+    def log_records_since(self, seq):
+        """返回序号大于 seq 的日志记录(按时间顺序)，供 GUI 增量追加。"""
+        new_records = []
+        for record in reversed(self.log_records):
+            if record[0] <= seq:
+                break
+            new_records.append(record)
+        new_records.reverse()
+        return new_records
+
+    def get_page_table_views(self):
+        """
+        返回页表的 (flags, frames) 视图：flags[i] 含 FLAG_VALID / FLAG_MODIFIED 位，
+        frames[i] 为帧号(-1 表示未装入)。紧凑页表下为零拷贝只读视图。
+        """
+        return self.page_table.snapshot_views()
 
     def get_page_table_snapshot(self):
         """返回当前页表信息，用于GUI显示。每项为 (页号, valid, frame, modified)。"""
+        flags, frames = self.get_page_table_views()
         data = []
-        for i, e in enumerate(self.page_table):
-            valid = 1 if e.valid else 0
-            frame = e.frame if e.frame is not None else "-"
-            modified = 1 if e.modified else 0
-            data.append((i, valid, frame, modified))
+        for i in range(self.num_pages):
+            f = flags[i]
+            frame = int(frames[i])
+            data.append((i, 1 if f & FLAG_VALID else 0, frame if frame >= 0 else "-",
+                         1 if f & FLAG_MODIFIED else 0))
         return data
 
     def reset(self):
         """重置模拟状态：全部无效，FIFO 队列清空，used_frames 清空。"""
-        self.page_table = [PageTableEntry() for _ in range(self.num_pages)]
-        self.fifo_queue = []
+        self.page_table.clear()
+        self.fifo_queue = deque()
         self.used_frames = set()
-        self.log_lines = []
+        self._clear_trace()
+        if self.tlb is not None:
+            self.tlb.flush()
+            self.tlb.reset_stats()
+        if self.io_model is not None:
+            self.io_model.reset()
+        self.prefetched = set()
+        self.dirty_evictions = 0
+        if self.prefetcher is not None:
+            self.prefetcher.reset()
+        if self.shared is not None:
+            self.shared.detach(self)
+        self.log_records.clear()
         self.log("模拟状态已重置。")
+        self.prepage()
+
+
+class SharedFrame:
+    """共享帧登记表中的一项：属主作业、属主是否仍映射、其他映射该帧的作业集合、页号。"""
+
+    __slots__ = ("owner", "owner_maps", "others", "page_no")
+
+    def __init__(self, owner, page_no):
+        self.owner = owner
+        self.owner_maps = True
+        self.others = set()
+        self.page_no = page_no
+
+
+class SharedFrames:
+    """
+    一族 fork 出来的作业共用的共享帧登记表，只登记被多个作业映射过的帧：
+    frames[帧号] = SharedFrame。
+    帧属于属主的 allocated_frames_list；属主写时复制后不再映射该帧，
+    但在其他作业放弃映射之前该帧仍占着属主的一个块。
+    """
+
+    def __init__(self, page_size):
+        self.page_size = page_size
+        self.frames = {}
+        self.members = []
+        self.forks = 0
+        self.forked_pages = 0  # fork 时共享(按急切复制需要复制)的页数
+        self.cow_copies = 0  # 实际发生的写时复制次数
+
+    def share(self, parent, child):
+        """把 parent 的全部有效页以只读方式映射进 child，返回共享的页数。"""
+        count = 0
+        for p, e in parent.page_table.valid_items():
+            ce = child.page_table.touch(p)
+            if ce.valid:
+                continue  # 子作业预调页已装入
+            ce.valid = True
+            ce.frame = e.frame
+            ce.modified = e.modified
+            info = self.frames.get(e.frame)
+            if info is None:
+                info = self.frames[e.frame] = SharedFrame(parent, p)
+            info.others.add(child)
+            count += 1
+        self.forks += 1
+        self.forked_pages += count
+        return count
+
+    def refcount(self, frame):
+        info = self.frames.get(frame)
+        if info is None:
+            return 1
+        return int(info.owner_maps) + len(info.others)
+
+    def is_shared(self, frame):
+        return self.refcount(frame) > 1
+
+    def drop(self, frame, sim):
+        """
+        sim 不再映射 frame(写时复制后)。引用数降为 0 时帧还给属主；
+        只剩属主映射时取消登记，恢复为属主的私有页。返回 sim 是否为属主。
+        """
+        info = self.frames[frame]
+        owner = info.owner
+        if sim is owner:
+            info.owner_maps = False
+        else:
+            info.others.discard(sim)
+        if not info.owner_maps and not info.others:
+            del self.frames[frame]
+            owner.used_frames.discard(frame)
+        elif info.owner_maps and not info.others:
+            del self.frames[frame]
+        return sim is owner
+
+    def unshare(self, frame):
+        """让属主之外的作业放弃对 frame 的映射(属主换出该页或原地写时)，它们之后访问会缺页。"""
+        info = self.frames.pop(frame, None)
+        if info is None:
+            return
+        page_no = info.page_no
+        for sim in info.others:
+            sim.page_table.discard(page_no)
+            if sim.tlb is not None:
+                sim.tlb.invalidate(page_no)
+
+    def reclaim(self, owner):
+        """收回一个属主已不再映射、只被其他作业占着的帧，没有时返回 None。"""
+        for frame, info in self.frames.items():
+            if info.owner is owner and not info.owner_maps:
+                self.unshare(frame)
+                owner.used_frames.discard(frame)
+                return frame
+        return None
+
+    def detach(self, sim):
+        """sim 重置时解除它参与的全部共享。"""
+        for frame, info in list(self.frames.items()):
+            if info.owner is sim:
+                self.unshare(frame)
+            elif sim in info.others:
+                self.drop(frame, sim)
+
+    def report(self):
+        avoided = self.forked_pages - self.cow_copies
+        return {
+            "forks": self.forks,
+            "shared_pages_at_fork": self.forked_pages,
+            "cow_copies": self.cow_copies,
+            "copies_avoided": avoided,
+            "memory_saved_bytes": avoided * self.page_size,
+            "shared_frames": sum(1 for f in self.frames if self.is_shared(f)),
+        }
+
+
+class SimulationCheckpoint:
+    """
+    PagingSimulation 的状态快照。页表只保存常驻页(页号、帧号、修改位三个数组)，
+    大小与分配的物理块数而不是作业页数成正比；TLB、I/O 模型、预取器的状态整体复制。
+    """
+
+    def __init__(self, sim):
+        resident = sim.page_table.valid_items()
+        self.pages = array("i", [p for p, _ in resident])
+        self.frames = array("i", [e.frame for _, e in resident])
+        self.modified = bytes(1 if e.modified else 0 for _, e in resident)
+        self.fifo = array("i", sim.fifo_queue)
+        self.prefetched = frozenset(sim.prefetched)
+        self.dirty_evictions = sim.dirty_evictions
+        # OPT 装入了访问串时的位置和常驻页的下一次访问位置
+        self.trace_pos = sim._trace_pos
+        self.opt_next = dict(sim._opt_next) if sim._next_use is not None else None
+        self.tlb = _copy_state(sim.tlb)
+        self.io_model = _copy_state(sim.io_model)
+        self.prefetcher = _copy_state(sim.prefetcher)
+
+    def restore_into(self, sim):
+        page_table = sim.page_table
+        page_table.clear()
+        for p, frame, modified in zip(self.pages, self.frames, self.modified):
+            e = page_table.touch(p)
+            e.valid = True
+            e.frame = frame
+            e.modified = bool(modified)
+        sim.used_frames = set(self.frames)
+        sim.fifo_queue = deque(self.fifo)
+        sim.prefetched = set(self.prefetched)
+        sim.dirty_evictions = self.dirty_evictions
+        if self.opt_next is not None:
+            sim._trace_pos = self.trace_pos
+            sim._opt_next = dict(self.opt_next)
+            sim._opt_heap = [(-nu, p) for p, nu in sim._opt_next.items()]
+            heapq.heapify(sim._opt_heap)
+        elif sim._next_use is not None:
+            # 快照时没有装入访问串
+            sim._clear_trace()
+        _restore_state(sim.tlb, self.tlb)
+        _restore_state(sim.io_model, self.io_model)
+        _restore_state(sim.prefetcher, self.prefetcher)
+
+
+def _copy_state(obj):
+    return None if obj is None else _deepcopy_state(obj.__dict__)
+
+
+def _restore_state(obj, state):
+    """把保存的属性复制回原对象，保持外部持有的 TLB 等对象引用仍然有效。"""
+    if obj is not None and state is not None:
+        obj.__dict__.clear()
+        obj.__dict__.update(_deepcopy_state(state))
+
+
+def _deepcopy_state(state):
+    """
+    深复制属性字典。deepcopy 会逐个复制 random.Random 内部状态的 625 个整数，
+    比复制其余状态慢一个数量级，这里预先用 getstate/setstate 复制好放入 memo。
+    """
+    memo = {}
+    for value in state.values():
+        if isinstance(value, random.Random):
+            rng = random.Random.__new__(type(value))
+            rng.setstate(value.getstate())
+            memo[id(value)] = rng
+    return copy.deepcopy(state, memo)
@@ -0,0 +1,108 @@
+class Prefetcher:
+    """
+    预取器基类。PagingSimulation 在每次访问后调用 on_access 取得要预先装入的页，
+    在作业开始(初始化或重置)时调用 initial_pages 做预调页。
+    统计数据由模拟器回填：
+      issued  实际预取装入的页数
+      useful  预取后在被淘汰前被访问到的页数(即避免的缺页数)
+      wasted  预取后未被访问就被淘汰的页数
+      demand_faults 预取未能避免、仍然发生的缺页数
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """清零统计数据(模拟重置时调用)；有内部状态的子类在此一并清除。"""
+        self.issued = 0
+        self.useful = 0
+        self.wasted = 0
+        self.demand_faults = 0
+
+    def on_access(self, page_no, fault):
+        """返回本次访问后建议预取的页号列表。"""
+        return ()
+
+    def initial_pages(self):
+        """返回作业开始时预先装入的页号列表。"""
+        return ()
+
+    @property
+    def accuracy(self):
+        """准确率：预取的页中后来真正被用到的比例。"""
+        return self.useful / self.issued if self.issued else 0.0
+
+    @property
+    def coverage(self):
+        """覆盖率：原本会发生的缺页中被预取消除的比例。"""
+        total = self.useful + self.demand_faults
+        return self.useful / total if total else 0.0
+
+    def report(self):
+        return {
+            "issued": self.issued,
+            "useful": self.useful,
+            "wasted": self.wasted,
+            "faults_avoided": self.useful,
+            "demand_faults": self.demand_faults,
+            "accuracy": self.accuracy,
+            "coverage": self.coverage,
+        }
+
+
+class SequentialPrefetcher(Prefetcher):
+    """顺序预取：缺页时顺带装入其后的 degree 页。"""
+
+    def __init__(self, degree=1):
+        super().__init__()
+        self.degree = degree
+
+    def on_access(self, page_no, fault):
+        if not fault:
+            return ()
+        return range(page_no + 1, page_no + 1 + self.degree)
+
+
+class StridePrefetcher(Prefetcher):
+    """步长预取：连续两次访问的页号差相同(且不为 0)时，沿该步长预取 degree 页。"""
+
+    def __init__(self, degree=1):
+        super().__init__()
+        self.degree = degree
+
+    def reset(self):
+        super().reset()
+        self.last_page = None
+        self.last_stride = 0
+
+    def on_access(self, page_no, fault):
+        pages = ()
+        if self.last_page is not None:
+            stride = page_no - self.last_page
+            if stride != 0 and stride == self.last_stride:
+                pages = [page_no + stride * k for k in range(1, self.degree + 1)]
+            self.last_stride = stride
+        self.last_page = page_no
+        return pages
+
+
+class WorkingSetPrepager(Prefetcher):
+    """
+    工作集预调页：作业开始时一次装入给定的工作集(如上次运行时的驻留页，
+    或用 working_set_of 从访问串开头求得)。
+    """
+
+    def __init__(self, pages):
+        super().__init__()
+        self.pages = list(pages)
+
+    def initial_pages(self):
+        return self.pages
+
+
+def working_set_of(pages, window):
+    """返回访问串前 window 次访问涉及的不同页(按首次出现的顺序)。"""
+    seen = {}
+    for p in list(pages[:window]):
+        seen.setdefault(p, None)
+    return list(seen)
@@ -0,0 +1,106 @@
+import csv
+from array import array
+
+
+class FenwickTree:
+    """树状数组：单点加、前缀和，均为 O(log n)。"""
+
+    def __init__(self, size):
+        self.size = size
+        self.tree = [0] * (size + 1)
+
+    def add(self, index, delta):
+        """给位置 index(0 起) 加上 delta。"""
+        i = index + 1
+        tree = self.tree
+        size = self.size
+        while i <= size:
+            tree[i] += delta
+            i += i & -i
+
+    def prefix_sum(self, index):
+        """返回位置 0..index-1 的和。"""
+        total = 0
+        tree = self.tree
+        i = index
+        while i > 0:
+            total += tree[i]
+            i -= i & -i
+        return total
+
+
+def compute_stack_distances(pages):
+    """
+    Mattson 栈距离：一次扫描求出每次访问在 LRU 栈中的深度(从 1 开始)。
+    首次访问(冷缺页)的栈距离记为 -1。
+    用树状数组标记每个页最近一次访问的位置，两次访问之间的不同页数即区间内标记数，
+    整体复杂度 O(n log n)。
+    """
+    pages = pages.tolist() if hasattr(pages, "tolist") else list(pages)
+    n = len(pages)
+    distances = array("i", [-1]) * n
+    tree = FenwickTree(n)
+    last_pos = {}
+    for i, p in enumerate(pages):
+        t = last_pos.get(p)
+        if t is not None:
+            # (t, i) 之间被标记的位置数 = 其间访问过的不同页数
+            distances[i] = tree.prefix_sum(i) - tree.prefix_sum(t + 1) + 1
+            tree.add(t, -1)
+        tree.add(i, 1)
+        last_pos[p] = i
+    return distances
+
+
+class StackDistanceAnalyzer:
+    """
+    对整段访问串做一次栈距离分析，同时得到 LRU 在 1~N 个物理块下的缺页次数和缺页率曲线，
+    代替按每个块数各跑一遍 PagingSimulation。
+    """
+
+    def __init__(self, pages):
+        self.distances = compute_stack_distances(pages)
+        self.accesses = len(self.distances)
+        # histogram[d] 为栈距离等于 d 的访问次数(d >= 1)
+        self.histogram = [0]
+        self.cold_misses = 0
+        for d in self.distances:
+            if d < 0:
+                self.cold_misses += 1
+                continue
+            if d >= len(self.histogram):
+                self.histogram.extend([0] * (d + 1 - len(self.histogram)))
+            self.histogram[d] += 1
+        # 不同页数：块数达到该值后只剩冷缺页
+        self.distinct_pages = self.cold_misses
+
+    def fault_counts(self, max_frames=None):
+        """
+        返回列表 faults，faults[c - 1] 为 c 个物理块时 LRU 的缺页次数(c = 1..max_frames)。
+        :param max_frames: 最大块数，默认为访问串中的不同页数
+        """
+        if max_frames is None:
+            max_frames = max(self.distinct_pages, 1)
+        hist = self.histogram
+        # 栈距离 > c 的访问都会缺页：从大到小累加后缀和
+        beyond = sum(hist[max_frames + 1:])
+        faults = [0] * max_frames
+        for c in range(max_frames, 0, -1):
+            faults[c - 1] = self.cold_misses + beyond
+            if c < len(hist):
+                beyond += hist[c]
+        return faults
+
+    def miss_ratio_curve(self, max_frames=None):
+        """返回 [(块数, 缺页次数, 缺页率), ...]。"""
+        faults = self.fault_counts(max_frames)
+        n = self.accesses
+        return [(c, f, f / n if n else 0.0) for c, f in enumerate(faults, start=1)]
+
+    def export_csv(self, path, max_frames=None):
+        """把缺页率曲线导出为 CSV 表格。"""
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["frames", "faults", "miss_ratio"])
+            for c, faults, ratio in self.miss_ratio_curve(max_frames):
+                writer.writerow([c, faults, f"{ratio:.6f}"])
@@ -0,0 +1,143 @@
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+from .paging_simulation import PagingSimulation, POLICIES, POLICY_FIFO
+
+# 工作进程内缓存：共享内存名 -> 页号列表，同一条访问串在每个进程中只解码一次
+_worker_traces = {}
+
+
+def _attach_trace(shm_name, length):
+    """在工作进程中按名字挂接共享内存，读出访问串(int32)。"""
+    pages = _worker_traces.get(shm_name)
+    if pages is None:
+        shm = shared_memory.SharedMemory(name=shm_name)
+        try:
+            view = shm.buf[:length * 4].cast("i")
+            pages = view.tolist()
+            view.release()
+        finally:
+            shm.close()
+        _worker_traces[shm_name] = pages
+    return pages
+
+
+def _run_point(task):
+    """工作进程执行一个 (访问串, 置换算法, 块数) 组合，返回缺页次数。"""
+    shm_name, length, num_pages, policy, frames = task
+    pages = _attach_trace(shm_name, length)
+    sim = PagingSimulation(num_pages, list(range(frames)), policy)
+    result = sim.run_trace(None, pages, None)
+    return result.faults
+
+
+class SweepResult:
+    """扫描结果：points 为每个组合的记录，anomalies 为检测到的 Belady 异常。"""
+
+    def __init__(self, points):
+        self.points = points
+        self.anomalies = find_belady_anomalies(points)
+
+    def table(self):
+        """返回表格行：(访问串, 置换算法, 块数, 缺页次数, 缺页率)。"""
+        return [(p["trace"], p["policy"], p["frames"], p["faults"], p["fault_rate"]) for p in self.points]
+
+
+def find_belady_anomalies(points, policy=POLICY_FIFO):
+    """
+    找出 Belady 异常：同一访问串上块数增加而缺页次数反而增加的情形。
+    :return: [(访问串, 较少块数, 较多块数, 较少块数时缺页, 较多块数时缺页), ...]
+    """
+    by_trace = {}
+    for p in points:
+        if p["policy"] == policy:
+            by_trace.setdefault(p["trace"], []).append((p["frames"], p["faults"]))
+    anomalies = []
+    for name, series in by_trace.items():
+        series.sort()
+        for (f1, faults1), (f2, faults2) in zip(series, series[1:]):
+            if faults2 > faults1:
+                anomalies.append((name, f1, f2, faults1, faults2))
+    return anomalies
+
+
+def run_sweep(traces, frame_counts, policies=POLICIES, max_workers=None, cache=None):
+    """
+    在进程池中对 访问串 × 置换算法 × 块数 的全部组合运行 PagingSimulation。
+    每条访问串只写入一次共享内存，工作进程按名字挂接，不随任务逐个 pickle。
+    :param traces: {名称: 页号序列}
+    :param frame_counts: 要扫描的块数序列
+    :param policies: 要比较的置换算法
+    :param max_workers: 进程数，为 0 时在当前进程内串行执行
+    :param cache: 可选的 ResultCache；已缓存的组合不再运行，只把其余组合交给进程池
+    :return: SweepResult
+    """
+    frame_counts = list(frame_counts)
+    # 与 run_trace 一样按整个 simulation 包计算版本，页表、TLB 等模块改动后扫描结果也失效
+    version = cache.engine_version(PagingSimulation) if cache is not None else None
+    segments = {}
+    tasks = []
+    keys = []
+    faults = {}  # keys 下标 -> 缺页次数
+    pending = []  # 需要运行的组合：(keys 下标, 缓存键)
+    try:
+        for name, pages in traces.items():
+            data = array("i", pages.tolist() if hasattr(pages, "tolist") else pages)
+            num_pages = max(data) + 1 if data else 1
+            shm = None
+            # 每条访问串只计算一次内容摘要，各组合的键只含摘要
+            digest = cache.make_key("paging.trace", None, None, data) if cache is not None else None
+            for policy in policies:
+                for frames in frame_counts:
+                    i = len(keys)
+                    keys.append((name, policy, frames, len(data)))
+                    cache_key = None
+                    if cache is not None:
+                        cache_key = cache.make_key("paging.sweep", version,
+                                                   {"policy": policy, "frames": frames, "num_pages": num_pages,
+                                                    "trace": digest})
+                        cached = cache.get(cache_key)
+                        if cached is not None:
+                            faults[i] = cached
+                            continue
+                    if shm is None:
+                        # 长度为 0 的共享内存不合法，至少申请 1 字节
+                        shm = shared_memory.SharedMemory(create=True, size=max(len(data) * 4, 1))
+                        shm.buf[:len(data) * 4] = data.tobytes()
+                        segments[name] = shm
+                    tasks.append((shm.name, len(data), num_pages, policy, frames))
+                    pending.append((i, cache_key))
+
+        if not tasks:
+            computed = []
+        elif max_workers == 0:
+            computed = [_run_point(t) for t in tasks]
+            _worker_traces.clear()
+        else:
+            workers = max_workers or os.cpu_count() or 1
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                chunksize = max(1, len(tasks) // (4 * workers))
+                computed = list(pool.map(_run_point, tasks, chunksize=chunksize))
+    finally:
+        for shm in segments.values():
+            shm.close()
+            shm.unlink()
+
+    for (i, cache_key), f in zip(pending, computed):
+        faults[i] = f
+        if cache is not None:
+            cache.put(cache_key, f)
+
+    points = []
+    for i, (name, policy, frames, length) in enumerate(keys):
+        f = faults[i]
+        points.append({
+            "trace": name,
+            "policy": policy,
+            "frames": frames,
+            "faults": f,
+            "fault_rate": f / length if length else 0.0,
+        })
+    return SweepResult(points)
@@ -0,0 +1,363 @@
+from collections import deque
+
+# 置换范围
+REPLACE_LOCAL = "local"  # 只在本作业的驻留页中选淘汰页
+REPLACE_GLOBAL = "global"  # 在全部作业的驻留页中选淘汰页(系统级 FIFO)
+REPLACEMENT_SCOPES = (REPLACE_LOCAL, REPLACE_GLOBAL)
+
+# 局部置换下的物理块分配策略
+ALLOC_FIXED = "fixed"  # 平均分配
+ALLOC_WORKING_SET = "working_set"  # 按工作集大小分配，总需求超过内存时挂起作业
+ALLOC_PFF = "pff"  # 按缺页频率增减
+ALLOCATION_POLICIES = (ALLOC_FIXED, ALLOC_WORKING_SET, ALLOC_PFF)
+
+
+class FrameBitmap:
+    """
+    空闲块位图：每个物理块占 1 字节(0 空闲、1 已用)，
+    借助 bytearray.find 在 C 层查找第一个空闲块；_hint 记录最小可能空闲块号，避免从头扫描。
+    """
+
+    def __init__(self, num_frames):
+        self.num_frames = num_frames
+        self.used = bytearray(num_frames)
+        self.free_count = num_frames
+        self._hint = 0
+
+    def allocate(self):
+        """分配编号最小的空闲块，无空闲块时返回 None。"""
+        if self.free_count == 0:
+            return None
+        frame = self.used.find(0, self._hint)
+        self.used[frame] = 1
+        self.free_count -= 1
+        self._hint = frame + 1
+        return frame
+
+    def free(self, frame):
+        self.used[frame] = 0
+        self.free_count += 1
+        if frame < self._hint:
+            self._hint = frame
+
+
+class Job:
+    """系统中的一个作业：驻留页 -> 帧号、FIFO 顺序、分配额度及统计数据。"""
+
+    def __init__(self, job_id, num_pages, ws_window):
+        self.job_id = job_id
+        self.num_pages = num_pages
+        self.resident = {}
+        self.fifo = deque()
+        self.quota = 0
+        self.suspended = False
+        self.finished = False
+        self.accesses = 0
+        self.faults = 0
+        # 工作集：最近 ws_window 次访问及各页出现次数，工作集大小即 len(ws_counts)
+        self.ws_refs = deque()
+        self.ws_counts = {}
+        self.ws_window = ws_window
+        # PFF：本采样周期内的访问数和缺页数
+        self.interval_accesses = 0
+        self.interval_faults = 0
+
+    @property
+    def working_set_size(self):
+        return len(self.ws_counts)
+
+    def record_reference(self, page_no):
+        self.ws_refs.append(page_no)
+        self.ws_counts[page_no] = self.ws_counts.get(page_no, 0) + 1
+        if len(self.ws_refs) > self.ws_window:
+            old = self.ws_refs.popleft()
+            left = self.ws_counts[old] - 1
+            if left:
+                self.ws_counts[old] = left
+            else:
+                del self.ws_counts[old]
+
+
+class SystemResult:
+    """系统级模拟结果。"""
+
+    def __init__(self, jobs, samples, thrashing_events, suspensions):
+        self.jobs = {j.job_id: {"accesses": j.accesses, "faults": j.faults,
+                                "fault_rate": j.faults / j.accesses if j.accesses else 0.0}
+                     for j in jobs}
+        self.accesses = sum(j.accesses for j in jobs)
+        self.faults = sum(j.faults for j in jobs)
+        # samples: [(系统访问次数, 区间缺页率, 活动作业数, 已用块数), ...]
+        self.samples = samples
+        # thrashing_events: [(系统访问次数, 区间缺页率, 原因), ...]
+        self.thrashing_events = thrashing_events
+        # suspensions: [(系统访问次数, 作业号, "suspend" / "resume"), ...]
+        self.suspensions = suspensions
+
+    @property
+    def fault_rate(self):
+        return self.faults / self.accesses if self.accesses else 0.0
+
+
+class SystemPagingSimulation:
+    """
+    多作业请求分页：所有作业共享一个物理块池。
+    局部置换时按 allocation 策略给每个作业定额度；全局置换时各作业按需竞争全部物理块，
+    不设额度，因此只能与 ALLOC_FIXED 组合(构造时检查)。
+    每 sample_interval 次访问重新计算额度并检测抖动。
+    """
+
+    def __init__(self, num_frames, replacement=REPLACE_LOCAL, allocation=ALLOC_FIXED,
+                 ws_window=1000, pff_low=0.02, pff_high=0.10, sample_interval=1000,
+                 thrash_threshold=0.5, quantum=100):
+        """
+        :param num_frames: 物理块总数
+        :param replacement: REPLACE_LOCAL 或 REPLACE_GLOBAL
+        :param allocation: 局部置换下的分配策略，ALLOCATION_POLICIES 之一；全局置换不按额度分配，
+                           只能取 ALLOC_FIXED(工作集和 PFF 依赖各作业的额度，与全局置换组合时直接报错)
+        :param ws_window: 工作集窗口 τ(作业自身的访问次数)
+        :param pff_low: 缺页率低于该值时收回一块
+        :param pff_high: 缺页率高于该值时增加一块
+        :param sample_interval: 采样/重新分配的周期(系统访问次数)
+        :param thrash_threshold: 区间缺页率超过该值视为抖动
+        :param quantum: run() 轮转调度时每个作业一次连续执行的访问数
+        """
+        if replacement not in REPLACEMENT_SCOPES:
+            raise ValueError(f"未知的置换范围 {replacement}，可选 {REPLACEMENT_SCOPES}")
+        if allocation not in ALLOCATION_POLICIES:
+            raise ValueError(f"未知的分配策略 {allocation}，可选 {ALLOCATION_POLICIES}")
+        if replacement == REPLACE_GLOBAL and allocation != ALLOC_FIXED:
+            raise ValueError(f"全局置换下各作业按需竞争全部物理块，不支持分配策略 {allocation}，"
+                             f"只能使用 {ALLOC_FIXED}")
+        self.num_frames = num_frames
+        self.replacement = replacement
+        self.allocation = allocation
+        self.ws_window = ws_window
+        self.pff_low = pff_low
+        self.pff_high = pff_high
+        self.sample_interval = sample_interval
+        self.thrash_threshold = thrash_threshold
+        self.quantum = quantum
+
+        self.frames = FrameBitmap(num_frames)
+        self.jobs = {}
+        # 全局置换的 FIFO 队列：(作业号, 页号)
+        self.global_fifo = deque()
+        self.clock = 0
+        self._interval_accesses = 0
+        self._interval_faults = 0
+        self.samples = []
+        self.thrashing_events = []
+        self.suspensions = []
+
+    def add_job(self, job_id, num_pages):
+        job = Job(job_id, num_pages, self.ws_window)
+        self.jobs[job_id] = job
+        self._rebalance()
+        return job
+
+    def active_jobs(self):
+        return [j for j in self.jobs.values() if not j.suspended]
+
+    def access(self, job_id, page_no):
+        """作业 job_id 访问页 page_no，返回是否缺页。挂起的作业不能访问。"""
+        job = self.jobs[job_id]
+        if job.suspended:
+            raise RuntimeError(f"作业 {job_id} 已被挂起")
+        if page_no < 0 or page_no >= job.num_pages:
+            raise ValueError(f"作业 {job_id} 访问页 {page_no} 超出范围(0~{job.num_pages - 1})")
+        self.clock += 1
+        self._interval_accesses += 1
+        job.accesses += 1
+        job.interval_accesses += 1
+        job.record_reference(page_no)
+
+        fault = page_no not in job.resident
+        if fault:
+            job.faults += 1
+            job.interval_faults += 1
+            self._interval_faults += 1
+            frame = self._obtain_frame(job)
+            job.resident[page_no] = frame
+            job.fifo.append(page_no)
+            if self.replacement == REPLACE_GLOBAL:
+                self.global_fifo.append((job_id, page_no))
+
+        if self._interval_accesses >= self.sample_interval:
+            self._sample()
+        return fault
+
+    def run(self, traces):
+        """
+        轮转调度各作业的访问串，每次连续执行 quantum 次访问。
+        :param traces: {作业号: 页号序列}；作业需已 add_job，未加入的按 max(页号)+1 自动加入；
+                       已加入但没有访问串的作业视为已结束
+        :return: SystemResult
+        """
+        cursors = {}
+        for job_id, pages in traces.items():
+            pages = pages.tolist() if hasattr(pages, "tolist") else list(pages)
+            if job_id not in self.jobs:
+                self.add_job(job_id, max(pages) + 1 if pages else 1)
+            cursors[job_id] = (pages, 0)
+        # 没有访问串的作业不再访问，留着会一直算作活动作业，使其余作业被挂起后无法恢复
+        for job_id, job in self.jobs.items():
+            if job_id not in cursors and not job.finished:
+                self._finish_job(job_id)
+        while cursors:
+            progressed = False
+            for job_id in list(cursors):
+                pages, pos = cursors[job_id]
+                if self.jobs[job_id].suspended:
+                    continue
+                end = min(pos + self.quantum, len(pages))
+                for i in range(pos, end):
+                    self.access(job_id, pages[i])
+                    if self.jobs[job_id].suspended:
+                        end = i + 1
+                        break
+                progressed = progressed or end > pos
+                if end >= len(pages):
+                    del cursors[job_id]
+                    self._finish_job(job_id)
+                else:
+                    cursors[job_id] = (pages, end)
+            if not progressed and cursors:
+                # 只剩挂起的作业：强制恢复一个，避免死锁
+                self._resume(next(iter(cursors)))
+        return SystemResult(list(self.jobs.values()), self.samples, self.thrashing_events, self.suspensions)
+
+    def _obtain_frame(self, job):
+        """为缺页的作业取得一个物理块，必要时按置换范围淘汰一页。"""
+        if self.replacement == REPLACE_GLOBAL:
+            frame = self.frames.allocate()
+            if frame is not None:
+                return frame
+            victim_job_id, victim_page = self.global_fifo.popleft()
+            return self._evict(self.jobs[victim_job_id], victim_page)
+
+        if len(job.resident) < job.quota:
+            frame = self.frames.allocate()
+            if frame is not None:
+                return frame
+        if job.resident:
+            return self._evict(job, job.fifo[0])
+        # 本作业没有驻留页且无空闲块：从驻留页最多的作业处收回一块
+        donor = max(self.jobs.values(), key=lambda j: len(j.resident))
+        return self._evict(donor, donor.fifo[0])
+
+    def _evict(self, job, page_no):
+        """淘汰 job 的页 page_no，返回腾出的帧号(仍处于已分配状态，由调用方复用)。"""
+        frame = job.resident.pop(page_no)
+        if job.fifo and job.fifo[0] == page_no:
+            job.fifo.popleft()
+        else:
+            job.fifo.remove(page_no)
+        return frame
+
+    def _release(self, job, count):
+        """把 job 最早装入的 count 页换出，帧归还空闲位图。"""
+        for _ in range(min(count, len(job.resident))):
+            page_no = job.fifo.popleft()
+            self.frames.free(job.resident.pop(page_no))
+
+    def _finish_job(self, job_id):
+        job = self.jobs[job_id]
+        if self.replacement == REPLACE_GLOBAL:
+            self.global_fifo = deque(e for e in self.global_fifo if e[0] != job_id)
+        self._release(job, len(job.resident))
+        job.quota = 0
+        job.suspended = True
+        job.finished = True
+
+    def _suspend(self, job):
+        job.suspended = True
+        self._release(job, len(job.resident))
+        job.quota = 0
+        self.suspensions.append((self.clock, job.job_id, "suspend"))
+
+    def _resume(self, job_id):
+        """强制恢复作业 job_id；随后的重新分配不会再挂起它。"""
+        job = self.jobs[job_id]
+        job.suspended = False
+        self.suspensions.append((self.clock, job_id, "resume"))
+        self._rebalance(keep=job)
+
+    def _sample(self):
+        rate = self._interval_faults / self._interval_accesses
+        active = self.active_jobs()
+        self.samples.append((self.clock, rate, len(active), self.num_frames - self.frames.free_count))
+        if rate > self.thrash_threshold and len(active) > 1:
+            self.thrashing_events.append((self.clock, rate, "fault_rate"))
+        self._rebalance()
+        self._interval_accesses = 0
+        self._interval_faults = 0
+        for job in self.jobs.values():
+            job.interval_accesses = 0
+            job.interval_faults = 0
+
+    def _rebalance(self, keep=None):
+        """
+        按分配策略重新计算局部置换下各作业的额度，超出额度的驻留页被换出。
+        :param keep: 工作集分配下需要挂起作业时不挂起的作业(刚被强制恢复的作业)
+        """
+        if self.replacement == REPLACE_GLOBAL:
+            return
+        active = self.active_jobs()
+        if not active:
+            return
+        if self.allocation == ALLOC_FIXED:
+            share = max(1, self.num_frames // len(active))
+            for job in active:
+                job.quota = share
+        elif self.allocation == ALLOC_WORKING_SET:
+            for job in active:
+                job.quota = max(1, job.working_set_size)
+            demand = sum(j.quota for j in active)
+            if demand > self.num_frames:
+                self.thrashing_events.append((self.clock, None, "working_set_demand"))
+                # 挂起工作集最大的作业，直到总需求能放进内存(至少保留一个作业)
+                for job in sorted(active, key=lambda j: j.quota, reverse=True):
+                    if demand <= self.num_frames or len(self.active_jobs()) == 1:
+                        break
+                    if job is keep:
+                        continue
+                    demand -= job.quota
+                    self._suspend(job)
+            else:
+                # 有富余时恢复工作集放得下的挂起作业
+                spare = self.num_frames - demand
+                for job in self.jobs.values():
+                    if job.suspended and not job.finished and max(1, job.working_set_size) <= spare:
+                        spare -= max(1, job.working_set_size)
+                        job.suspended = False
+                        job.quota = max(1, job.working_set_size)
+                        self.suspensions.append((self.clock, job.job_id, "resume"))
+        else:
+            for job in active:
+                if job.quota == 0:
+                    job.quota = max(1, self.num_frames // len(active))
+                if not job.interval_accesses:
+                    continue
+                rate = job.interval_faults / job.interval_accesses
+                if rate > self.pff_high:
+                    job.quota += 1
+                elif rate < self.pff_low and job.quota > 1:
+                    job.quota -= 1
+        for job in active:
+            if len(job.resident) > job.quota:
+                self._release(job, len(job.resident) - job.quota)
+
+
+def job_scaling(traces, num_frames, **kwargs):
+    """
+    依次加入 1、2、…、N 个作业分别运行，观察系统缺页率随作业数的变化。
+    :param traces: [(作业号, 页号序列), ...]，按加入顺序排列
+    :return: [(作业数, 系统缺页率, 抖动事件数), ...]
+    """
+    rows = []
+    for count in range(1, len(traces) + 1):
+        sim = SystemPagingSimulation(num_frames, **kwargs)
+        result = sim.run(dict(traces[:count]))
+        rows.append((count, result.fault_rate, len(result.thrashing_events)))
+    return rows
@@ -0,0 +1,116 @@
+from .paging_simulation import POLICY_OPT, TraceResult, _as_list
+
+CHECKPOINT_INTERVAL = 1000  # 每执行多少次访问保存一个检查点
+
+
+class Timeline:
+    """
+    访问串时间线：在 PagingSimulation 上执行一条访问串，每 interval 次访问保存一个检查点。
+    跳转到第 k 次访问时，从不晚于 k 的最近检查点(或当前位置，取较近者)恢复，
+    再用 run_trace 重放其余的访问，因此任意前后跳转最多重放 interval 次访问。
+    检查点在第一次执行到该位置时才生成。
+    position 为已执行的访问数，即下一次要执行的访问下标。
+    """
+
+    def __init__(self, sim, ops=(), pages=(), offsets=(), interval=CHECKPOINT_INTERVAL):
+        """
+        :param sim: 要驱动的 PagingSimulation，以它当前的状态作为第 0 步
+        :param ops: 操作序列
+        :param pages: 页号序列
+        :param offsets: 页内地址序列
+        :param interval: 检查点间隔(访问次数)
+        """
+        if interval <= 0:
+            raise ValueError(f"检查点间隔 {interval} 必须为正整数")
+        self.sim = sim
+        self.ops = list(ops)
+        self.pages = _as_list(pages)
+        self.offsets = _as_list(offsets)
+        if not (len(self.ops) == len(self.pages) == len(self.offsets)):
+            raise ValueError("ops、pages、offsets 长度必须一致")
+        self.interval = interval
+        self.position = 0
+        if sim.policy == POLICY_OPT:
+            sim.load_trace(self.pages)
+        # checkpoints[j] 为执行完前 j * interval 次访问时的状态
+        self.checkpoints = [sim.checkpoint()]
+
+    def __len__(self):
+        return len(self.pages)
+
+    def seek(self, k):
+        """
+        跳转到已执行前 k 次访问的状态(0 <= k <= len)。
+        :return: 重放部分的 TraceResult(从检查点恢复时只含恢复之后重放的访问)
+        """
+        if k < 0 or k > len(self.pages):
+            raise ValueError(f"位置 {k} 超出范围(0~{len(self.pages)})")
+        j = min(k // self.interval, len(self.checkpoints) - 1)
+        start = j * self.interval
+        if not (start <= self.position <= k):
+            self.sim.restore(self.checkpoints[j])
+            self.position = start
+        return self._run_to(k)
+
+    def advance(self, count):
+        """继续执行至多 count 次访问(不写日志)，返回这些访问的 TraceResult。"""
+        return self._run_to(min(self.position + count, len(self.pages)))
+
+    def step(self):
+        """用 execute 执行下一次访问(写日志)，返回 execute 的结果；已到末尾时返回 None。"""
+        if self.position >= len(self.pages):
+            return None
+        i = self.position
+        result = self.sim.execute(self.ops[i], self.pages[i], self.offsets[i])
+        self.position += 1
+        self._maybe_checkpoint()
+        return result
+
+    def undo(self):
+        """撤销最近一次访问。"""
+        if self.position > 0:
+            self.seek(self.position - 1)
+
+    def redo(self):
+        """重做下一次访问(与 step 相同)。"""
+        return self.step()
+
+    def record(self, op, page_no, offset):
+        """
+        在当前位置追加一次新的访问并执行：当前位置之后的访问(可重做的部分)被丢弃。
+        OPT 需要预知完整访问串，不能追加。
+        """
+        if self.sim.policy == POLICY_OPT:
+            raise ValueError("OPT 置换需要预先给定完整访问串，不能追加访问")
+        pos = self.position
+        del self.ops[pos:], self.pages[pos:], self.offsets[pos:]
+        del self.checkpoints[pos // self.interval + 1:]
+        self.ops.append(op)
+        self.pages.append(page_no)
+        self.offsets.append(offset)
+        return self.step()
+
+    def valid_pages(self):
+        """已执行的访问中页号和页内地址都合法的页号序列(用于栈距离分析)。"""
+        num_pages, page_size = self.sim.num_pages, self.sim.page_size
+        pos = self.position
+        return [p for p, off in zip(self.pages[:pos], self.offsets[:pos])
+                if 0 <= p < num_pages and 0 <= off < page_size]
+
+    def _run_to(self, end):
+        """从当前位置批量执行到 end，途经检查点位置时保存检查点。"""
+        result = TraceResult(0)
+        interval = self.interval
+        while self.position < end:
+            start = self.position
+            stop = min(end, (start // interval + 1) * interval)
+            result.extend(self.sim.run_trace(self.ops[start:stop], self.pages[start:stop],
+                                             self.offsets[start:stop]))
+            self.position = stop
+            self._maybe_checkpoint()
+        return result
+
+    def _maybe_checkpoint(self):
+        j, rest = divmod(self.position, self.interval)
+        if rest == 0 and j == len(self.checkpoints):
+            self.checkpoints.append(self.sim.checkpoint())
@@ -0,0 +1,136 @@
+import random
+from collections import OrderedDict
+
+TLB_LRU = "LRU"
+TLB_RANDOM = "RANDOM"
+TLB_POLICIES = (TLB_LRU, TLB_RANDOM)
+
+# 默认访问时间(纳秒)，用于计算有效访问时间
+TLB_ACCESS_TIME = 1
+MEMORY_ACCESS_TIME = 100
+PAGE_FAULT_TIME = 8_000_000  # 缺页处理(含磁盘 I/O)约 8ms
+
+
+class _RandomSet:
+    """随机替换的一组 TLB 表项：dict 记录位置，淘汰时与末尾交换后弹出，均为 O(1)。"""
+
+    def __init__(self):
+        self.frames = {}
+        self.keys = []
+        self.pos = {}
+
+    def get(self, page_no):
+        return self.frames.get(page_no)
+
+    def put(self, page_no, frame):
+        if page_no not in self.frames:
+            self.pos[page_no] = len(self.keys)
+            self.keys.append(page_no)
+        self.frames[page_no] = frame
+
+    def remove(self, page_no):
+        if page_no not in self.frames:
+            return
+        del self.frames[page_no]
+        i = self.pos.pop(page_no)
+        last = self.keys.pop()
+        if last != page_no:
+            self.keys[i] = last
+            self.pos[last] = i
+
+    def evict(self, rng):
+        page_no = self.keys[rng.randrange(len(self.keys))]
+        self.remove(page_no)
+        return page_no
+
+    def __len__(self):
+        return len(self.frames)
+
+
+class TLB:
+    """
+    快表(TLB)模型：entries 个表项，ways 路组相联(None 表示全相联)，
+    组内按 LRU 或随机替换。查找、插入、失效均为 O(1)。
+    """
+
+    def __init__(self, entries=16, ways=None, policy=TLB_LRU, seed=None):
+        """
+        :param entries: 表项总数
+        :param ways: 每组的路数，需整除 entries；None 或等于 entries 时为全相联
+        :param policy: TLB_LRU 或 TLB_RANDOM
+        :param seed: 随机替换的随机数种子
+        """
+        if policy not in TLB_POLICIES:
+            raise ValueError(f"未知的 TLB 替换策略 {policy}，可选 {TLB_POLICIES}")
+        ways = entries if ways is None else ways
+        if entries <= 0 or ways <= 0 or entries % ways != 0:
+            raise ValueError(f"TLB 表项数 {entries} 必须是路数 {ways} 的正整数倍")
+        self.entries = entries
+        self.ways = ways
+        self.num_sets = entries // ways
+        self.policy = policy
+        self.rng = random.Random(seed)
+        self.hits = 0
+        self.misses = 0
+        self.flush()
+
+    def flush(self):
+        """清空全部表项(如进程切换或模拟重置时)。"""
+        if self.policy == TLB_LRU:
+            self.sets = [OrderedDict() for _ in range(self.num_sets)]
+        else:
+            self.sets = [_RandomSet() for _ in range(self.num_sets)]
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, page_no):
+        """查找页号对应的帧号，命中返回帧号并更新统计，未命中返回 None。"""
+        tlb_set = self.sets[page_no % self.num_sets]
+        frame = tlb_set.get(page_no)
+        if frame is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        if self.policy == TLB_LRU:
+            tlb_set.move_to_end(page_no)
+        return frame
+
+    def insert(self, page_no, frame):
+        """装入一个表项，组满时按替换策略淘汰一项。"""
+        tlb_set = self.sets[page_no % self.num_sets]
+        if self.policy == TLB_LRU:
+            if page_no in tlb_set:
+                tlb_set.move_to_end(page_no)
+            elif len(tlb_set) >= self.ways:
+                tlb_set.popitem(last=False)
+            tlb_set[page_no] = frame
+        else:
+            if tlb_set.get(page_no) is None and len(tlb_set) >= self.ways:
+                tlb_set.evict(self.rng)
+            tlb_set.put(page_no, frame)
+
+    def invalidate(self, page_no):
+        """页被淘汰时使对应表项失效。"""
+        tlb_set = self.sets[page_no % self.num_sets]
+        if self.policy == TLB_LRU:
+            tlb_set.pop(page_no, None)
+        else:
+            tlb_set.remove(page_no)
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+def effective_access_time(tlb_hit_rate, fault_rate, tlb_time=TLB_ACCESS_TIME,
+                          memory_time=MEMORY_ACCESS_TIME, fault_time=PAGE_FAULT_TIME):
+    """
+    有效访问时间(纳秒)：
+    不缺页时，TLB 命中需 tlb_time + memory_time，未命中还要多访问一次内存中的页表；
+    缺页时按 fault_time 计。
+    """
+    translate = tlb_hit_rate * (tlb_time + memory_time) + (1 - tlb_hit_rate) * (tlb_time + 2 * memory_time)
+    return (1 - fault_rate) * translate + fault_rate * fault_time
@@ -0,0 +1,84 @@
+# 批量生成带局部性的合成访问串(页号序列)。
+# 有 NumPy 时返回 int32 的 ndarray，否则返回 array('i')；同一种子在两种后端下的序列不同。
+import random
+from array import array
+from itertools import accumulate
+
+try:
+    import numpy as np
+except ImportError:  # 没有 NumPy 时退回 array.array，结果同样可直接送入 run_trace
+    np = None
+
+
+def _rng(seed):
+    return np.random.default_rng(seed) if np is not None else random.Random(seed)
+
+
+def uniform_trace(n, num_pages, seed=None):
+    """均匀分布：每次访问等概率落在 0..num_pages-1 的任意一页。"""
+    rng = _rng(seed)
+    if np is not None:
+        return rng.integers(0, num_pages, size=n, dtype=np.int32)
+    return array("i", rng.choices(range(num_pages), k=n))
+
+
+def zipf_trace(n, num_pages, alpha=1.0, seed=None):
+    """Zipf 分布：第 k 热的页被访问的概率正比于 1 / k^alpha，热页随机分布在页号空间中。"""
+    rng = _rng(seed)
+    weights = [1.0 / (k ** alpha) for k in range(1, num_pages + 1)]
+    if np is not None:
+        cdf = np.cumsum(weights)
+        cdf /= cdf[-1]
+        ranks = np.searchsorted(cdf, rng.random(n), side="right")
+        np.minimum(ranks, num_pages - 1, out=ranks)
+        return rng.permutation(num_pages).astype(np.int32)[ranks]
+    pages = list(range(num_pages))
+    rng.shuffle(pages)
+    return array("i", rng.choices(pages, cum_weights=list(accumulate(weights)), k=n))
+
+
+def sequential_trace(n, num_pages, start=0):
+    """顺序扫描：从 start 开始依次访问，到末页后回到 0 页。"""
+    if np is not None:
+        return ((np.arange(n, dtype=np.int64) + start) % num_pages).astype(np.int32)
+    return array("i", ((start + i) % num_pages for i in range(n)))
+
+
+def loop_trace(n, working_set, base=0):
+    """循环工作集：反复按顺序访问 base..base+working_set-1。"""
+    if np is not None:
+        return (np.arange(n, dtype=np.int64) % working_set + base).astype(np.int32)
+    one_pass = array("i", range(base, base + working_set))
+    reps, rest = divmod(n, working_set)
+    return one_pass * reps + one_pass[:rest]
+
+
+def phased_trace(n, num_pages, working_set, phase_length, seed=None):
+    """
+    工作集切换：每 phase_length 次访问换一个新的工作集(随机选的一段连续页)，
+    阶段内在该工作集中均匀访问。
+    """
+    if working_set > num_pages:
+        raise ValueError(f"工作集大小 {working_set} 不能超过页数 {num_pages}")
+    rng = _rng(seed)
+    num_phases = -(-n // phase_length)
+    span = num_pages - working_set + 1
+    if np is not None:
+        bases = rng.integers(0, span, size=num_phases, dtype=np.int32)
+        return np.repeat(bases, phase_length)[:n] + rng.integers(0, working_set, size=n, dtype=np.int32)
+    result = array("i")
+    offsets = range(working_set)
+    for phase in range(num_phases):
+        base = rng.randrange(span)
+        count = min(phase_length, n - phase * phase_length)
+        result.extend(base + o for o in rng.choices(offsets, k=count))
+    return result
+
+
+GENERATORS = {
+    "uniform": uniform_trace,
+    "zipf": zipf_trace,
+    "sequential": sequential_trace,
+    "loop": loop_trace,
+    "phased": phased_trace,
+}
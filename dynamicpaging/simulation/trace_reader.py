@@ -0,0 +1,104 @@
+from .paging_simulation import BLOCK_SIZE, POLICY_OPT, TraceResult
+
+# 支持的访问串文件格式
+TRACE_TEXT = "text"  # 每行 "op page offset"
+TRACE_ADDRESS = "address"  # 每行一个地址(十进制或 0x 十六进制)，可带前缀操作 "op addr"
+TRACE_LACKEY = "lackey"  # valgrind --tool=lackey --trace-mem=yes 的输出
+TRACE_FORMATS = (TRACE_TEXT, TRACE_ADDRESS, TRACE_LACKEY)
+
+CHUNK_SIZE = 1 << 20  # 每次读取 1MB
+BATCH_SIZE = 1 << 16  # 每批送入 run_trace 的访问数
+
+# lackey 访问类型 -> 操作：I 取指、L 读、S 写、M 读改写
+_LACKEY_OPS = {"I": "load", "L": "load", "S": "save", "M": "save"}
+
+
+def _iter_lines(source, chunk_size=CHUNK_SIZE):
+    """分块读取文件，逐行产出(bytes)，内存占用与文件大小无关。source 可为路径或二进制文件对象。"""
+    if hasattr(source, "read"):
+        f, close = source, False
+    else:
+        f, close = open(source, "rb"), True
+    try:
+        tail = b""
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            lines = (tail + chunk).split(b"\n")
+            tail = lines.pop()
+            yield from lines
+        if tail:
+            yield tail
+    finally:
+        if close:
+            f.close()
+
+
+def _parse_address(token):
+    return int(token, 16) if token[:2].lower() == "0x" else int(token)
+
+
+def iter_trace(source, fmt=TRACE_TEXT, page_size=BLOCK_SIZE, include_instructions=True,
+               chunk_size=CHUNK_SIZE):
+    """
+    流式解析访问串文件，逐条产出 (op, page_no, offset)。
+    空行和以 # 开头的注释行被跳过；地址格式按 page_size 拆分为页号和页内地址。
+    :param source: 文件路径或二进制文件对象
+    :param fmt: TRACE_FORMATS 之一
+    :param page_size: 地址拆分所用的页大小，应与 PagingSimulation 的 page_size 一致
+    :param include_instructions: lackey 格式下是否包含取指(I)访问
+    """
+    if fmt not in TRACE_FORMATS:
+        raise ValueError(f"未知的访问串格式 {fmt}，可选 {TRACE_FORMATS}")
+    for lineno, raw in enumerate(_iter_lines(source, chunk_size), start=1):
+        line = raw.decode("ascii", "replace").strip()
+        if not line or line[0] == "#":
+            continue
+        try:
+            if fmt == TRACE_TEXT:
+                op, page_no, offset = line.split()
+                yield op, int(page_no), int(offset)
+                continue
+            if fmt == TRACE_ADDRESS:
+                parts = line.split()
+                op = parts[0] if len(parts) == 2 else "load"
+                addr = _parse_address(parts[-1])
+            else:
+                # lackey：跳过 "==pid==" 等非访问行
+                kind = line[0]
+                op = _LACKEY_OPS.get(kind)
+                if op is None or (kind == "I" and not include_instructions):
+                    continue
+                addr = int(line[1:].strip().split(",")[0], 16)
+            yield op, addr // page_size, addr % page_size
+        except ValueError:
+            raise ValueError(f"第 {lineno} 行格式错误：{line!r}") from None
+
+
+def iter_trace_batches(source, fmt=TRACE_TEXT, page_size=BLOCK_SIZE, batch_size=BATCH_SIZE, **kwargs):
+    """把 iter_trace 的结果按 batch_size 打包，产出 (ops, pages, offsets) 三个列表。"""
+    ops, pages, offsets = [], [], []
+    for op, page_no, offset in iter_trace(source, fmt, page_size, **kwargs):
+        ops.append(op)
+        pages.append(page_no)
+        offsets.append(offset)
+        if len(pages) >= batch_size:
+            yield ops, pages, offsets
+            ops, pages, offsets = [], [], []
+    if pages:
+        yield ops, pages, offsets
+
+
+def run_trace_file(sim, source, fmt=TRACE_TEXT, batch_size=BATCH_SIZE, **kwargs):
+    """
+    把访问串文件分批送入 sim.run_trace，只累计统计数据，不保留逐次访问的结果，
+    因此多 GB 的访问串也只占常数内存。OPT 需要完整访问串，不能流式运行。
+    :return: 只含累计计数的 TraceResult
+    """
+    if sim.policy == POLICY_OPT:
+        raise ValueError("OPT 置换需要完整访问串，不能流式运行")
+    total = TraceResult(0)
+    for ops, pages, offsets in iter_trace_batches(source, fmt, sim.page_size, batch_size, **kwargs):
+        total.accumulate(sim.run_trace(ops, pages, offsets))
+    return total
@@ -0,0 +1,257 @@
+"""
+动态分区管理模拟的命令行入口，不需要图形界面：
+    python -m dynamicparition run   --memory 1024 --ops 10000 --algorithm best_fit
+    python -m dynamicparition bench --ops 20000
+    python -m dynamicparition replay ops.txt --memory 1024 --cache .cache
+    python -m dynamicparition run   --slab 8,16,32 --slab-size 64
+    python -m dynamicparition gui
+run、bench、gui 可加 --profile out.json / --cprofile，分别统计分配算法、
+历史快照(save_state)和界面重绘(update_display)的耗时，以及每次分配扫描的空闲块数。
+run、bench、replay 可加 --slab 在分区分配之前启用按大小类分配的 slab 层，并输出 slab 命中率和内部浪费。
+只有 gui 子命令会导入 tkinter。
+"""
+import argparse
+import json
+import random
+import sys
+import time
+
+from .memory_manager import MemoryManager
+from .slab import SlabCache, DEFAULT_SLAB_SIZE
+
+ALGORITHMS = ("first_fit", "best_fit", "worst_fit")
+
+
+def run_workload(manager, algorithm, ops, max_size, free_ratio, seed=None):
+    """
+    随机的分配/释放负载：每步以 free_ratio 的概率释放一个随机的已分配进程，
+    否则申请 1~max_size 大小的内存。
+    :return: 统计字典
+    """
+    rng = random.Random(seed)
+    allocated = []
+    failures = 0
+    frees = 0
+    start = time.perf_counter()
+    for _ in range(ops):
+        if allocated and rng.random() < free_ratio:
+            pid = allocated.pop(rng.randrange(len(allocated)))
+            manager.deallocate(pid)
+            frees += 1
+        else:
+            pid = manager.allocate(rng.randint(1, max_size), algorithm)
+            if pid is None:
+                failures += 1
+            else:
+                allocated.append(pid)
+    elapsed = time.perf_counter() - start
+    stats = {
+        "algorithm": algorithm,
+        "operations": ops,
+        "allocations": ops - frees,
+        "failed_allocations": failures,
+        "deallocations": frees,
+        "memory_usage": manager.get_memory_usage(),
+        "fragmentation": manager.get_fragmentation(),
+        "free_blocks": len(manager.free_blocks),
+        "seconds": elapsed,
+        "operations_per_second": ops / elapsed if elapsed else 0.0,
+    }
+    stats.update(slab_stats(manager))
+    return stats
+
+
+def slab_stats(manager):
+    """启用 slab 层时的统计(命中率、内部浪费等)，未启用时为空字典。"""
+    if manager.slab is None:
+        return {}
+    report = manager.slab.report()
+    return {
+        "slab_requests": report["requests"],
+        "slab_hit_rate": report["hit_rate"],
+        "slab_fallbacks": report["fallbacks"],
+        "slabs": report["slabs"],
+        "slab_space": report["slab_space"],
+        "slab_internal_waste": report["internal_waste"],
+        "slab_free_slot_space": report["free_slot_space"],
+    }
+
+
+def make_manager(args):
+    """按 --memory / --slab / --slab-size 创建 MemoryManager。"""
+    slab = None
+    if args.slab:
+        slab = SlabCache([int(c) for c in args.slab.split(",")], args.slab_size)
+    return MemoryManager(args.memory, slab=slab)
+
+
+def _print(data, as_json):
+    if as_json:
+        print(json.dumps(data, ensure_ascii=False, indent=2))
+        return
+    for key, value in data.items():
+        if isinstance(value, float):
+            value = f"{value:.6g}"
+        print(f"{key:>22}: {value}")
+
+
+def _profiled(args, classes, func):
+    """按 --profile / --cprofile 挂接 classes 后运行 func()，统计表输出到 stderr。"""
+    if not (getattr(args, "profile", None) or getattr(args, "cprofile", False)):
+        return func()
+    # 与请求分页模拟共用同一套统计工具(顶层的 simtools 包，不依赖 dynamicpaging)
+    from simtools.instrumentation import profile_call
+
+    result, inst = profile_call(classes, func, args.profile, args.cprofile)
+    print(inst.format_report(), file=sys.stderr)
+    return result
+
+
+def cmd_run(args):
+    manager = make_manager(args)
+    stats = _profiled(args, (MemoryManager, SlabCache), lambda: run_workload(
+        manager, args.algorithm, args.ops, args.max_size, args.free_ratio, args.seed))
+    _print(stats, args.json)
+
+
+def cmd_bench(args):
+    def bench():
+        rows = {}
+        for algorithm in ALGORITHMS:
+            manager = make_manager(args)
+            stats = run_workload(manager, algorithm, args.ops, args.max_size, args.free_ratio, args.seed)
+            rows[f"{algorithm}_operations_per_second"] = stats["operations_per_second"]
+            if manager.slab is not None:
+                rows[f"{algorithm}_slab_hit_rate"] = stats["slab_hit_rate"]
+        return rows
+
+    _print(_profiled(args, (MemoryManager, SlabCache), bench), args.json)
+
+
+def read_ops(path):
+    """
+    读入操作文件，每行一个操作，# 之后为注释：
+        allocate 大小 [算法]    (算法默认 first_fit)
+        deallocate 进程ID
+    :return: MemoryManager.replay 使用的操作列表
+    """
+    ops = []
+    with open(path, encoding="utf-8") as f:
+        for lineno, line in enumerate(f, 1):
+            fields = line.split("#", 1)[0].split()
+            if not fields:
+                continue
+            if fields[0] == "allocate" and len(fields) in (2, 3):
+                algorithm = fields[2] if len(fields) == 3 else "first_fit"
+                if algorithm not in ALGORITHMS:
+                    raise ValueError(f"{path}:{lineno}: 未知的分配算法 {algorithm}，可选 {ALGORITHMS}")
+                ops.append(("allocate", int(fields[1]), algorithm))
+            elif fields[0] == "deallocate" and len(fields) == 2:
+                ops.append(("deallocate", int(fields[1])))
+            else:
+                raise ValueError(f"{path}:{lineno}: 无法解析的操作 {line.strip()!r}")
+    return ops
+
+
+def cmd_replay(args):
+    cache = None
+    if args.cache:
+        # 与请求分页模拟共用同一套结果缓存
+        from simtools.result_cache import ResultCache
+
+        cache = ResultCache(args.cache, args.cache_size * 1024 * 1024)
+    ops = read_ops(args.ops_file)
+    manager = make_manager(args)
+    start = time.perf_counter()
+    results = manager.replay(ops, cache=cache)
+    elapsed = time.perf_counter() - start
+    allocations = [r for op, r in zip(ops, results) if op[0] == "allocate"]
+    data = {
+        "operations": len(ops),
+        "allocations": len(allocations),
+        "failed_allocations": allocations.count(None),
+        "deallocations": len(ops) - len(allocations),
+        "memory_usage": manager.get_memory_usage(),
+        "fragmentation": manager.get_fragmentation(),
+        "free_blocks": len(manager.free_blocks),
+        "seconds": elapsed,
+    }
+    data.update(slab_stats(manager))
+    if cache is not None:
+        data["cache_hit"] = cache.hits > 0
+    _print(data, args.json)
+
+
+def cmd_gui(args):
+    from .main import main
+
+    if getattr(args, "profile", None) or getattr(args, "cprofile", False):
+        from .memory_simulation import MemorySimulator
+
+        _profiled(args, (MemoryManager, SlabCache, MemorySimulator), main)
+    else:
+        main()
+
+
+def _add_workload_arguments(parser):
+    parser.add_argument("--memory", type=int, default=1024, help="总内存大小")
+    parser.add_argument("--ops", type=int, default=10000, help="操作次数")
+    parser.add_argument("--max-size", type=int, default=64, help="单次申请的最大大小")
+    parser.add_argument("--free-ratio", type=float, default=0.5, help="每步释放的概率")
+    parser.add_argument("--seed", type=int, default=1, help="随机数种子")
+    parser.add_argument("--json", action="store_true", help="以 JSON 输出")
+    _add_slab_arguments(parser)
+    _add_profile_arguments(parser)
+
+
+def _add_slab_arguments(parser):
+    parser.add_argument("--slab", metavar="CLASSES", help="启用 slab 层，逗号分隔的大小类，如 8,16,32")
+    parser.add_argument("--slab-size", type=int, default=DEFAULT_SLAB_SIZE,
+                        help=f"每个 slab 的大小，默认 {DEFAULT_SLAB_SIZE}")
+
+
+def _add_profile_arguments(parser):
+    parser.add_argument("--profile", metavar="PATH", help="统计各方法的调用次数与耗时并导出为 JSON")
+    parser.add_argument("--cprofile", action="store_true", help="同时开启 cProfile")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m dynamicparition", description="动态分区存储管理模拟")
+    sub = parser.add_subparsers(dest="command")
+
+    run = sub.add_parser("run", help="运行随机分配/释放负载并输出统计")
+    _add_workload_arguments(run)
+    run.add_argument("--algorithm", default="first_fit", choices=ALGORITHMS)
+    run.set_defaults(func=cmd_run)
+
+    bench = sub.add_parser("bench", help="比较三种分配算法的吞吐量")
+    _add_workload_arguments(bench)
+    bench.set_defaults(func=cmd_bench)
+
+    replay = sub.add_parser("replay", help="回放操作文件并输出统计")
+    replay.add_argument("ops_file", help="操作文件，每行 allocate 大小 [算法] 或 deallocate 进程ID")
+    replay.add_argument("--memory", type=int, default=1024, help="总内存大小")
+    replay.add_argument("--cache", metavar="DIR", help="结果缓存目录，相同的操作序列不再重复回放")
+    replay.add_argument("--cache-size", type=int, default=256, help="结果缓存的大小上限(MB)")
+    replay.add_argument("--json", action="store_true", help="以 JSON 输出")
+    _add_slab_arguments(replay)
+    replay.set_defaults(func=cmd_replay)
+
+    gui = sub.add_parser("gui", help="启动图形界面")
+    _add_profile_arguments(gui)
+    gui.set_defaults(func=cmd_gui)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command is None:
+        # 不带子命令时与 main.py 一样启动图形界面
+        cmd_gui(args)
+        return 0
+    args.func(args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
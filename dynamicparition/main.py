@@ -1,9 +1,22 @@
-import tkinter as tk
-from memory_simulation import MemorySimulator
+import os
+import sys
+
+
+def main():
+    # tkinter 只在真正启动图形界面时才导入
+    import tkinter as tk
+    from .memory_simulation import MemorySimulator
 
-if __name__ == "__main__":
     root = tk.Tk()
     root.title("动态分区管理模拟器")
     root.geometry("800x600")  # 设置默认窗口大小
     app = MemorySimulator(root)
-    root.mainloop()
\ No newline at end of file
+    root.mainloop()
+
+
+if __name__ == "__main__":
+    if not __package__:
+        # 直接运行 python main.py 时，把上级目录加入搜索路径后按包导入
+        sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        from dynamicparition.main import main
+    main()
@@ -1,18 +1,38 @@
 class MemoryManager:
-    def __init__(self, total_memory):
+    # 可由 Instrumentation 挂接统计耗时的方法；值为调用前求“查找长度”(扫描或复制的块数)的函数，None 表示不统计
+    INSTRUMENTED_METHODS = {
+        'allocate': lambda self, size, algorithm: self._fit_scan_length(size, algorithm),
+        '_split_block': None,
+        'deallocate': None,
+        '_merge_blocks': lambda self: len(self.free_blocks),
+        'save_state': lambda self: len(self.free_blocks) + len(self.allocated_blocks),
+    }
+
+    def __init__(self, total_memory, slab=None, max_history=None):
         self.total_memory = total_memory
         self.free_blocks = [{'start': 0, 'size': total_memory}]
         self.allocated_blocks = {}
         self.next_process_id = 1
         self.history = []  # 操作历史
         self.current_history_index = -1
+        # 最多保留的历史快照数，超出时丢弃最早的；None 表示不限制
+        self.max_history = max_history
+        # 可选的 slab 层(slab.SlabCache)：不超过其最大大小类的请求先由它分配
+        self.slab = slab
 
-    # 获取内存使用率
+    # 获取内存使用率：已从空闲分区表分出的内存占总内存的比例。
+    # 启用 slab 层时，slab 中的对象不单独计入，而是按整个 slab 计入(空闲槽和末尾余量也不能再分给其他请求)
     def get_memory_usage(self):
-        used_memory = sum(block['size'] for block in self.allocated_blocks.values())
+        if self.slab is None:
+            used_memory = sum(block['size'] for block in self.allocated_blocks.values())
+        else:
+            used_memory = sum(block['size'] for block in self.allocated_blocks.values()
+                              if not self.slab.owns(block['start']))
+            used_memory += self.slab.space()
         return (used_memory / self.total_memory) * 100
 
-    # 获取内存碎片化程度
+    # 获取内存碎片化程度(空闲分区表的外部碎片)；slab 已切出的空间不是空闲分区，不计入，
+    # slab 内部的空闲槽和浪费见 slab.report()
     def get_fragmentation(self):
         # 如果没有空闲块，则返回0
         if not self.free_blocks:
@@ -32,17 +52,20 @@ class MemoryManager:
         self.history.append({
             'free_blocks': self.free_blocks.copy(),
             'allocated_blocks': self.allocated_blocks.copy(),
-            'next_process_id': self.next_process_id
+            'next_process_id': self.next_process_id,
+            'slab': self.slab.snapshot() if self.slab is not None else None
         })
+        # 超出上限时丢弃最早的快照，当前位置随之前移
+        if self.max_history is not None and len(self.history) > self.max_history:
+            dropped = len(self.history) - self.max_history
+            del self.history[:dropped]
+            self.current_history_index -= dropped
 
     # 撤销操作
     def undo(self):
         if self.current_history_index > 0:
             self.current_history_index -= 1
-            state = self.history[self.current_history_index]
-            self.free_blocks = state['free_blocks'].copy()
-            self.allocated_blocks = state['allocated_blocks'].copy()
-            self.next_process_id = state['next_process_id']
+            self._load_state(self.history[self.current_history_index])
             return True
         return False
 
@@ -50,17 +73,37 @@ class MemoryManager:
     def redo(self):
         if self.current_history_index < len(self.history) - 1:
             self.current_history_index += 1
-            state = self.history[self.current_history_index]
-            self.free_blocks = state['free_blocks'].copy()
-            self.allocated_blocks = state['allocated_blocks'].copy()
-            self.next_process_id = state['next_process_id']
+            self._load_state(self.history[self.current_history_index])
             return True
         return False
 
+    # 恢复到历史快照 state
+    def _load_state(self, state):
+        self.free_blocks = state['free_blocks'].copy()
+        self.allocated_blocks = state['allocated_blocks'].copy()
+        self.next_process_id = state['next_process_id']
+        if self.slab is not None:
+            self.slab.restore(state['slab'])
+
     # 分配内存
     # 可用策略模式优化
     def allocate(self, size, algorithm):
         self.save_state()
+        return self._allocate(size, algorithm)
+
+    # 按算法分配内存(不保存历史)；启用 slab 层时，它能处理的大小先交给它，切不出新 slab 时退回分区分配
+    def _allocate(self, size, algorithm):
+        if self.slab is not None and self.slab.handles(size):
+            address = self.slab.allocate(self, size, algorithm)
+            if address is not None:
+                pid = self.next_process_id
+                self.allocated_blocks[pid] = {'start': address, 'size': size}
+                self.next_process_id += 1
+                return pid
+        return self._allocate_partition(size, algorithm)
+
+    # 按算法从空闲分区表分配内存
+    def _allocate_partition(self, size, algorithm):
         if algorithm == 'first_fit':
             return self._allocate_first_fit(size)
         elif algorithm == 'best_fit':
@@ -69,6 +112,28 @@ class MemoryManager:
             return self._allocate_worst_fit(size)
         return None
 
+    # 为 slab 层从空闲分区切出 size 大小的一块，返回起始地址，失败时返回None。
+    # 借用分区分配的流程，再撤掉它登记的进程，这块不占用进程ID
+    def _carve(self, size, algorithm):
+        pid = self._allocate_partition(size, algorithm)
+        if pid is None:
+            return None
+        self.next_process_id = pid
+        return self.allocated_blocks.pop(pid)['start']
+
+    # 把从 start 开始、大小为 size 的一块还给空闲分区表并与相邻空闲块合并
+    def _release(self, start, size):
+        self.free_blocks.append({'start': start, 'size': size})
+        self._merge_blocks()
+
+    # 分配时要扫描的空闲块数：首次适应扫描到第一个足够大的块为止，其余算法扫描全部空闲块
+    def _fit_scan_length(self, size, algorithm):
+        if algorithm == 'first_fit':
+            for i, block in enumerate(self.free_blocks):
+                if block['size'] >= size:
+                    return i + 1
+        return len(self.free_blocks)
+
     # 使用首次适应算法分配内存
     def _allocate_first_fit(self, size):
         # 遍历free_blocks列表，查找第一个大小大于等于size的空闲块
@@ -136,17 +201,22 @@ class MemoryManager:
     def deallocate(self, pid):
         # 保存当前状态
         self.save_state()
+        return self._deallocate(pid)
+
+    # 释放内存(不保存历史)
+    def _deallocate(self, pid):
         # 如果pid不在已分配的块中，则返回False
         if pid not in self.allocated_blocks:
             return False
         # 获取pid对应的块
         block = self.allocated_blocks[pid]
-        # 将该块添加到空闲块中
-        self.free_blocks.append({'start': block['start'], 'size': block['size']})
         # 从已分配的块中删除该pid
         del self.allocated_blocks[pid]
-        # 合并空闲块
-        self._merge_blocks()
+        # slab 中的对象交还给 slab 层，其余块添加到空闲块中并合并
+        if self.slab is not None and self.slab.owns(block['start']):
+            self.slab.free(self, block['start'])
+        else:
+            self._release(block['start'], block['size'])
         # 返回True
         return True
 
@@ -164,10 +234,50 @@ class MemoryManager:
             next_block = self.free_blocks[i + 1]
             # 如果当前块的start属性加上size属性等于下一个块的start属性
             if current['start'] + current['size'] == next_block['start']:
-                # 将当前块的size属性加上下一个块的size属性
-                current['size'] += next_block['size']
+                # 用合并后的新块替换当前块(历史快照只浅复制了列表，不能原地修改块)
+                self.free_blocks[i] = {'start': current['start'], 'size': current['size'] + next_block['size']}
                 # 删除下一个块
                 del self.free_blocks[i + 1]
             # 否则，i加1
             else:
                 i += 1
+
+    # 回放操作序列：ops 中每项为 ('allocate', 大小, 算法) 或 ('deallocate', 进程ID)，
+    # 返回每步的结果(分配得到的进程ID或None、释放是否成功)。
+    # 整段回放只保存一次历史，撤销时整体撤销；中途出错时恢复到回放前的状态并撤掉这次保存的历史。
+    # cache 为可选的 ResultCache：键包含引擎源码版本、回放前的状态和操作序列，命中时直接恢复回放后的状态；
+    # 启用 slab 层时不使用缓存(缓存的状态不含 slab)
+    def replay(self, ops, cache=None):
+        self.save_state()
+        try:
+            return self._replay(ops, cache)
+        except Exception:
+            self._load_state(self.history[self.current_history_index])
+            del self.history[self.current_history_index:]
+            self.current_history_index -= 1
+            raise
+
+    def _replay(self, ops, cache):
+        if self.slab is not None:
+            cache = None
+        key = None
+        if cache is not None:
+            ops = [list(op) for op in ops]
+            start = [self.total_memory, self.free_blocks, sorted(self.allocated_blocks.items()),
+                     self.next_process_id]
+            key = cache.make_key('partition.replay', cache.engine_version(self), start, ops)
+            cached = cache.get(key)
+            if cached is not None:
+                self.free_blocks, self.allocated_blocks, self.next_process_id, results = cached
+                return results
+        results = []
+        for op in ops:
+            if op[0] == 'allocate':
+                results.append(self._allocate(op[1], op[2]))
+            elif op[0] == 'deallocate':
+                results.append(self._deallocate(op[1]))
+            else:
+                raise ValueError(f"未知的操作 {op[0]}，可选 ('allocate', 'deallocate')")
+        if cache is not None:
+            cache.put(key, (self.free_blocks, self.allocated_blocks, self.next_process_id, results))
+        return results
@@ -1,9 +1,13 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-from memory_manager import MemoryManager
+from .memory_manager import MemoryManager
+from .slab import SlabCache, DEFAULT_SIZE_CLASSES
 
 
 class MemorySimulator:
+    # 可由 Instrumentation 挂接统计耗时的界面重绘方法
+    INSTRUMENTED_METHODS = {'update_display': None}
+
     def __init__(self, root):
         # 初始化函数，设置根窗口，内存管理器，整体样式，创建小部件，更新显示，设置快捷键
         self.root = root
@@ -44,6 +48,14 @@ class MemorySimulator:
         self.total_memory_entry.pack(side=tk.LEFT, padx=2)
         ttk.Button(toolbar, text="设置", command=self.set_total_memory).pack(side=tk.LEFT, padx=2)
 
+        # slab 层开关和大小类
+        self.slab_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(toolbar, text="Slab 层", variable=self.slab_var,
+                        command=self.toggle_slab).pack(side=tk.LEFT, padx=(10, 2))
+        ttk.Label(toolbar, text="大小类:").pack(side=tk.LEFT, padx=2)
+        self.slab_classes_var = tk.StringVar(value=",".join(str(c) for c in DEFAULT_SIZE_CLASSES))
+        ttk.Entry(toolbar, textvariable=self.slab_classes_var, width=10).pack(side=tk.LEFT, padx=2)
+
         # 左侧面板
         left_frame = tk.Frame(self.root, bg='#f0f0f0')
         left_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=10, pady=10)
@@ -135,6 +147,10 @@ class MemorySimulator:
         self.frag_label = tk.Label(status_frame, text="碎片率: 0%", bg='#f0f0f0', font=('微软雅黑', 9))
         self.frag_label.pack(fill=tk.BOTH, padx=5)
 
+        # 创建一个Label，用于显示 slab 命中率和内部浪费
+        self.slab_label = tk.Label(status_frame, text="Slab: 未启用", bg='#f0f0f0', font=('微软雅黑', 9))
+        self.slab_label.pack(fill=tk.BOTH, padx=5)
+
 
     def show_hover_info(self, event):
         # 获取鼠标位置对应的内存块信息
@@ -161,6 +177,18 @@ class MemorySimulator:
                 # 返回，不再继续遍历
                 return
 
+        # 遍历 slab 区域(鼠标在 slab 的空闲槽上)
+        slab = self.memory.slab
+        if slab is not None:
+            for start, size_class, slots, used in slab.regions():
+                x1 = (start / total) * width
+                x2 = ((start + slab.slab_size) / total) * width
+                if x1 <= x <= x2:
+                    self.canvas.delete("hover")
+                    self.canvas.create_text(x, 20, text=f"slab {size_class}KB\n已用 {used}/{slots} 槽",
+                                            fill='#E65100', tags="hover", font=('微软雅黑', 8))
+                    return
+
         # 遍历内存中的空闲块
         for block in self.memory.free_blocks:
             # 计算空闲块在画布上的起始位置
@@ -188,7 +216,7 @@ class MemorySimulator:
             if new_size <= 0:
                 raise ValueError
             # 创建新的内存管理器
-            self.memory = MemoryManager(new_size)
+            self.memory = self.create_memory(new_size)
             # 更新显示
             self.update_display()
             # 在信息框中插入设置后的内存大小
@@ -197,6 +225,25 @@ class MemorySimulator:
             # 如果用户输入的内存大小无效，则弹出错误提示框
             messagebox.showerror("错误", "请输入有效的正整数大小")
 
+    def create_memory(self, total):
+        # 按当前的 slab 设置创建内存管理器，大小类无效时抛出 ValueError
+        slab = None
+        if self.slab_var.get():
+            slab = SlabCache([int(c) for c in self.slab_classes_var.get().split(',')])
+        return MemoryManager(total, slab=slab)
+
+    def toggle_slab(self):
+        # 启用或关闭 slab 层：按当前总内存重新创建内存管理器
+        try:
+            self.memory = self.create_memory(self.memory.total_memory)
+        except ValueError:
+            self.slab_var.set(False)
+            messagebox.showerror("错误", "请输入有效的大小类，如 8,16,32")
+            return
+        self.update_display()
+        state = "启用" if self.memory.slab is not None else "关闭"
+        self.info_text.insert(tk.END, f"已{state} slab 层，内存已重置\n")
+
     def handle_undo(self):
         # 撤销上一步操作
         if self.memory.undo():
@@ -220,10 +267,13 @@ class MemorySimulator:
         # 收集所有块
         # 创建一个空列表，用于存储内存块信息
         blocks = []
+        # 获取 slab 层(未启用时为None)
+        slab = self.memory.slab
         # 遍历已分配的内存块
         for pid, info in self.memory.allocated_blocks.items():
-            # 将已分配的内存块信息添加到列表中
-            blocks.append((info['start'], info['size'], 'allocated', pid))
+            # 将已分配的内存块信息添加到列表中，slab 中的对象单独标记
+            typ = 'slab' if slab is not None and slab.owns(info['start']) else 'allocated'
+            blocks.append((info['start'], info['size'], typ, pid))
         # 遍历空闲的内存块
         for block in self.memory.free_blocks:
             # 将空闲的内存块信息添加到列表中
@@ -231,12 +281,26 @@ class MemorySimulator:
         # 对内存块信息进行排序
         blocks.sort()
 
+        # 先把每个 slab 画成一个分组区域，标出大小类和已用槽数，其中的对象再画在区域内部
+        if slab is not None:
+            for start, size_class, slots, used in slab.regions():
+                x1 = (start / total) * width
+                x2 = ((start + slab.slab_size) / total) * width
+                self.canvas.create_rectangle(x1, 10, x2, 90, fill='#FFE0B2', outline='#FF9800', width=2)
+                self.canvas.create_text((x1 + x2) / 2, 18, text=f"{size_class}KB {used}/{slots}",
+                                        fill='#E65100', font=('微软雅黑', 7))
+
         # 绘制块
         # 遍历每个块
         for start, size, typ, pid in blocks:
             # 计算块在画布上的位置
             x1 = (start / total) * width
             x2 = ((start + size) / total) * width
+            if typ == 'slab':
+                # slab 中的对象只标进程ID，槽中多出的部分露出 slab 底色(内部浪费)
+                self.canvas.create_rectangle(x1, 28, x2, 88, fill='#FB8C00', outline='#ffffff')
+                self.canvas.create_text((x1 + x2) / 2, 58, text=str(pid), fill='white', font=('微软雅黑', 7))
+                continue
             # 根据块类型设置颜色
             color = '#4CAF50' if typ == 'free' else '#2196F3'  # 使用更柔和的颜色
             # 在画布上绘制矩形
@@ -265,6 +329,12 @@ class MemorySimulator:
         frag = self.memory.get_fragmentation()
         self.usage_label.config(text=f"内存使用率: {usage:.1f}%")
         self.frag_label.config(text=f"碎片率: {frag:.1f}%")
+        if slab is None:
+            self.slab_label.config(text="Slab: 未启用")
+        else:
+            self.slab_label.config(text=f"Slab 命中率: {slab.hit_rate * 100:.1f}%  "
+                                        f"slab 数: {len(slab.slabs)}  占用: {slab.space()}KB  "
+                                        f"空闲槽: {slab.free_slot_space()}KB  内部浪费: {slab.internal_waste()}KB")
 
     def handle_allocate(self):
         try:
@@ -283,7 +353,7 @@ class MemorySimulator:
             self.info_text.insert(tk.END, f"进程 {pid} 分配成功 (大小: {size}KB)\n")
         else:
             self.info_text.insert(tk.END,
-                                  f"分配失败，内存不足 (请求: {size}KB, 最大可用: {max(block['size'] for block in self.memory.free_blocks)}KB)\n")
+                                  f"分配失败，内存不足 (请求: {size}KB, 最大可用: {max((block['size'] for block in self.memory.free_blocks), default=0)}KB)\n")
         self.update_display()
 
     def handle_deallocate(self):
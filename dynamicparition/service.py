@@ -0,0 +1,64 @@
+"""
+分区会话在模拟服务(simtools/server.py)中的操作：创建 MemoryManager、执行 batch、快照，
+以及 allocate / deallocate / undo / redo 单步操作。服务端按会话类型 partition 找到本模块。
+"""
+from simtools.protocol import KIND_PARTITION, RequestError
+from .memory_manager import MemoryManager
+from .slab import SlabCache, DEFAULT_SLAB_SIZE
+
+KIND = KIND_PARTITION
+
+
+def create(request, max_history):
+    """
+    create 请求：memory，可选 size_classes、slab_size 启用 slab 层。
+    :param max_history: 撤销历史最多保留的条数，None 表示不限制
+    """
+    slab = None
+    if request.get("size_classes"):
+        slab = SlabCache([int(c) for c in request["size_classes"]], int(request.get("slab_size", DEFAULT_SLAB_SIZE)))
+    return MemoryManager(int(request.get("memory", 1024)), slab=slab, max_history=max_history)
+
+
+def run_batch(engine, request):
+    """batch 请求：ops=[["allocate", 大小, 算法], ["deallocate", 进程ID], ...]，返回每步结果。出错时引擎不变。"""
+    ops = request.get("ops")
+    if not isinstance(ops, list):
+        raise RequestError("partition 的 batch 需要 ops 列表")
+    return engine.replay(ops)
+
+
+def snapshot(engine):
+    return {
+        "total_memory": engine.total_memory,
+        "free_blocks": engine.free_blocks,
+        "allocated_blocks": {str(pid): block for pid, block in engine.allocated_blocks.items()},
+        "memory_usage": engine.get_memory_usage(),
+        "fragmentation": engine.get_fragmentation(),
+        "can_undo": engine.current_history_index > 0,
+        "slab": engine.slab.report() if engine.slab is not None else None,
+    }
+
+
+def op_allocate(engine, request):
+    return engine.allocate(int(request["size"]), request.get("algorithm", "first_fit"))
+
+
+def op_deallocate(engine, request):
+    return engine.deallocate(int(request["pid"]))
+
+
+def op_undo(engine, request):
+    return engine.undo()
+
+
+def op_redo(engine, request):
+    return engine.redo()
+
+
+OPS = {
+    "allocate": op_allocate,
+    "deallocate": op_deallocate,
+    "undo": op_undo,
+    "redo": op_redo,
+}
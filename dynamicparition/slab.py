@@ -0,0 +1,165 @@
+"""
+分区分配器前面的 slab 层。
+常见的小请求按大小类(size class)向上取整，从分区分配器切出固定大小的 slab，
+每个 slab 划分为 slab_size // 大小类 个同样大小的槽，用位图记录空闲槽。
+同一大小类的请求直接从有空闲槽的 slab 中取最低的空闲槽，O(1) 完成，不扫描空闲分区表；
+某个 slab 的槽全部空闲时立即还给分区分配器。
+
+    manager = MemoryManager(1024, slab=SlabCache((8, 16, 32), slab_size=64))
+"""
+
+DEFAULT_SIZE_CLASSES = (8, 16, 32)
+DEFAULT_SLAB_SIZE = 64  # 每个 slab 的大小(与内存大小同单位)
+
+
+class SlabCache:
+    """
+    按大小类管理 slab。MemoryManager 在分配、释放、保存历史时调用它，
+    对象地址由它给出，进程ID仍由 MemoryManager 分配和登记。
+    统计数据(命中率等)是累计值，撤销/重做不回退。
+    """
+
+    # 可由 Instrumentation 挂接统计耗时的方法
+    INSTRUMENTED_METHODS = {"allocate": None, "free": None}
+
+    def __init__(self, size_classes=DEFAULT_SIZE_CLASSES, slab_size=DEFAULT_SLAB_SIZE):
+        """
+        :param size_classes: 大小类序列，不超过最大大小类的请求由 slab 层处理
+        :param slab_size: 每个 slab 从分区分配器切出的大小
+        """
+        classes = sorted(set(size_classes))
+        if not classes or classes[0] <= 0 or classes[-1] > slab_size:
+            raise ValueError(f"大小类 {classes} 必须为正整数且不超过 slab 大小 {slab_size}")
+        self.size_classes = tuple(classes)
+        self.slab_size = slab_size
+        # class_of[size] 为能容纳 size 的最小大小类，查表 O(1)
+        self.class_of = [None] * (classes[-1] + 1)
+        c = 0
+        for size in range(1, classes[-1] + 1):
+            if size > classes[c]:
+                c += 1
+            self.class_of[size] = classes[c]
+        # 每个大小类的槽数和“全部空闲”的位图
+        self.slots = {c: slab_size // c for c in classes}
+        self.full_bits = {c: (1 << n) - 1 for c, n in self.slots.items()}
+        self.reset_stats()
+        self.clear()
+
+    def clear(self):
+        self.slabs = {}  # slab 起始地址 -> 大小类
+        self.free_bits = {}  # slab 起始地址 -> 空闲槽位图，第 i 位为 1 表示第 i 个槽空闲
+        self.partial = {c: {} for c in self.size_classes}  # 大小类 -> 有空闲槽的 slab(dict 当作有序集合)
+        self.objects = {}  # 对象地址 -> (slab 起始地址, 槽号, 申请的大小)
+
+    def reset_stats(self):
+        self.requests = 0  # 交给 slab 层的申请数
+        self.hits = 0  # 直接从已有 slab 的空闲槽满足的申请数
+        self.slabs_created = 0
+        self.slabs_released = 0
+        self.fallbacks = 0  # 切不出新 slab、退回分区分配的申请数
+
+    def handles(self, size):
+        """size 是否由 slab 层处理(不超过最大的大小类)。"""
+        return 0 < size < len(self.class_of)
+
+    def owns(self, address):
+        return address in self.objects
+
+    def allocate(self, manager, size, algorithm):
+        """
+        为 size 分配一个槽，没有空闲槽时按 algorithm 从 manager 切出一个新 slab。
+        :return: 对象地址；切不出新 slab 时返回 None
+        """
+        c = self.class_of[size]
+        self.requests += 1
+        partial = self.partial[c]
+        if partial:
+            self.hits += 1
+            start = next(iter(partial))
+        else:
+            start = manager._carve(self.slab_size, algorithm)
+            if start is None:
+                self.fallbacks += 1
+                return None
+            self.slabs_created += 1
+            self.slabs[start] = c
+            self.free_bits[start] = self.full_bits[c]
+            partial[start] = None
+        bits = self.free_bits[start]
+        # 取最低的空闲槽
+        slot = (bits & -bits).bit_length() - 1
+        bits &= bits - 1
+        self.free_bits[start] = bits
+        if not bits:
+            del partial[start]
+        address = start + slot * c
+        self.objects[address] = (start, slot, size)
+        return address
+
+    def free(self, manager, address):
+        """释放地址为 address 的对象；所在 slab 全部空闲时还给 manager。"""
+        start, slot, _ = self.objects.pop(address)
+        c = self.slabs[start]
+        bits = self.free_bits[start] | (1 << slot)
+        if bits == self.full_bits[c]:
+            del self.slabs[start], self.free_bits[start]
+            self.partial[c].pop(start, None)
+            manager._release(start, self.slab_size)
+            self.slabs_released += 1
+        else:
+            self.free_bits[start] = bits
+            self.partial[c][start] = None
+
+    # ---------- 历史快照 ----------
+    def snapshot(self):
+        return (dict(self.slabs), dict(self.free_bits), {c: dict(p) for c, p in self.partial.items()},
+                dict(self.objects))
+
+    def restore(self, state):
+        slabs, free_bits, partial, objects = state
+        self.slabs = dict(slabs)
+        self.free_bits = dict(free_bits)
+        self.partial = {c: dict(p) for c, p in partial.items()}
+        self.objects = dict(objects)
+
+    # ---------- 统计 ----------
+    @property
+    def hit_rate(self):
+        """交给 slab 层的申请中，直接从已有 slab 满足(不必切新 slab)的比例。"""
+        return self.hits / self.requests if self.requests else 0.0
+
+    def space(self):
+        """已从分区分配器切出的 slab 总大小。"""
+        return len(self.slabs) * self.slab_size
+
+    def internal_waste(self):
+        """内部浪费：已分配对象按大小类向上取整多占的空间，加上每个 slab 末尾放不下一个槽的余量。"""
+        rounding = sum(self.slabs[start] - size for start, _, size in self.objects.values())
+        tails = sum(self.slab_size % c for c in self.slabs.values())
+        return rounding + tails
+
+    def free_slot_space(self):
+        """slab 中空闲槽的总大小(已从分区分配器切出、但暂未使用的空间)。"""
+        return sum(bin(bits).count("1") * self.slabs[start] for start, bits in self.free_bits.items())
+
+    def regions(self):
+        """按地址排列的 [(slab 起始地址, 大小类, 槽数, 已用槽数)]，供界面绘制。"""
+        return [(start, c, self.slots[c], self.slots[c] - bin(self.free_bits[start]).count("1"))
+                for start, c in sorted(self.slabs.items())]
+
+    def report(self):
+        return {
+            "size_classes": list(self.size_classes),
+            "slab_size": self.slab_size,
+            "requests": self.requests,
+            "hits": self.hits,
+            "hit_rate": self.hit_rate,
+            "fallbacks": self.fallbacks,
+            "slabs": len(self.slabs),
+            "slabs_created": self.slabs_created,
+            "slabs_released": self.slabs_released,
+            "slab_space": self.space(),
+            "objects": len(self.objects),
+            "internal_waste": self.internal_waste(),
+            "free_slot_space": self.free_slot_space(),
+        }
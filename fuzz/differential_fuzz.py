@@ -0,0 +1,1196 @@
+"""
+两个模拟器的差分模糊测试：用同一条随机操作流(含撤销、重做、重置)同时驱动参照实现和待测实现，
+每一步之后比较返回结果和完整状态，并检查状态自身的不变式；发现不一致时把用例缩减到最小再输出。
+
+    python fuzz/differential_fuzz.py                          # 全部目标，默认 100 万步
+    python fuzz/differential_fuzz.py --target paging --steps 5000000 --seed 7
+    python fuzz/differential_fuzz.py --time-limit 60 --workers 0   # 在 CI 中限定时间，用满全部 CPU
+    python fuzz/differential_fuzz.py --replay fuzz-failure.json
+
+目标与实现：
+  partition   参照 MemoryManager 逐次 allocate/deallocate；待测 replay(批量回放路径)
+  paging      参照 PagingSimulation(哈希页表)逐次 execute，撤销时从头重建再重放；
+              待测 timeline(数组页表 + Timeline 检查点/run_trace)、
+              checkpoint(逐次 run_trace，撤销时恢复 SimulationCheckpoint)
+  paging-opt  OPT 置换：参照 load_trace 后逐次 execute；待测 Timeline 的 step/undo/redo/seek
+  slab        带 slab 层的 MemoryManager：参照逐次 allocate/deallocate；待测 replay，另查 slab 位图与对象
+  huge-pages  HugePageSimulation(只查不变式)：块不重叠且与位图一致，叶子页表、FIFO、TLB 与映射相符
+  fork        写时复制 fork 的一族作业(只查不变式)：共享帧登记与各作业页表相符，写后不再共享
+  system      SystemPagingSimulation(只查不变式)：块记账、挂起作业不占块、额度与全局 FIFO，run 必须结束
+
+新的优化实现只需写一个与参照实现同接口的驱动类(apply(op) 返回可比较的结果，state() 返回完整状态)，
+加入对应 FuzzTarget 的 candidates 即可。
+失败用例以 JSON 保存(目标、待测实现、配置、操作序列)，可用 --replay 复现。
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+if not __package__:
+    # 从仓库根目录导入两个模拟器包
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dynamicparition.memory_manager import MemoryManager
+from dynamicparition.slab import SlabCache
+from dynamicpaging.simulation.huge_pages import HugePageSimulation
+from dynamicpaging.simulation.io_model import IOCostModel
+from dynamicpaging.simulation.page_table import PAGE_TABLE_SPARSE, PAGE_TABLE_COMPACT
+from dynamicpaging.simulation.paging_simulation import (PagingSimulation, POLICY_FIFO, POLICY_OPT, ACCESS_MISS,
+                                                        MAX_BLOCKS, BLOCK_SIZE)
+from dynamicpaging.simulation.prefetch import SequentialPrefetcher, StridePrefetcher
+from dynamicpaging.simulation.system_simulation import (SystemPagingSimulation, REPLACE_GLOBAL, REPLACEMENT_SCOPES,
+                                                        ALLOCATION_POLICIES, ALLOC_FIXED)
+from dynamicpaging.simulation.timeline import Timeline
+from dynamicpaging.simulation.tlb import TLB, TLB_LRU, TLB_POLICIES
+
+DEFAULT_STEPS = 1_000_000
+DEFAULT_LENGTH = 200  # 每个用例的操作数
+FAILURE_PATH = "fuzz-failure.json"
+
+ALGORITHMS = ("first_fit", "best_fit", "worst_fit")
+ACCESS_OPS = ("load", "save", "+")
+PREFETCHERS = {"sequential": SequentialPrefetcher, "stride": StridePrefetcher}
+
+
+def _call(func, *args):
+    """调用 func，异常也作为可比较的结果返回(两边抛出同样的异常视为一致)。"""
+    try:
+        return func(*args)
+    except Exception as e:
+        return ("error", type(e).__name__, str(e))
+
+
+# ---------- 分区分配 ----------
+
+def partition_config(rng):
+    return {"memory": rng.choice((64, 256, 1024))}
+
+
+def partition_ops(rng, config, length):
+    memory = config["memory"]
+    ops = []
+    allocations = 0
+    for _ in range(length):
+        r = rng.random()
+        if r < 0.45:
+            # 偶尔请求超过总量的大小，覆盖分配失败的路径
+            size = rng.randint(1, memory // 4) if rng.random() < 0.95 else rng.randint(1, memory * 2)
+            ops.append(["allocate", size, rng.choice(ALGORITHMS)])
+            allocations += 1
+        elif r < 0.8:
+            ops.append(["deallocate", rng.randint(1, allocations + 2)])
+        elif r < 0.9:
+            ops.append(["undo"])
+        elif r < 0.97:
+            ops.append(["redo"])
+        else:
+            ops.append(["reset"])
+    return ops
+
+
+def partition_simplify(op):
+    """op 的更简单的变体：更小的分配大小、首次适应、更小的进程ID。"""
+    if op[0] == "allocate":
+        size, algorithm = op[1], op[2]
+        if size > 1:
+            yield ["allocate", size // 2, algorithm]
+        if algorithm != "first_fit":
+            yield ["allocate", size, "first_fit"]
+    elif op[0] == "deallocate" and op[1] > 1:
+        yield ["deallocate", op[1] - 1]
+
+
+def check_partition(m):
+    """检查分区状态的不变式，返回问题描述(没有问题时为 None)。启用 slab 层时 slab 整块计入，对象另行检查。"""
+    slab = m.slab
+    pieces = [(b['start'], b['size'], None) for b in m.free_blocks]
+    pieces += [(b['start'], b['size'], pid) for pid, b in m.allocated_blocks.items()
+               if slab is None or not slab.owns(b['start'])]
+    if slab is not None:
+        pieces += [(start, slab.slab_size, "slab") for start in slab.slabs]
+    pieces.sort(key=lambda x: x[0])
+    pos = 0
+    for start, size, pid in pieces:
+        if size <= 0 or start != pos:
+            return f"内存块不连续或重叠：{pieces}"
+        pos = start + size
+    if pos != m.total_memory:
+        return f"内存块总大小 {pos} 与内存大小 {m.total_memory} 不符"
+    starts = [b['start'] for b in m.free_blocks]
+    if starts != sorted(starts):
+        return f"空闲块没有按起始地址排列：{m.free_blocks}"
+    for a, b in zip(m.free_blocks, m.free_blocks[1:]):
+        if a['start'] + a['size'] == b['start']:
+            return f"相邻空闲块没有合并：{m.free_blocks}"
+    if any(pid >= m.next_process_id for pid in m.allocated_blocks):
+        return f"进程ID不小于 next_process_id={m.next_process_id}"
+    return check_slab(m) if slab is not None else None
+
+
+def check_slab(m):
+    """slab 层的不变式：对象落在所属 slab 的槽上且互不重叠，位图、partial 表与对象一一对应。"""
+    slab = m.slab
+    owners = {b['start']: (pid, b['size']) for pid, b in m.allocated_blocks.items() if slab.owns(b['start'])}
+    if len(owners) != len(slab.objects):
+        return f"slab 对象 {sorted(slab.objects)} 与已分配块 {sorted(owners)} 不是一一对应"
+    used = {start: 0 for start in slab.slabs}
+    for address, (start, slot, size) in slab.objects.items():
+        c = slab.slabs.get(start)
+        if c is None or not 0 <= slot < slab.slots[c] or address != start + slot * c:
+            return f"对象 {address} 不在所属 slab {start} 的槽 {slot} 上"
+        if owners[address][1] != size or size > c:
+            return f"对象 {address} 的大小 {size} 与已分配块 {owners[address]} 或大小类 {c} 不符"
+        if used[start] >> slot & 1:
+            return f"slab {start} 的槽 {slot} 上有多个对象"
+        used[start] |= 1 << slot
+    for start, c in slab.slabs.items():
+        bits = slab.free_bits.get(start)
+        if bits is None or bits != slab.full_bits[c] ^ used[start]:
+            return f"slab {start} 的空闲位图 {bits} 与对象占用的槽 {used[start]:b} 不符"
+        if not used[start]:
+            return f"slab {start} 已全部空闲却没有还给分区分配器"
+        if (start in slab.partial[c]) != bool(bits):
+            return f"slab {start} 是否有空闲槽与 partial 表不符"
+    if set(slab.free_bits) != set(slab.slabs):
+        return f"位图 {sorted(slab.free_bits)} 与 slab 表 {sorted(slab.slabs)} 不符"
+    for c, partial in slab.partial.items():
+        if any(slab.slabs.get(start) != c for start in partial):
+            return f"大小类 {c} 的 partial 表含有其他大小类或已释放的 slab：{list(partial)}"
+    return None
+
+
+class PartitionReference:
+    """参照实现：MemoryManager 逐次 allocate / deallocate，重置时换一个新的 MemoryManager(与界面相同)。"""
+
+    def __init__(self, config):
+        self.config = config
+        self.manager = self._new_manager()
+
+    def _new_manager(self):
+        return MemoryManager(self.config["memory"])
+
+    def apply(self, op):
+        kind = op[0]
+        m = self.manager
+        if kind == "allocate":
+            return m.allocate(op[1], op[2])
+        if kind == "deallocate":
+            return m.deallocate(op[1])
+        if kind == "undo":
+            return m.undo()
+        if kind == "redo":
+            return m.redo()
+        if kind == "reset":
+            self.manager = self._new_manager()
+            return None
+        raise ValueError(f"未知的操作 {kind}")
+
+    def state(self):
+        m = self.manager
+        return (tuple((b['start'], b['size']) for b in m.free_blocks),
+                tuple(sorted((pid, b['start'], b['size']) for pid, b in m.allocated_blocks.items())),
+                m.next_process_id, m.current_history_index, len(m.history))
+
+    def check(self):
+        return check_partition(self.manager)
+
+
+class PartitionReplay(PartitionReference):
+    """待测：每次分配/释放都经由 MemoryManager.replay(服务端和缓存使用的批量路径)。"""
+
+    def apply(self, op):
+        if op[0] in ("allocate", "deallocate"):
+            return self.manager.replay([op])[0]
+        return super().apply(op)
+
+
+# ---------- 分区分配 + slab 层 ----------
+
+def slab_config(rng):
+    slab_size = rng.choice((32, 64, 128))
+    classes = sorted(rng.sample((4, 8, 12, 16, 24, 32), rng.randint(1, 3)))
+    return {"memory": rng.choice((256, 1024, 4096)), "size_classes": classes, "slab_size": slab_size}
+
+
+def slab_ops(rng, config, length):
+    largest = config["size_classes"][-1]
+    ops = partition_ops(rng, config, length)
+    for op in ops:
+        # 大部分申请落在大小类范围内，才能反复切出、填满、归还 slab
+        if op[0] == "allocate" and rng.random() < 0.8:
+            op[1] = rng.randint(1, largest)
+    return ops
+
+
+class SlabReference(PartitionReference):
+    """参照实现：带 slab 层的 MemoryManager 逐次 allocate / deallocate。"""
+
+    def _new_manager(self):
+        config = self.config
+        return MemoryManager(config["memory"], slab=SlabCache(config["size_classes"], config["slab_size"]))
+
+    def state(self):
+        slabs, free_bits, partial, objects = self.manager.slab.snapshot()
+        return super().state() + (tuple(sorted(slabs.items())), tuple(sorted(free_bits.items())),
+                                  tuple((c, tuple(p)) for c, p in sorted(partial.items())),
+                                  tuple(sorted(objects.items())))
+
+
+class SlabReplay(PartitionReplay, SlabReference):
+    """待测：带 slab 层时经由 MemoryManager.replay 分配/释放。"""
+
+
+# ---------- 请求分页(FIFO) ----------
+
+def paging_config(rng, policy=POLICY_FIFO):
+    num_pages = rng.choice((4, 8, 16, 64))
+    config = {
+        "policy": policy,
+        "num_pages": num_pages,
+        "frames": rng.sample(range(MAX_BLOCKS), rng.randint(1, min(num_pages, 8))),
+        "interval": rng.randint(1, 16),
+        "tlb": None,
+        "io": None,
+        "prefetch": None,
+    }
+    if rng.random() < 0.4:
+        entries = rng.choice((2, 4, 8))
+        config["tlb"] = {"entries": entries, "ways": rng.choice((None, 1, 2)),
+                         "policy": rng.choice(TLB_POLICIES), "seed": rng.randrange(1000)}
+    if rng.random() < 0.4:
+        config["io"] = {"free_list_size": rng.randint(0, 4), "modified_list_size": rng.randint(0, 4),
+                        "flush_interval": rng.choice((0, 3, 7)), "flush_batch": rng.randint(1, 4)}
+    if policy == POLICY_FIFO and rng.random() < 0.25:
+        config["prefetch"] = [rng.choice(sorted(PREFETCHERS)), rng.randint(1, 2)]
+    return config
+
+
+def make_paging_sim(config, page_table_type):
+    tlb = TLB(**config["tlb"]) if config["tlb"] else None
+    io = IOCostModel(**config["io"]) if config["io"] else None
+    prefetcher = None
+    if config["prefetch"]:
+        name, degree = config["prefetch"]
+        prefetcher = PREFETCHERS[name](degree)
+    return PagingSimulation(config["num_pages"], list(config["frames"]), config["policy"],
+                            page_table_type=page_table_type, tlb=tlb, io_model=io, prefetcher=prefetcher)
+
+
+def _random_access(rng, num_pages):
+    # 少量越界的页号和页内地址，覆盖非法访问的路径
+    page = rng.randrange(num_pages) if rng.random() < 0.97 else rng.choice((-1, num_pages))
+    offset = rng.randrange(BLOCK_SIZE) if rng.random() < 0.97 else BLOCK_SIZE
+    return rng.choice(ACCESS_OPS), page, offset
+
+
+def paging_ops(rng, config, length):
+    num_pages = config["num_pages"]
+    ops = []
+    for _ in range(length):
+        r = rng.random()
+        if r < 0.8:
+            ops.append(["access", *_random_access(rng, num_pages)])
+        elif r < 0.9:
+            ops.append(["undo"])
+        elif r < 0.98:
+            ops.append(["redo"])
+        else:
+            ops.append(["reset"])
+    return ops
+
+
+def paging_simplify(op):
+    if op[0] == "access":
+        _, access, page, offset = op
+        if access != "load":
+            yield ["access", "load", page, offset]
+        if page > 0:
+            yield ["access", access, page // 2, offset]
+        if offset != 0:
+            yield ["access", access, page, 0]
+
+
+def paging_state(sim):
+    """模拟器的完整可观察状态：常驻页、FIFO 队列、已用帧、预取集合、TLB 和 I/O 模型。"""
+    tlb = sim.tlb
+    tlb_state = None
+    if tlb is not None:
+        if tlb.policy == TLB_LRU:
+            sets = tuple(tuple(s.items()) for s in tlb.sets)
+        else:
+            sets = tuple((tuple(s.keys), tuple(sorted(s.frames.items()))) for s in tlb.sets)
+        tlb_state = (tlb.hits, tlb.misses, sets)
+    io = sim.io_model
+    io_state = None
+    if io is not None:
+        io_state = (tuple(io.free_list), tuple(io.modified_list), io.accesses, io.hard_faults, io.soft_faults,
+                    io.disk_reads, io.sync_writes, io.background_writes, io.total_time)
+    prefetcher = sim.prefetcher
+    prefetch_state = None
+    if prefetcher is not None:
+        prefetch_state = tuple(sorted((k, v) for k, v in vars(prefetcher).items()))
+    return (tuple(sorted((p, e.frame, bool(e.modified)) for p, e in sim.page_table.valid_items())),
+            tuple(sim.fifo_queue), tuple(sorted(sim.used_frames)), tuple(sorted(sim.prefetched)),
+            sim.dirty_evictions, tlb_state, io_state, prefetch_state)
+
+
+def check_paging(sim):
+    resident = sim.page_table.valid_items()
+    frames = [e.frame for _, e in resident]
+    if len(set(frames)) != len(frames):
+        return f"多个页装入了同一帧：{resident}"
+    if set(frames) != sim.used_frames:
+        return f"used_frames {sorted(sim.used_frames)} 与常驻页的帧 {sorted(frames)} 不符"
+    if not sim.used_frames <= set(sim.allocated_frames_list):
+        return f"使用了未分配的帧：{sorted(sim.used_frames)}"
+    if sim.policy == POLICY_FIFO and sorted(sim.fifo_queue) != sorted(p for p, _ in resident):
+        return f"FIFO 队列 {list(sim.fifo_queue)} 与常驻页不符"
+    return None
+
+
+def _execute(sim, op):
+    _, access, page, offset = op
+    _, replaced, loaded = sim.execute(access, page, offset)
+    return replaced, loaded
+
+
+def _run_one(sim, op):
+    """用 run_trace 执行一次访问，结果换算成与 execute 相同的 (被淘汰页, 装入页)。"""
+    _, access, page, offset = op
+    r = sim.run_trace([access], [page], [offset])
+    victim = r.victims[0]
+    return (victim if victim >= 0 else None), (page if r.status[0] == ACCESS_MISS else None)
+
+
+class PagingReference:
+    """
+    参照实现：哈希页表上逐次 execute。
+    撤销时新建模拟器，从头重放撤销后仍保留的全部访问和重置(TLB 随机替换的随机数状态也随之重现)。
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.sim = make_paging_sim(config, PAGE_TABLE_SPARSE)
+        self.events = []  # 创建以来保留的访问和重置，重建时按顺序重放
+        self.undoable = 0  # 最近一次重置之后的访问数
+        self.undone = []  # 可重做的访问
+
+    def apply(self, op):
+        kind = op[0]
+        if kind == "access":
+            self.undone = []
+            return self._push(op)
+        if kind == "undo":
+            if not self.undoable:
+                return None
+            self.undone.append(self.events.pop())
+            self.undoable -= 1
+            self.sim = make_paging_sim(self.config, PAGE_TABLE_SPARSE)
+            for event in self.events:
+                if event[0] == "reset":
+                    self.sim.reset()
+                else:
+                    _execute(self.sim, event)
+            return None
+        if kind == "redo":
+            return self._push(self.undone.pop()) if self.undone else None
+        if kind == "reset":
+            self.sim.reset()
+            self.events.append(op)
+            self.undoable = 0
+            self.undone = []
+            return None
+        raise ValueError(f"未知的操作 {kind}")
+
+    def _push(self, op):
+        self.events.append(op)
+        self.undoable += 1
+        return _execute(self.sim, op)
+
+    def state(self):
+        return paging_state(self.sim)
+
+    def check(self):
+        return check_paging(self.sim)
+
+
+class PagingTimeline(PagingReference):
+    """待测：数组页表 + Timeline，撤销时从检查点恢复再用 run_trace 重放(与界面相同)。"""
+
+    def __init__(self, config):
+        self.config = config
+        self.sim = make_paging_sim(config, PAGE_TABLE_COMPACT)
+        self.timeline = Timeline(self.sim, interval=config["interval"])
+
+    def apply(self, op):
+        kind = op[0]
+        if kind == "access":
+            _, replaced, loaded = self.timeline.record(*op[1:])
+            return replaced, loaded
+        if kind == "undo":
+            return self.timeline.undo()
+        if kind == "redo":
+            result = self.timeline.redo()
+            return None if result is None else result[1:]
+        if kind == "reset":
+            self.sim.reset()
+            self.timeline = Timeline(self.sim, interval=self.config["interval"])
+            return None
+        raise ValueError(f"未知的操作 {kind}")
+
+
+class PagingCheckpoint(PagingReference):
+    """待测：每次访问都走 run_trace 快速路径，访问前保存 SimulationCheckpoint，撤销时恢复。"""
+
+    def __init__(self, config):
+        self.config = config
+        self.sim = make_paging_sim(config, PAGE_TABLE_SPARSE)
+        self.done = []  # [(访问前的检查点, 访问)]
+        self.undone = []
+
+    def apply(self, op):
+        kind = op[0]
+        if kind == "access":
+            self.undone = []
+            return self._push(op)
+        if kind == "undo":
+            if not self.done:
+                return None
+            checkpoint, access = self.done.pop()
+            self.sim.restore(checkpoint)
+            self.undone.append(access)
+            return None
+        if kind == "redo":
+            return self._push(self.undone.pop()) if self.undone else None
+        if kind == "reset":
+            self.sim.reset()
+            self.done = []
+            self.undone = []
+            return None
+        raise ValueError(f"未知的操作 {kind}")
+
+    def _push(self, op):
+        self.done.append((self.sim.checkpoint(), op))
+        return _run_one(self.sim, op)
+
+
+# ---------- 请求分页(OPT) ----------
+
+def opt_config(rng):
+    config = paging_config(rng, POLICY_OPT)
+    length = rng.randint(1, 120)
+    accesses = [_random_access(rng, config["num_pages"]) for _ in range(length)]
+    config["trace"] = [list(a) for a in zip(*accesses)]
+    return config
+
+
+def opt_ops(rng, config, length):
+    n = len(config["trace"][1])
+    ops = []
+    for _ in range(length):
+        r = rng.random()
+        if r < 0.6:
+            ops.append(["step"])
+        elif r < 0.75:
+            ops.append(["undo"])
+        elif r < 0.85:
+            ops.append(["redo"])
+        else:
+            ops.append(["seek", rng.randint(0, n)])
+    return ops
+
+
+def opt_simplify(op):
+    if op[0] == "seek":
+        yield ["step"]
+        if op[1] > 0:
+            yield ["seek", op[1] // 2]
+
+
+class OptReference:
+    """参照实现：load_trace 装入完整访问串后逐次 execute；后退时新建模拟器从头执行。"""
+
+    def __init__(self, config):
+        self.config = config
+        self.ops, self.pages, self.offsets = config["trace"]
+        self._rebuild()
+
+    def _rebuild(self):
+        self.sim = make_paging_sim(self.config, PAGE_TABLE_SPARSE)
+        self.sim.load_trace(self.pages)
+        self.position = 0
+
+    def _step(self):
+        i = self.position
+        self.position += 1
+        _, replaced, loaded = self.sim.execute(self.ops[i], self.pages[i], self.offsets[i])
+        return replaced, loaded
+
+    def apply(self, op):
+        kind = op[0]
+        if kind in ("step", "redo"):
+            return self._step() if self.position < len(self.pages) else None
+        if kind == "undo":
+            if self.position > 0:
+                self._seek(self.position - 1)
+            return None
+        if kind == "seek":
+            self._seek(op[1])
+            return None
+        raise ValueError(f"未知的操作 {kind}")
+
+    def _seek(self, k):
+        if k < self.position:
+            self._rebuild()
+        while self.position < k:
+            self._step()
+
+    def state(self):
+        return self.position, paging_state(self.sim)
+
+    def check(self):
+        return check_paging(self.sim)
+
+
+class OptTimeline(OptReference):
+    """待测：Timeline 在 OPT 下的前后跳转(检查点恢复 + run_trace 重放)。"""
+
+    def __init__(self, config):
+        self.config = config
+        self.sim = make_paging_sim(config, PAGE_TABLE_COMPACT)
+        ops, pages, offsets = config["trace"]
+        self.timeline = Timeline(self.sim, ops, pages, offsets, interval=config["interval"])
+
+    @property
+    def position(self):
+        return self.timeline.position
+
+    def apply(self, op):
+        kind = op[0]
+        if kind in ("step", "redo"):
+            result = self.timeline.step()
+            return None if result is None else result[1:]
+        if kind == "undo":
+            return self.timeline.undo()
+        if kind == "seek":
+            self.timeline.seek(op[1])
+            return None
+        raise ValueError(f"未知的操作 {kind}")
+
+
+# ---------- 只检查不变式的目标 ----------
+# 以下模拟器没有另一套可逐步对照的实现，待测实现记为 None：run_case 只驱动参照实现，
+# 每步检查它的不变式，驱动类也会核对每次访问的返回值与访问前的状态是否相符。
+
+def _tlb_items(tlb):
+    """TLB 中的全部 (键, 帧号)。"""
+    if tlb.policy == TLB_LRU:
+        return [item for s in tlb.sets for item in s.items()]
+    return [item for s in tlb.sets for item in s.frames.items()]
+
+
+# ---------- 大页 ----------
+
+def huge_config(rng):
+    factor = rng.choice((2, 4, 8))
+    num_frames = factor * rng.randint(1, 4) + rng.randrange(factor)
+    promote = rng.choice((None, 0.5, 0.75, 1.0))
+    demote = rng.choice((None, 0.25)) if promote is not None else None
+    return {"num_pages": rng.randint(1, 4 * num_frames), "num_frames": num_frames, "huge_factor": factor,
+            "promote_threshold": promote, "demote_threshold": demote, "sample_interval": rng.randint(1, 20),
+            "tlb": {"entries": rng.choice((2, 4, 8)), "policy": rng.choice(TLB_POLICIES),
+                    "seed": rng.randrange(1000)}}
+
+
+def huge_ops(rng, config, length):
+    num_pages = config["num_pages"]
+    ops = []
+    for _ in range(length):
+        r = rng.random()
+        if r < 0.98:
+            # 偶尔越界，覆盖 ValueError 的路径
+            page = rng.randrange(num_pages) if rng.random() < 0.98 else num_pages
+            ops.append(["access", page])
+        else:
+            ops.append(["reset"])
+    return ops
+
+
+def huge_simplify(op):
+    if op[0] == "access" and op[1] > 0:
+        yield ["access", op[1] // 2]
+
+
+def check_huge(sim):
+    """大页模拟的不变式：基本页与大页占用的块互不重叠且与位图一致，叶子页表计数、FIFO、TLB 与映射相符。"""
+    factor = sim.huge_factor
+    owner = {}
+    for p, f in sim.base_frame.items():
+        if f in owner or sim.frame_page[f] != p:
+            return f"基本页 {p} 的帧 {f} 重复或与 frame_page 不符"
+        owner[f] = p
+        if p // factor in sim.huge_slot:
+            return f"基本页 {p} 所在的区已经映射为大页"
+    for region, start in sim.huge_slot.items():
+        if start % factor or start + factor > sim.num_frames or (region + 1) * factor > sim.num_pages:
+            return f"大页 {region} 的块组 {start} 没有对齐或越界"
+        for f in range(start, start + factor):
+            if f in owner or sim.frame_page[f] != -1:
+                return f"大页 {region} 的块 {f} 与其他映射重叠"
+            owner[f] = ("huge", region)
+    used = {f for f in range(sim.num_frames) if sim.used[f]}
+    if used != set(owner):
+        return f"已用块 {sorted(used)} 与映射占用的块 {sorted(owner)} 不符"
+    if sim.free_count != sim.num_frames - len(used):
+        return f"free_count {sim.free_count} 与位图不符"
+    if any(sim.frame_page[f] != -1 for f in range(sim.num_frames) if f not in owner):
+        return "空闲块的 frame_page 不为 -1"
+    counts = {}
+    for p in sim.base_frame:
+        counts[p // factor] = counts.get(p // factor, 0) + 1
+    if counts != sim.region_resident:
+        return f"区内驻留页数 {sim.region_resident} 与基本页映射 {counts} 不符"
+    if set(sim.huge_touched) != set(sim.huge_slot):
+        return "huge_touched 与大页不符"
+    if sim.slot_region != {start: region for region, start in sim.huge_slot.items()}:
+        return f"slot_region {sim.slot_region} 与大页不符"
+    live = {p << 1 for p in sim.base_frame} | {(r << 1) | 1 for r in sim.huge_slot}
+    if set(sim.fifo_stamp) != live:
+        return f"fifo_stamp 的映射 {sorted(sim.fifo_stamp)} 与现存映射 {sorted(live)} 不符"
+    queued = [key for key, stamp in sim.fifo if sim.fifo_stamp.get(key) == stamp]
+    if sorted(queued) != sorted(live):
+        return f"FIFO 队列中的有效项 {sorted(queued)} 与现存映射 {sorted(live)} 不符"
+    if len(sim.fifo) > 2 * sim.num_frames + factor + 1:
+        return f"FIFO 队列长度 {len(sim.fifo)} 超过物理块数 {sim.num_frames} 的两倍"
+    stale = {key for key, _ in _tlb_items(sim.tlb)} - live
+    if stale:
+        return f"TLB 中有已撤销的映射 {sorted(stale)}"
+    return None
+
+
+class HugeInvariants:
+    """逐次 access 驱动 HugePageSimulation：返回值应与访问前该页是否已映射一致，访问后该页必须已映射。"""
+
+    def __init__(self, config):
+        self.config = config
+        self.problem = None
+        self._rebuild()
+
+    def _rebuild(self):
+        config = dict(self.config)
+        config["tlb"] = TLB(**config["tlb"])
+        self.sim = HugePageSimulation(**config)
+
+    def _mapped(self, page):
+        return page in self.sim.base_frame or page // self.sim.huge_factor in self.sim.huge_slot
+
+    def apply(self, op):
+        if op[0] == "reset":
+            self._rebuild()
+            return None
+        page = op[1]
+        before = 0 <= page < self.sim.num_pages and self._mapped(page)
+        fault = self.sim.access(page)
+        if fault == before:
+            self.problem = f"访问页 {page} 前{'已' if before else '未'}映射，access 却返回 {fault}"
+        elif not self._mapped(page):
+            self.problem = f"访问页 {page} 之后它没有被映射"
+        return fault
+
+    def state(self):
+        return None
+
+    def check(self):
+        return self.problem or check_huge(self.sim)
+
+
+# ---------- 写时复制 fork ----------
+
+def fork_config(rng):
+    config = {"num_pages": rng.choice((4, 8, 16)), "frames_per_job": rng.randint(1, 4),
+              "max_jobs": rng.randint(2, 4), "tlb": None}
+    if rng.random() < 0.5:
+        config["tlb"] = {"entries": rng.choice((2, 4)), "policy": rng.choice(TLB_POLICIES),
+                         "seed": rng.randrange(1000)}
+    return config
+
+
+def fork_ops(rng, config, length):
+    jobs = config["max_jobs"]
+    ops = []
+    for _ in range(length):
+        r = rng.random()
+        if r < 0.85:
+            ops.append(["access", rng.randrange(jobs), rng.choice(ACCESS_OPS),
+                        rng.randrange(config["num_pages"]), 0])
+        elif r < 0.95:
+            ops.append(["fork", rng.randrange(jobs)])
+        else:
+            ops.append(["reset", rng.randrange(jobs)])
+    return ops
+
+
+def fork_simplify(op):
+    if op[0] == "access":
+        _, job, access, page, offset = op
+        if job > 0:
+            yield ["access", 0, access, page, offset]
+        if access != "load":
+            yield ["access", job, "load", page, offset]
+        if page > 0:
+            yield ["access", job, access, page // 2, offset]
+    elif op[0] in ("fork", "reset") and op[1] > 0:
+        yield [op[0], 0]
+
+
+def check_fork(jobs):
+    """
+    一族 fork 出来的作业的不变式：每个作业只用自己的块，映射别的作业的块时必须在共享帧表中登记；
+    共享帧表的每一项都与属主和其他作业的页表相符；FIFO 队列恰好是映射自己的块的常驻页；
+    TLB 中缓存的帧号与页表一致。
+    """
+    shared = jobs[0].shared
+    frames = shared.frames if shared is not None else {}
+    mapped = {}  # 帧号 -> [(作业序号, 页号)]
+    for i, sim in enumerate(jobs):
+        own = set(sim.allocated_frames_list)
+        resident = sim.page_table.valid_items()
+        if not sim.used_frames <= own:
+            return f"作业 {i} 的 used_frames {sorted(sim.used_frames)} 含有不属于它的块"
+        private = []
+        for p, e in resident:
+            mapped.setdefault(e.frame, []).append((i, p))
+            info = frames.get(e.frame)
+            if e.frame in own:
+                if e.frame not in sim.used_frames:
+                    return f"作业 {i} 的页 {p} 所在的帧 {e.frame} 不在 used_frames 中"
+                if info is not None and (info.owner is not sim or not info.owner_maps or info.page_no != p):
+                    return (f"作业 {i} 的页 {p} 与共享帧表的登记 "
+                            f"({info.owner_maps}, {info.others}, {info.page_no}) 不符")
+                private.append(p)
+            elif info is None or sim not in info.others or info.page_no != p:
+                return f"作业 {i} 的页 {p} 映射了别的作业的帧 {e.frame}，但共享帧表中没有相应登记"
+        if sorted(sim.fifo_queue) != sorted(private):
+            return f"作业 {i} 的 FIFO 队列 {list(sim.fifo_queue)} 与映射自己块的常驻页 {sorted(private)} 不符"
+        for f in sim.used_frames:
+            if all(j != i for j, _ in mapped.get(f, ())) and not (f in frames and not frames[f].owner_maps):
+                return f"作业 {i} 占着帧 {f}，但自己不映射它，也没有登记为仍被其他作业共享"
+        if sim.tlb is not None:
+            table = dict(resident)
+            for p, f in _tlb_items(sim.tlb):
+                if p not in table or table[p].frame != f:
+                    return f"作业 {i} 的 TLB 缓存了页 {p} -> 帧 {f}，与页表不符"
+    index = {id(sim): i for i, sim in enumerate(jobs)}
+    for f, info in frames.items():
+        owner, others, p = info.owner, info.others, info.page_no
+        if not others:
+            return f"共享帧 {f} 已没有其他作业映射却仍在登记中"
+        if f not in owner.used_frames:
+            return f"共享帧 {f} 不在属主的 used_frames 中"
+        users = {(index[id(sim)], p) for sim in others}
+        if info.owner_maps:
+            users.add((index[id(owner)], p))
+        if users != set(mapped.get(f, ())):
+            return f"共享帧 {f} 的登记 {sorted(users)} 与实际映射 {sorted(mapped.get(f, ()))} 不符"
+    for f, users in mapped.items():
+        if len(users) > 1 and f not in frames:
+            return f"帧 {f} 被 {users} 同时映射却没有登记为共享"
+    return None
+
+
+class ForkInvariants:
+    """
+    驱动一族写时复制作业：第 i 个作业使用块 [i * k, (i + 1) * k)。
+    访问不存在的作业时落到已有作业上；fork 达到 max_jobs 后忽略。
+    写访问之后该页的帧不能再被其他作业映射。
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.problem = None
+        self.jobs = [self._make(0, None)]
+
+    def _make(self, i, parent):
+        config = self.config
+        k = config["frames_per_job"]
+        frames = list(range(i * k, (i + 1) * k))
+        tlb = TLB(**config["tlb"]) if config["tlb"] else None
+        if parent is None:
+            return PagingSimulation(config["num_pages"], frames, POLICY_FIFO, tlb=tlb)
+        return parent.fork(frames, tlb=tlb)
+
+    def apply(self, op):
+        kind = op[0]
+        sim = self.jobs[op[1] % len(self.jobs)]
+        if kind == "fork":
+            if len(self.jobs) < self.config["max_jobs"]:
+                self.jobs.append(self._make(len(self.jobs), sim))
+            return None
+        if kind == "reset":
+            sim.reset()
+            return None
+        _, _, access, page, offset = op
+        _, replaced, loaded = sim.execute(access, page, offset)
+        entry = sim.page_table[page]
+        if not entry.valid:
+            self.problem = f"作业访问页 {page} 之后它不在内存中"
+        elif access == "save" and sim.shared is not None and sim.shared.is_shared(entry.frame):
+            self.problem = f"写页 {page} 之后它的帧 {entry.frame} 仍与其他作业共享"
+        return replaced, loaded
+
+    def state(self):
+        return None
+
+    def check(self):
+        return self.problem or check_fork(self.jobs)
+
+
+# ---------- 多作业系统 ----------
+
+def system_config(rng):
+    replacement = rng.choice(REPLACEMENT_SCOPES)
+    # 全局置换只能与平均分配组合
+    allocation = rng.choice(ALLOCATION_POLICIES) if replacement != REPLACE_GLOBAL else ALLOC_FIXED
+    return {"num_frames": rng.randint(1, 16), "replacement": replacement,
+            "allocation": allocation, "ws_window": rng.randint(1, 20),
+            "sample_interval": rng.randint(1, 20), "quantum": rng.randint(1, 10),
+            "jobs": [rng.randint(1, 12) for _ in range(rng.randint(1, 4))]}
+
+
+def system_ops(rng, config, length):
+    jobs = config["jobs"]
+    ops = []
+    for _ in range(length):
+        r = rng.random()
+        if r < 0.9:
+            job = rng.randrange(len(jobs))
+            ops.append(["access", job, rng.randrange(jobs[job])])
+        elif r < 0.96:
+            # run 的访问串也计入步数之外，保持较短
+            chosen = rng.sample(range(len(jobs)), rng.randint(1, len(jobs)))
+            ops.append(["run", [[job, [rng.randrange(jobs[job]) for _ in range(rng.randint(0, 30))]]
+                                for job in sorted(chosen)]])
+        else:
+            ops.append(["reset"])
+    return ops
+
+
+def system_simplify(op):
+    if op[0] == "access" and op[2] > 0:
+        yield ["access", op[1], op[2] // 2]
+    elif op[0] == "run":
+        for i in range(len(op[1])):
+            yield ["run", op[1][:i] + op[1][i + 1:]]
+
+
+def check_system(sim):
+    """多作业系统的不变式：各作业驻留页的帧互不相同且与位图一致，挂起或结束的作业不占块，FIFO 与驻留页相符。"""
+    frames = [f for job in sim.jobs.values() for f in job.resident.values()]
+    if len(frames) != len(set(frames)):
+        return f"多个驻留页装入了同一块：{frames}"
+    if sorted(frames) != [i for i, used in enumerate(sim.frames.used) if used]:
+        return f"驻留页的块 {sorted(frames)} 与位图不符"
+    if sim.frames.free_count != sim.num_frames - len(frames):
+        return f"free_count {sim.frames.free_count} 与驻留页数不符"
+    pairs = []
+    for job in sim.jobs.values():
+        if sorted(job.fifo) != sorted(job.resident):
+            return f"作业 {job.job_id} 的 FIFO {list(job.fifo)} 与驻留页 {sorted(job.resident)} 不符"
+        if job.suspended and job.resident:
+            return f"挂起或结束的作业 {job.job_id} 仍占着 {len(job.resident)} 块"
+        if job.finished and not job.suspended:
+            return f"作业 {job.job_id} 已结束却不是挂起状态"
+        if (sim.replacement != REPLACE_GLOBAL and not job.suspended
+                and len(job.resident) > max(job.quota, 1)):
+            return f"作业 {job.job_id} 驻留 {len(job.resident)} 页，超过额度 {job.quota}"
+        pairs += [(job.job_id, p) for p in job.resident]
+    if sim.replacement == REPLACE_GLOBAL and sorted(sim.global_fifo) != sorted(pairs):
+        return f"全局 FIFO {list(sim.global_fifo)} 与驻留页不符"
+    return None
+
+
+class SystemInvariants:
+    """
+    驱动 SystemPagingSimulation：access 前先按需 add_job，挂起的作业不访问；
+    run 之后全部作业都已结束，应不再占用任何块。
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.problem = None
+        self._rebuild()
+
+    def _rebuild(self):
+        config = self.config
+        self.sim = SystemPagingSimulation(config["num_frames"], config["replacement"], config["allocation"],
+                                          ws_window=config["ws_window"],
+                                          sample_interval=config["sample_interval"], quantum=config["quantum"])
+
+    def _job(self, job_id):
+        if job_id not in self.sim.jobs:
+            self.sim.add_job(job_id, self.config["jobs"][job_id])
+        return self.sim.jobs[job_id]
+
+    def apply(self, op):
+        kind = op[0]
+        if kind == "reset":
+            self._rebuild()
+            return None
+        if kind == "run":
+            for job_id, _ in op[1]:
+                self._job(job_id)
+            result = self.sim.run({job_id: pages for job_id, pages in op[1]})
+            if any(job.resident or not job.finished for job in self.sim.jobs.values()):
+                self.problem = "run 返回后仍有未结束或占着块的作业"
+            return result.accesses, result.faults
+        _, job_id, page = op
+        job = self._job(job_id)
+        if job.suspended:
+            return None
+        before = page in job.resident
+        fault = self.sim.access(job_id, page)
+        if fault == before:
+            self.problem = f"作业 {job_id} 访问页 {page} 前{'已' if before else '未'}驻留，access 却返回 {fault}"
+        return fault
+
+    def state(self):
+        return None
+
+    def check(self):
+        return self.problem or check_system(self.sim)
+
+
+# ---------- 驱动 ----------
+
+class FuzzTarget:
+    """
+    一个模糊测试目标：
+    :param make_config: rng -> 用例配置(可 JSON 序列化)
+    :param make_ops: (rng, 配置, 长度) -> 操作序列
+    :param reference: 参照实现的驱动类
+    :param candidates: {名称: 待测实现的驱动类}；值为 None 时只检查参照实现的不变式
+    :param simplify: 操作 -> 若干更简单的操作，供缩减用例
+    """
+
+    def __init__(self, make_config, make_ops, reference, candidates, simplify):
+        self.make_config = make_config
+        self.make_ops = make_ops
+        self.reference = reference
+        self.candidates = candidates
+        self.simplify = simplify
+
+
+TARGETS = {
+    "partition": FuzzTarget(partition_config, partition_ops, PartitionReference,
+                            {"replay": PartitionReplay}, partition_simplify),
+    "paging": FuzzTarget(paging_config, paging_ops, PagingReference,
+                         {"timeline": PagingTimeline, "checkpoint": PagingCheckpoint}, paging_simplify),
+    "paging-opt": FuzzTarget(opt_config, opt_ops, OptReference, {"timeline": OptTimeline}, opt_simplify),
+    "slab": FuzzTarget(slab_config, slab_ops, SlabReference, {"replay": SlabReplay}, partition_simplify),
+    "huge-pages": FuzzTarget(huge_config, huge_ops, HugeInvariants, {"invariants": None}, huge_simplify),
+    "fork": FuzzTarget(fork_config, fork_ops, ForkInvariants, {"invariants": None}, fork_simplify),
+    "system": FuzzTarget(system_config, system_ops, SystemInvariants, {"invariants": None}, system_simplify),
+}
+
+
+def run_case(target, candidate, config, ops):
+    """
+    用 ops 同时驱动参照实现和待测实现，每步比较结果和状态并检查不变式。
+    待测实现为 None 时只驱动参照实现并检查不变式。
+    :return: 第一个不一致处的 (步号, 描述)，全部一致时为 None
+    """
+    ref = _call(target.reference, config)
+    factory = target.candidates[candidate]
+    cand = ref if factory is None else _call(factory, config)
+    if isinstance(ref, tuple) or isinstance(cand, tuple):
+        return -1, f"创建失败：参照 {ref!r}，待测 {cand!r}"
+    for i, op in enumerate(ops):
+        if cand is ref:
+            _call(ref.apply, op)
+            problem = _call(ref.check)
+            if problem is not None:
+                return i, f"{op} 之后状态不合法：{problem!r}"
+            continue
+        expected = _call(ref.apply, op)
+        actual = _call(cand.apply, op)
+        if expected != actual:
+            return i, f"{op} 的结果不同：参照 {expected!r}，待测 {actual!r}"
+        expected = _call(ref.state)
+        actual = _call(cand.state)
+        if expected != actual:
+            return i, f"{op} 之后状态不同：\n  参照 {expected!r}\n  待测 {actual!r}"
+        for name, driver in (("参照", ref), ("待测", cand)):
+            problem = _call(driver.check)
+            if problem is not None:
+                return i, f"{op} 之后{name}实现的状态不合法：{problem!r}"
+    return None
+
+
+def shrink(target, candidate, config, ops):
+    """
+    把失败用例缩减到最小：先按块删除操作(块逐步变小直到单个操作)，再逐个把操作换成更简单的变体。
+    :return: (缩减后的操作序列, 第一个不一致处的 (步号, 描述))
+    """
+    def fails(trial):
+        return run_case(target, candidate, config, trial)
+
+    failure = fails(ops)
+    ops = ops[:failure[0] + 1]
+    chunks = 2
+    while len(ops) > 1:
+        size = -(-len(ops) // chunks)
+        for start in range(0, len(ops), size):
+            trial = ops[:start] + ops[start + size:]
+            result = fails(trial)
+            if result is not None:
+                ops, failure = trial[:result[0] + 1], result
+                chunks = max(chunks - 1, 2)
+                break
+        else:
+            if size == 1:
+                break
+            chunks = min(chunks * 2, len(ops))
+
+    changed = True
+    while changed:
+        changed = False
+        for i, op in enumerate(ops):
+            for simpler in target.simplify(op):
+                trial = ops[:i] + [simpler] + ops[i + 1:]
+                result = fails(trial)
+                if result is not None:
+                    ops, failure, changed = trial[:result[0] + 1], result, True
+                    break
+            if changed:
+                break
+    return ops, failure
+
+
+def fuzz(targets, seed, steps, length=DEFAULT_LENGTH, time_limit=None, log=None):
+    """
+    轮流在各目标、各待测实现上运行随机用例，直到累计执行 steps 步、超时或发现不一致。
+    每个用例的随机数种子由 seed 派生，失败用例可按配置和操作序列复现。
+    :return: (统计字典, 失败用例或 None)；失败用例为 {target, candidate, seed, config, ops, step, message}
+    """
+    rng = random.Random(seed)
+    pairs = [(name, c) for name in targets for c in TARGETS[name].candidates]
+    done = cases = 0
+    start = time.perf_counter()
+    failure = None
+    while done < steps and failure is None:
+        if time_limit is not None and time.perf_counter() - start > time_limit:
+            break
+        for name, candidate in pairs:
+            target = TARGETS[name]
+            case_seed = rng.getrandbits(32)
+            case_rng = random.Random(case_seed)
+            config = target.make_config(case_rng)
+            ops = target.make_ops(case_rng, config, length)
+            result = run_case(target, candidate, config, ops)
+            cases += 1
+            if result is not None:
+                done += result[0] + 1
+                failure = {"target": name, "candidate": candidate, "seed": case_seed, "config": config,
+                           "ops": ops, "step": result[0], "message": result[1]}
+                break
+            done += len(ops)
+        if log is not None and cases % 500 < len(pairs):
+            elapsed = time.perf_counter() - start
+            log(f"  {done} 步 / {cases} 个用例，{done / elapsed:.0f} 步/秒")
+    elapsed = time.perf_counter() - start
+    stats = {"steps": done, "cases": cases, "seconds": elapsed,
+             "steps_per_second": done / elapsed if elapsed else 0.0}
+    return stats, failure
+
+
+def _fuzz_worker(task):
+    targets, seed, steps, length, time_limit = task
+    return fuzz(targets, seed, steps, length, time_limit)
+
+
+def fuzz_parallel(targets, seed, steps, length=DEFAULT_LENGTH, time_limit=None, workers=None, log=None):
+    """
+    在 workers 个进程中并行运行 fuzz，各进程的种子由 seed 派生，步数平均分配。
+    workers 为 1 时在当前进程内运行(并输出进度)。
+    :return: (合并后的统计字典, 第一个失败用例或 None)
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        return fuzz(targets, seed, steps, length, time_limit, log)
+    rng = random.Random(seed)
+    tasks = [(targets, rng.getrandbits(32), -(-steps // workers), length, time_limit) for _ in range(workers)]
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(_fuzz_worker, tasks))
+    elapsed = time.perf_counter() - start
+    done = sum(stats["steps"] for stats, _ in results)
+    stats = {"steps": done, "cases": sum(stats["cases"] for stats, _ in results), "seconds": elapsed,
+             "steps_per_second": done / elapsed if elapsed else 0.0}
+    failures = [failure for _, failure in results if failure is not None]
+    return stats, (failures[0] if failures else None)
+
+
+def minimize(failure):
+    """缩减失败用例，返回新的失败用例字典。"""
+    target = TARGETS[failure["target"]]
+    ops, (step, message) = shrink(target, failure["candidate"], failure["config"], failure["ops"])
+    return dict(failure, ops=ops, step=step, message=message)
+
+
+def format_failure(failure):
+    lines = [f"目标 {failure['target']}，待测实现 {failure['candidate']}，用例种子 {failure['seed']}",
+             f"配置：{json.dumps(failure['config'], ensure_ascii=False)}",
+             f"操作({len(failure['ops'])} 步)："]
+    lines += [f"  {i:4d}  {json.dumps(op, ensure_ascii=False)}" for i, op in enumerate(failure["ops"])]
+    lines.append(f"第 {failure['step']} 步：{failure['message']}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="参照实现与优化实现的差分模糊测试")
+    parser.add_argument("--target", action="append", choices=sorted(TARGETS),
+                        help="只测这些目标(可重复)，默认全部")
+    parser.add_argument("--steps", type=int, default=DEFAULT_STEPS, help=f"总步数，默认 {DEFAULT_STEPS}")
+    parser.add_argument("--length", type=int, default=DEFAULT_LENGTH, help=f"每个用例的操作数，默认 {DEFAULT_LENGTH}")
+    parser.add_argument("--seed", type=int, default=None, help="随机数种子，默认随机选取并打印")
+    parser.add_argument("--time-limit", type=float, default=None, help="最多运行的秒数")
+    parser.add_argument("--workers", type=int, default=1, help="并行的进程数，0 表示 CPU 核数，默认 1")
+    parser.add_argument("--save", default=FAILURE_PATH, help=f"失败用例的保存路径，默认 {FAILURE_PATH}")
+    parser.add_argument("--no-shrink", action="store_true", help="不缩减失败用例")
+    parser.add_argument("--replay", metavar="FILE", help="复现保存的失败用例")
+    args = parser.parse_args(argv)
+
+    if args.replay:
+        with open(args.replay, encoding="utf-8") as f:
+            case = json.load(f)
+        result = run_case(TARGETS[case["target"]], case["candidate"], case["config"], case["ops"])
+        if result is None:
+            print("用例通过：参照实现与待测实现一致")
+            return 0
+        print(format_failure(dict(case, step=result[0], message=result[1])))
+        return 1
+
+    seed = args.seed if args.seed is not None else random.randrange(2 ** 32)
+    targets = args.target or sorted(TARGETS)
+    print(f"种子 {seed}，目标 {', '.join(targets)}", file=sys.stderr)
+    stats, failure = fuzz_parallel(targets, seed, args.steps, args.length, args.time_limit, args.workers,
+                                   log=lambda text: print(text, file=sys.stderr))
+    print(f"{stats['steps']} 步，{stats['cases']} 个用例，{stats['seconds']:.1f} 秒，"
+          f"{stats['steps_per_second']:.0f} 步/秒")
+    if failure is None:
+        return 0
+    if not args.no_shrink:
+        failure = minimize(failure)
+    print(format_failure(failure))
+    with open(args.save, "w", encoding="utf-8") as f:
+        json.dump(failure, f, ensure_ascii=False, indent=2)
+    print(f"失败用例已保存到 {args.save}，可用 --replay {args.save} 复现")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,4 @@
+"""
+动态分区与请求分页两个模拟器共用的工具：方法耗时统计(instrumentation)、结果磁盘缓存(result_cache)，
+以及同时运行两种会话的模拟服务(server、protocol)和它的压测客户端(load_client)。
+"""
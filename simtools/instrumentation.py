@@ -0,0 +1,234 @@
+"""
+按需挂接的热点统计：对类上声明的方法计调用次数、累计耗时、p99 耗时和查找长度，
+可同时开启 cProfile，结果导出为 JSON。
+
+被统计的类用类属性 INSTRUMENTED_METHODS 声明要挂接的方法：
+    {方法名: 查找长度函数或 None}
+查找长度函数以与方法相同的参数(含 self)在调用前求值，例如首次适应要扫描的空闲块数。
+挂接时才把类上的方法换成计时包装，detach() 后恢复原方法，未挂接时没有任何额外开销。
+耗时包含被调用的其他方法(例如 allocate 含 save_state 和 _split_block)。
+"""
+import cProfile
+import functools
+import json
+import pstats
+import random
+import time
+
+RESERVOIR_SIZE = 4096  # 每个方法保留的耗时样本数，用于估计 p99
+
+
+class MethodStats:
+    """单个方法的统计：耗时用蓄水池抽样保留固定数量的样本。"""
+
+    def __init__(self, reservoir_size=RESERVOIR_SIZE):
+        self.reservoir_size = reservoir_size
+        self.calls = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.samples = []
+        self.search_calls = 0
+        self.search_total = 0
+        self.search_max = 0
+        self._rng = random.Random(0)
+
+    def add(self, ns):
+        self.calls += 1
+        self.total_ns += ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+        if len(self.samples) < self.reservoir_size:
+            self.samples.append(ns)
+        else:
+            i = self._rng.randrange(self.calls)
+            if i < self.reservoir_size:
+                self.samples[i] = ns
+
+    def add_search(self, length):
+        self.search_calls += 1
+        self.search_total += length
+        if length > self.search_max:
+            self.search_max = length
+
+    def percentile(self, q):
+        """耗时的 q 分位数(纳秒)，0 <= q <= 100。"""
+        if not self.samples:
+            return 0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * q / 100))]
+
+    def to_dict(self):
+        data = {
+            "calls": self.calls,
+            "total_ms": self.total_ns / 1e6,
+            "mean_us": self.total_ns / self.calls / 1e3 if self.calls else 0.0,
+            "p99_us": self.percentile(99) / 1e3,
+            "max_us": self.max_ns / 1e3,
+        }
+        if self.search_calls:
+            data["search_mean"] = self.search_total / self.search_calls
+            data["search_max"] = self.search_max
+        return data
+
+
+class Instrumentation:
+    """
+    用法：
+        inst = Instrumentation()
+        inst.attach(MemoryManager)
+        ...  # 正常运行
+        inst.detach()
+        inst.export_json("profile.json")
+    也可以用 with 语句，退出时自动 detach。
+    """
+
+    def __init__(self, reservoir_size=RESERVOIR_SIZE):
+        self.reservoir_size = reservoir_size
+        self.stats = {}
+        self._patched = []  # (类, 方法名, 原来类字典中的值或 None)
+        self._profiler = None
+        self._profile_stats = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.stop_profile()
+        self.detach()
+
+    def attach(self, cls, methods=None):
+        """
+        挂接类 cls 的方法，对它的所有实例生效。
+        :param methods: {方法名: 查找长度函数或 None}，默认取 cls.INSTRUMENTED_METHODS
+        """
+        if methods is None:
+            methods = getattr(cls, "INSTRUMENTED_METHODS", {})
+        for name, search in methods.items():
+            key = f"{cls.__name__}.{name}"
+            stats = self.stats.get(key)
+            if stats is None:
+                stats = self.stats[key] = MethodStats(self.reservoir_size)
+            func = getattr(cls, name)
+            self._patched.append((cls, name, cls.__dict__.get(name)))
+            setattr(cls, name, _timed(func, stats, search))
+        return self
+
+    def detach(self):
+        """恢复所有被挂接的方法(按挂接的相反顺序)。"""
+        while self._patched:
+            cls, name, original = self._patched.pop()
+            if original is None:
+                delattr(cls, name)
+            else:
+                setattr(cls, name, original)
+
+    def reset(self):
+        """清零统计，挂接保持不变。"""
+        for key in self.stats:
+            self.stats[key] = MethodStats(self.reservoir_size)
+        for cls, name, _ in self._patched:
+            # 包装函数持有旧的统计对象，重新包装一次
+            wrapper = cls.__dict__[name]
+            setattr(cls, name, _timed(wrapper.__wrapped__, self.stats[f"{cls.__name__}.{name}"],
+                                      wrapper.search_length))
+
+    # ---------- cProfile ----------
+    def start_profile(self):
+        if self._profiler is None:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+
+    def stop_profile(self):
+        if self._profiler is not None:
+            self._profiler.disable()
+            self._profile_stats = pstats.Stats(self._profiler)
+            self._profiler = None
+
+    @property
+    def profiling(self):
+        return self._profiler is not None
+
+    def profile_top(self, limit=20):
+        """cProfile 结果中累计耗时最多的 limit 个函数。"""
+        if self._profile_stats is None:
+            return []
+        rows = []
+        for (filename, line, func), (cc, nc, tt, ct, _) in self._profile_stats.stats.items():
+            rows.append({"function": f"{filename}:{line}({func})", "calls": nc,
+                         "tottime_ms": tt * 1e3, "cumtime_ms": ct * 1e3})
+        rows.sort(key=lambda r: r["cumtime_ms"], reverse=True)
+        return rows[:limit]
+
+    # ---------- 输出 ----------
+    def report(self):
+        """{"类.方法": 统计字典}，按累计耗时从大到小排列。"""
+        items = sorted(self.stats.items(), key=lambda kv: kv[1].total_ns, reverse=True)
+        return {key: stats.to_dict() for key, stats in items}
+
+    def format_report(self, profile_limit=15):
+        """统计表的文本形式；开启过 cProfile 时附上累计耗时最多的函数。"""
+        lines = [f"{'方法':<40}{'次数':>10}{'累计ms':>12}{'平均us':>10}{'p99us':>10}{'查找长度':>10}"]
+        for key, row in self.report().items():
+            search = f"{row['search_mean']:.1f}" if "search_mean" in row else "-"
+            lines.append(f"{key:<40}{row['calls']:>10}{row['total_ms']:>12.2f}{row['mean_us']:>10.2f}"
+                         f"{row['p99_us']:>10.2f}{search:>10}")
+        top = self.profile_top(profile_limit)
+        if top:
+            lines.append("")
+            lines.append(f"{'cProfile 累计ms':>14}{'自身ms':>10}{'次数':>10}  函数")
+            for row in top:
+                lines.append(f"{row['cumtime_ms']:>14.2f}{row['tottime_ms']:>10.2f}{row['calls']:>10}  {row['function']}")
+        return "\n".join(lines)
+
+    def export_json(self, path, profile_limit=50):
+        data = {"methods": self.report()}
+        if self._profile_stats is not None:
+            data["profile"] = self.profile_top(profile_limit)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+def _timed(func, stats, search):
+    perf = time.perf_counter_ns
+    add = stats.add
+
+    if search is None:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = perf()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                add(perf() - start)
+    else:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            # 查找长度在计时之外求值，不计入方法耗时
+            stats.add_search(search(*args, **kwargs))
+            start = perf()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                add(perf() - start)
+    wrapper.search_length = search
+    return wrapper
+
+
+def profile_call(classes, func, json_path=None, use_cprofile=False):
+    """
+    挂接 classes 中的各个类后运行 func()，结束后恢复并按需导出 JSON。
+    :return: (func 的返回值, Instrumentation)
+    """
+    inst = Instrumentation()
+    for cls in classes:
+        inst.attach(cls)
+    if use_cprofile:
+        inst.start_profile()
+    try:
+        result = func()
+    finally:
+        inst.stop_profile()
+        inst.detach()
+    if json_path:
+        inst.export_json(json_path)
+    return result, inst
@@ -0,0 +1,202 @@
+"""
+模拟服务(server.py)的本地压测客户端：开 connections 个连接，每个连接创建 sessions 个会话，
+以流水线方式发送 requests 个请求(同一连接上最多 window 个请求未收到响应)，统计吞吐量和延迟。
+
+    python -m dynamicpaging loadgen --port 8765 --kind paging --connections 8 --requests 20000
+    python -m dynamicpaging loadgen --spawn --kind partition --batch 100
+    python -m dynamicpaging loadgen --spawn --batch 25000 --workers 2
+    python -m dynamicpaging loadgen --spawn --idle-sessions 10000 --requests 0
+
+--spawn 在本进程内启动一个服务(监听临时端口)再压测，客户端与服务共用一个事件循环；
+服务的进程池有 --workers 个进程，操作数不少于 OFFLOAD_THRESHOLD 的 batch 交给进程池执行。
+--idle-sessions 先创建这么多不再使用的会话，用来观察大量空闲会话时的内存(见结果中的 server)。
+"""
+import asyncio
+import json
+import random
+import time
+from collections import deque
+
+from .protocol import KIND_PAGING, MAX_LINE, SPAWN_WORKERS
+from .server import SimulationServer
+
+ALGORITHMS = ("first_fit", "best_fit", "worst_fit")
+PAGING_PAGES = 64
+PAGING_FRAMES = 8
+PARTITION_MEMORY = 4096
+
+
+class _Connection:
+    """一个连接：按发送顺序配对请求和响应(服务端按顺序返回响应)。"""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def open(cls, host, port, unix_path):
+        if unix_path:
+            reader, writer = await asyncio.open_unix_connection(unix_path, limit=MAX_LINE)
+        else:
+            reader, writer = await asyncio.open_connection(host, port, limit=MAX_LINE)
+        return cls(reader, writer)
+
+    def send(self, request):
+        self.writer.write((json.dumps(request, separators=(",", ":")) + "\n").encode())
+
+    async def receive(self):
+        line = await self.reader.readline()
+        if not line:
+            raise ConnectionError("服务端关闭了连接")
+        return json.loads(line)
+
+    async def call_many(self, requests):
+        """流水线发送一组请求，按顺序返回全部响应。"""
+        for request in requests:
+            self.send(request)
+        await self.writer.drain()
+        return [await self.receive() for _ in requests]
+
+    async def close(self):
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+def _create_request(kind):
+    if kind == KIND_PAGING:
+        return {"op": "create", "kind": kind, "num_pages": PAGING_PAGES, "frames": list(range(PAGING_FRAMES))}
+    return {"op": "create", "kind": kind, "memory": PARTITION_MEMORY}
+
+
+def _make_request(kind, session, batch, rng):
+    """生成一个随机请求；batch > 0 时为包含 batch 个操作的 batch 请求。"""
+    if kind == KIND_PAGING:
+        if batch:
+            return {"op": "batch", "session": session,
+                    "pages": [rng.randrange(PAGING_PAGES) for _ in range(batch)]}
+        return {"op": "access", "session": session, "page": rng.randrange(PAGING_PAGES),
+                "offset": rng.randrange(1024), "access": rng.choice(("load", "save"))}
+
+    # 流水线发送时不知道分配得到的进程ID，释放时随机挑一个可能存在的ID，失败也无妨
+    def op():
+        if rng.random() < 0.5:
+            return ["allocate", rng.randint(1, 64), rng.choice(ALGORITHMS)]
+        return ["deallocate", rng.randint(1, 64)]
+
+    if batch:
+        return {"op": "batch", "session": session, "ops": [op() for _ in range(batch)]}
+    name, *args = op()
+    if name == "allocate":
+        return {"op": "allocate", "session": session, "size": args[0], "algorithm": args[1]}
+    return {"op": "deallocate", "session": session, "pid": args[0]}
+
+
+async def _drive(conn, kind, sessions, requests, window, batch, rng, latencies):
+    """在一个连接上发送 requests 个请求，最多 window 个在途；返回出错的响应数。"""
+    created = await conn.call_many([_create_request(kind) for _ in range(sessions)])
+    session_ids = [r["result"]["session"] for r in created]
+    send_times = deque()
+    slots = asyncio.Semaphore(window)
+    errors = 0
+
+    async def receiver():
+        nonlocal errors
+        try:
+            for _ in range(requests):
+                response = await conn.receive()
+                latencies.append(time.perf_counter() - send_times.popleft())
+                slots.release()
+                if not response.get("ok"):
+                    errors += 1
+        except BaseException:
+            # 唤醒发送方，让它看到连接已断开
+            for _ in range(window):
+                slots.release()
+            raise
+
+    reading = asyncio.ensure_future(receiver())
+    try:
+        for i in range(requests):
+            await slots.acquire()
+            if reading.done():
+                reading.result()
+            send_times.append(time.perf_counter())
+            conn.send(_make_request(kind, session_ids[i % len(session_ids)], batch, rng))
+            if conn.writer.transport.get_write_buffer_size() > 65536:
+                await conn.writer.drain()
+        await conn.writer.drain()
+        await reading
+    finally:
+        reading.cancel()
+    await conn.call_many([{"op": "close", "session": s} for s in session_ids])
+    return errors
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * q / 100))]
+
+
+async def run_load(host="127.0.0.1", port=None, unix_path=None, kind=KIND_PAGING, connections=4, sessions=4,
+                   requests=10000, window=64, batch=0, idle_sessions=0, seed=None, spawn=False,
+                   workers=SPAWN_WORKERS):
+    """
+    运行一次压测。
+    :param requests: 每个连接发送的请求数
+    :param batch: 大于 0 时每个请求为含 batch 个操作的 batch 请求
+    :param spawn: 在本进程内启动服务(忽略 host/port/unix_path)
+    :param workers: spawn 时服务进程池的进程数，0 表示 batch 都在事件循环中执行
+    :return: 统计字典
+    """
+    server = None
+    if spawn:
+        server = SimulationServer(max_workers=workers)
+        tcp = await server.start_tcp("127.0.0.1", 0)
+        host, port, unix_path = "127.0.0.1", tcp.sockets[0].getsockname()[1], None
+    rng = random.Random(seed)
+    try:
+        control = await _Connection.open(host, port, unix_path)
+        idle = []
+        for start in range(0, idle_sessions, 1000):
+            created = await control.call_many([_create_request(kind)] * min(1000, idle_sessions - start))
+            idle.extend(r["result"]["session"] for r in created)
+
+        conns = [await _Connection.open(host, port, unix_path) for _ in range(connections)]
+        latencies = []
+        start = time.perf_counter()
+        errors = await asyncio.gather(*(
+            _drive(c, kind, sessions, requests, window, batch, random.Random(rng.random()), latencies)
+            for c in conns))
+        elapsed = time.perf_counter() - start
+        for c in conns:
+            await c.close()
+
+        server_stats = (await control.call_many([{"op": "stats"}]))[0]["result"]
+        for start in range(0, len(idle), 1000):
+            await control.call_many([{"op": "close", "session": s} for s in idle[start:start + 1000]])
+        await control.close()
+    finally:
+        if server is not None:
+            server.close()
+
+    total = requests * connections
+    latencies.sort()
+    return {
+        "kind": kind,
+        "connections": connections,
+        "requests": total,
+        "operations": total * (batch or 1),
+        "errors": sum(errors),
+        "seconds": elapsed,
+        "requests_per_second": total / elapsed if elapsed else 0.0,
+        "operations_per_second": total * (batch or 1) / elapsed if elapsed else 0.0,
+        "latency_p50_ms": _percentile(latencies, 50) * 1e3,
+        "latency_p99_ms": _percentile(latencies, 99) * 1e3,
+        "latency_max_ms": (latencies[-1] if latencies else 0.0) * 1e3,
+        "idle_sessions": len(idle),
+        "server": server_stats,
+    }
@@ -0,0 +1,18 @@
+"""
+模拟服务(server.py)、压测客户端(load_client.py)和各引擎的会话操作(dynamicparition/service.py、
+dynamicpaging/service.py)共用的协议常量。
+单独成模块，命令行解析参数时只导入它，不必导入 asyncio、服务端代码和引擎。
+"""
+KIND_PARTITION = "partition"
+KIND_PAGING = "paging"
+KINDS = (KIND_PARTITION, KIND_PAGING)
+
+DEFAULT_PORT = 8765
+OFFLOAD_THRESHOLD = 20000  # batch 的操作数达到该值时交给进程池
+MAX_LINE = 64 * 1024 * 1024  # 单个请求行的最大长度(字节)
+SESSION_HISTORY = 64  # 分区会话默认保留的撤销历史条数
+SPAWN_WORKERS = 2  # 压测客户端 --spawn 启动的服务的默认进程池大小
+
+
+class RequestError(Exception):
+    """请求本身有误(未知操作、缺少参数、会话不存在等)，作为错误响应返回给客户端。"""
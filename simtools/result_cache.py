@@ -0,0 +1,229 @@
+"""
+按内容寻址的模拟结果磁盘缓存。
+
+键为 (命名空间, 引擎版本, 配置, 访问串等输入序列) 的 SHA-256 摘要，
+引擎版本取引擎所在包全部源码文件的摘要，改动引擎及其同包依赖的代码后旧结果自动失效，不需要手工维护版本号。
+每个结果以 zlib 压缩的 pickle 存为一个文件(目录下按键的前两位分子目录)，
+总大小超过 max_bytes 时按最近使用时间淘汰最旧的结果(LRU，以文件修改时间记录使用时间)。
+
+使用方(均为可选参数，不传时没有任何额外开销)：
+    PagingSimulation.run_trace(..., cache=cache)
+    sweep.run_sweep(..., cache=cache)
+    MemoryManager.replay(ops, cache=cache)
+    python -m dynamicpaging run/sweep ... --cache DIR
+    python -m dynamicparition replay ... --cache DIR
+"""
+import hashlib
+import json
+import os
+import pickle
+import sys
+import zlib
+from array import array
+from collections import OrderedDict
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024  # 缓存目录默认上限 256MB
+COMPRESS_LEVEL = 6
+SUFFIX = ".bin"
+
+_source_digests = {}  # 源码文件路径 -> 摘要
+
+
+def source_version(*objects):
+    """
+    objects(类、实例或模块)所在包全部源码的组合摘要，作为引擎版本。None 被忽略。
+    取整个包而不只是对象所在的文件：引擎用到的页表、TLB、I/O 模型等同包模块改动后，
+    缓存的结果同样失效，不必逐一列出依赖。顶层模块只取它自己的文件；
+    取不到源码文件时(如内置模块)用模块名代替。
+    """
+    files = {}  # 摘要中使用的名字 -> 文件路径(None 表示没有源码文件)
+    for obj in objects:
+        if obj is None:
+            continue
+        if isinstance(obj, type(sys)):
+            module = obj
+        else:
+            cls = obj if isinstance(obj, type) else type(obj)
+            module = sys.modules.get(cls.__module__)
+        if module is None:
+            continue
+        path = getattr(module, "__file__", None)
+        package = module.__package__
+        if path is None or not package:
+            files[module.__name__] = path
+            continue
+        directory = os.path.dirname(path)
+        for filename in os.listdir(directory):
+            if filename.endswith(".py"):
+                files[f"{package}/{filename}"] = os.path.join(directory, filename)
+    h = hashlib.sha256()
+    for name in sorted(files):
+        path = files[name]
+        digest = _source_digests.get(path)
+        if digest is None:
+            try:
+                with open(path, "rb") as f:
+                    digest = hashlib.sha256(f.read()).hexdigest()
+            except (OSError, TypeError):
+                digest = name
+            _source_digests[path] = digest
+        h.update(name.encode())
+        h.update(digest.encode())
+    return h.hexdigest()[:16]
+
+
+def _feed(h, seq):
+    """
+    把一个输入序列写入摘要。整数序列(list、array.array、NumPy 数组)统一按 int64 编码，
+    因此内容相同的 list 和数组得到相同的摘要；bytes 原样写入；其他对象按 JSON 编码。
+    """
+    if seq is None:
+        h.update(b"N")
+        return
+    if isinstance(seq, (bytes, bytearray, memoryview)):
+        h.update(b"B")
+        h.update(bytes(seq))
+        return
+    if hasattr(seq, "astype"):
+        h.update(b"I")
+        h.update(seq.astype("<i8").tobytes())
+        return
+    try:
+        data = array("q", seq)
+    except (TypeError, OverflowError):
+        h.update(b"J")
+        h.update(json.dumps(list(seq), ensure_ascii=False, separators=(",", ":")).encode())
+        return
+    if sys.byteorder != "little":
+        data.byteswap()
+    h.update(b"I")
+    h.update(data.tobytes())
+
+
+class ResultCache:
+    """
+    总大小有上限的磁盘 LRU 缓存。
+    引擎只通过 make_key / engine_version / get / put 使用它，不需要导入本模块。
+    :param directory: 缓存目录，不存在时自动创建
+    :param max_bytes: 目录中结果文件的总大小上限
+    """
+
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._index = None  # 键 -> 文件大小，按最近使用从旧到新排列
+        self._total = 0
+
+    # ---------- 键 ----------
+    engine_version = staticmethod(source_version)
+
+    @staticmethod
+    def make_key(namespace, version, config, *sequences):
+        """
+        :param namespace: 结果种类，如 "paging.run_trace"
+        :param version: 引擎版本，一般为 source_version(...) 的返回值
+        :param config: 可 JSON 序列化的配置(字典的键顺序无关)
+        :param sequences: 访问串等输入序列，见 _feed
+        """
+        h = hashlib.sha256()
+        h.update(json.dumps([namespace, version, config], sort_keys=True, ensure_ascii=False).encode())
+        for seq in sequences:
+            _feed(h, seq)
+            h.update(b"|")
+        return h.hexdigest()
+
+    # ---------- 读写 ----------
+    def get(self, key):
+        """返回缓存的结果，未命中(或文件损坏)时返回 None。"""
+        index = self._load_index()
+        if key not in index:
+            self.misses += 1
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                value = pickle.loads(zlib.decompress(f.read()))
+        except (OSError, zlib.error, pickle.UnpicklingError, EOFError):
+            # 被其他进程淘汰或写坏了：当作未命中
+            self._forget(key)
+            self.misses += 1
+            return None
+        index.move_to_end(key)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """写入结果(先写临时文件再改名，读者不会看到写了一半的文件)，必要时淘汰最旧的结果。"""
+        index = self._load_index()
+        data = zlib.compress(pickle.dumps(value, pickle.HIGHEST_PROTOCOL), COMPRESS_LEVEL)
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        if key in index:
+            self._total -= index[key]
+        index[key] = len(data)
+        index.move_to_end(key)
+        self._total += len(data)
+        self._evict()
+
+    def __contains__(self, key):
+        return key in self._load_index()
+
+    def __len__(self):
+        return len(self._load_index())
+
+    @property
+    def size_bytes(self):
+        self._load_index()
+        return self._total
+
+    def clear(self):
+        for key in list(self._load_index()):
+            self._forget(key)
+
+    def stats(self):
+        return {"entries": len(self), "bytes": self.size_bytes, "max_bytes": self.max_bytes,
+                "hits": self.hits, "misses": self.misses}
+
+    # ---------- 内部 ----------
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key + SUFFIX)
+
+    def _load_index(self):
+        """第一次使用时扫描目录，按文件修改时间建立 LRU 顺序。"""
+        if self._index is None:
+            entries = []
+            if os.path.isdir(self.directory):
+                for sub in os.scandir(self.directory):
+                    if not sub.is_dir():
+                        continue
+                    for entry in os.scandir(sub.path):
+                        if entry.name.endswith(SUFFIX):
+                            st = entry.stat()
+                            entries.append((st.st_mtime, entry.name[:-len(SUFFIX)], st.st_size))
+            entries.sort()
+            self._index = OrderedDict((key, size) for _, key, size in entries)
+            self._total = sum(self._index.values())
+        return self._index
+
+    def _forget(self, key):
+        size = self._index.pop(key, None)
+        if size is not None:
+            self._total -= size
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def _evict(self):
+        while self._total > self.max_bytes and len(self._index) > 1:
+            self._forget(next(iter(self._index)))
@@ -0,0 +1,299 @@
+"""
+以本地服务的方式同时运行多个模拟会话(动态分区的 MemoryManager、请求分页的 PagingSimulation)。
+
+协议：TCP 或 Unix 套接字上的 JSON lines，每行一个请求对象，服务端按同一连接上的请求顺序
+逐行返回响应，因此客户端可以不等响应连续发送(流水线)：
+    请求  {"id": 1, "op": "create", "kind": "paging", "num_pages": 64, "frames": [0, 1, 2, 3]}
+    响应  {"id": 1, "ok": true, "result": {"session": 1}}
+    出错  {"id": 1, "ok": false, "error": "..."}
+id 可省略，原样带回。
+
+操作(除 create / stats / ping 外都需要 "session")：
+    create      kind=partition(memory，可选 size_classes、slab_size 启用 slab 层)
+                或 kind=paging(num_pages, frames, policy, page_size, memory_size)
+    close       关闭会话
+    allocate    size, algorithm                  -> 进程ID或 null          (partition)
+    deallocate  pid                              -> 是否成功               (partition)
+    undo / redo                                  -> 是否成功               (partition)
+    access      page, offset, access(操作，默认 load) -> message/replaced/loaded (paging)
+    batch       partition: ops=[["allocate", 大小, 算法], ["deallocate", 进程ID], ...] -> 每步结果
+                paging: pages, ops, offsets(后两者可省略)               -> 统计摘要
+    snapshot    当前状态(空闲块/已分配块，或常驻页/FIFO 队列)
+    stats       服务端统计
+
+服务端本身不依赖任何引擎：每种会话类型由 ENGINE_SERVICES 中的模块(dynamicparition/service.py、
+dynamicpaging/service.py)提供创建引擎、执行 batch、快照和单步操作，首次使用时才导入。
+
+较大的 batch(操作数不少于 offload_threshold)把会话引擎 pickle 后交给进程池执行，
+事件循环不会被阻塞；执行期间对该会话的其他请求会等待它完成，其他会话不受影响。
+batch 是原子的：出错时会话引擎保持执行前的状态(在事件循环中执行时由引擎模块恢复，
+交给进程池时引擎副本直接丢弃)。
+空闲会话只保存引擎对象本身(分页会话约 3KB，日志缓冲区缩小为 dynamicpaging.service.SESSION_LOG_CAPACITY 条)，
+分区会话的撤销历史最多保留 max_history 条(默认 SESSION_HISTORY)，不会随请求数无限增长。
+
+    python -m dynamicpaging serve --port 8765
+    python -m dynamicpaging serve --unix /tmp/sim.sock
+"""
+import asyncio
+import functools
+import importlib
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from .protocol import (KIND_PARTITION, KIND_PAGING, KINDS, DEFAULT_PORT, OFFLOAD_THRESHOLD, MAX_LINE,
+                       SESSION_HISTORY, RequestError)
+
+WRITE_HIGH_WATER = 1024 * 1024  # 发送缓冲超过该值时等待对端读取
+
+# 会话类型 -> 提供该类型会话操作的模块，模块需定义 create、run_batch、snapshot 和 OPS
+ENGINE_SERVICES = {
+    KIND_PARTITION: "dynamicparition.service",
+    KIND_PAGING: "dynamicpaging.service",
+}
+
+
+class Session:
+    """一个会话：引擎对象，以及交给进程池执行时对应的 Future。"""
+
+    __slots__ = ("kind", "engine", "pending")
+
+    def __init__(self, kind, engine):
+        self.kind = kind
+        self.engine = engine
+        self.pending = None
+
+
+@functools.lru_cache(maxsize=None)
+def _service(kind):
+    return importlib.import_module(ENGINE_SERVICES[kind])
+
+
+def _run_batch(kind, engine, request):
+    """执行一个 batch，返回 (执行后的引擎, 结果)。在进程池中执行时引擎经 pickle 往返。"""
+    return engine, _service(kind).run_batch(engine, request)
+
+
+def _pool_context():
+    """
+    进程池的启动方式。Linux 默认 fork，工作进程会继承当时已打开的连接套接字，
+    客户端断开后服务端仍读不到 EOF；forkserver 启动的工作进程不继承它们。
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return None
+
+
+def _batch_size(request):
+    return len(request.get("ops") or request.get("pages") or ())
+
+
+class SimulationServer:
+    """
+    :param max_workers: 进程池的进程数，None 为 CPU 数，0 表示不使用进程池(batch 都在事件循环中执行)
+    :param offload_threshold: batch 操作数达到该值时交给进程池
+    :param max_history: 分区会话最多保留的撤销历史条数，None 表示不限制
+    """
+
+    def __init__(self, max_workers=None, offload_threshold=OFFLOAD_THRESHOLD, max_history=SESSION_HISTORY):
+        self.max_workers = max_workers
+        self.offload_threshold = offload_threshold
+        self.max_history = max_history
+        self.sessions = {}
+        self.next_session = 1
+        self.requests = 0
+        self.errors = 0
+        self.offloaded = 0
+        self.connections = 0
+        self._pool = None
+        self._servers = []
+
+    # ---------- 启动 ----------
+    async def start_tcp(self, host="127.0.0.1", port=DEFAULT_PORT):
+        server = await asyncio.start_server(self.handle_connection, host, port, limit=MAX_LINE)
+        self._servers.append(server)
+        return server
+
+    async def start_unix(self, path):
+        server = await asyncio.start_unix_server(self.handle_connection, path, limit=MAX_LINE)
+        self._servers.append(server)
+        return server
+
+    async def serve_forever(self):
+        try:
+            await asyncio.gather(*(s.serve_forever() for s in self._servers))
+        finally:
+            self.close()
+
+    def close(self):
+        for server in self._servers:
+            server.close()
+        self._servers = []
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    # ---------- 连接 ----------
+    async def handle_connection(self, reader, writer):
+        """逐行读取请求并按顺序返回响应；客户端可以连续发送多个请求而不等待响应。"""
+        self.connections += 1
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (asyncio.LimitOverrunError, ValueError):
+                    writer.write(self._encode({"id": None, "ok": False, "error": "请求行过长"}))
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                writer.write(self._encode(await self.handle_line(line)))
+                if writer.transport.get_write_buffer_size() > WRITE_HIGH_WATER:
+                    await writer.drain()
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.connections -= 1
+            writer.close()
+
+    @staticmethod
+    def _encode(response):
+        return (json.dumps(response, ensure_ascii=False, separators=(",", ":")) + "\n").encode()
+
+    async def handle_line(self, line):
+        self.requests += 1
+        request_id = None
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise RequestError("请求必须是 JSON 对象")
+            request_id = request.get("id")
+            result = await self.dispatch(request)
+            return {"id": request_id, "ok": True, "result": result}
+        except RequestError as e:
+            self.errors += 1
+            return {"id": request_id, "ok": False, "error": str(e)}
+        except KeyError as e:
+            self.errors += 1
+            return {"id": request_id, "ok": False, "error": f"缺少参数 {e}"}
+        except Exception as e:
+            # 引擎抛出的任何异常都作为错误响应返回，不断开连接，也不影响其他会话
+            self.errors += 1
+            return {"id": request_id, "ok": False, "error": f"{type(e).__name__}: {e}"}
+
+    # ---------- 请求 ----------
+    async def dispatch(self, request):
+        op = request.get("op")
+        if op == "create":
+            return self.create_session(request)
+        if op == "stats":
+            return self.stats()
+        if op == "ping":
+            return "pong"
+        handler = _SESSION_OPS.get(op)
+        if handler is None and op not in _engine_ops():
+            choices = ('create', 'stats', 'ping') + tuple(_SESSION_OPS) + tuple(_engine_ops())
+            raise RequestError(f"未知的操作 {op}，可选 {choices}")
+        session_id = request.get("session")
+        session = self._get_session(session_id)
+        # 该会话有 batch 正在进程池中执行：等它完成后再处理，保证同一会话内的顺序
+        while session.pending is not None:
+            await asyncio.wait([session.pending])
+            # 等待期间会话可能已被其他连接关闭
+            session = self._get_session(session_id)
+        if handler is not None:
+            return await handler(self, session_id, session, request)
+        engine_op = _service(session.kind).OPS.get(op)
+        if engine_op is None:
+            raise RequestError(f"操作 {op} 只适用于 {_engine_ops()[op]} 会话，当前会话为 {session.kind}")
+        return engine_op(session.engine, request)
+
+    def _get_session(self, session_id):
+        session = self.sessions.get(session_id)
+        if session is None:
+            raise RequestError(f"会话 {session_id} 不存在")
+        return session
+
+    def create_session(self, request):
+        kind = request.get("kind")
+        if kind not in ENGINE_SERVICES:
+            raise RequestError(f"未知的会话类型 {kind}，可选 {KINDS}")
+        engine = _service(kind).create(request, self.max_history)
+        session_id = self.next_session
+        self.next_session += 1
+        self.sessions[session_id] = Session(kind, engine)
+        return {"session": session_id}
+
+    async def op_close(self, session_id, session, request):
+        del self.sessions[session_id]
+        return True
+
+    async def op_batch(self, session_id, session, request):
+        if self.max_workers == 0 or _batch_size(request) < self.offload_threshold:
+            session.engine, result = _run_batch(session.kind, session.engine, request)
+            return result
+        loop = asyncio.get_running_loop()
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers or os.cpu_count() or 1,
+                                             mp_context=_pool_context())
+        self.offloaded += 1
+        session.pending = loop.run_in_executor(self._pool, _run_batch, session.kind, session.engine, request)
+        try:
+            session.engine, result = await session.pending
+        finally:
+            session.pending = None
+        return result
+
+    async def op_snapshot(self, session_id, session, request):
+        data = {"kind": session.kind}
+        data.update(_service(session.kind).snapshot(session.engine))
+        return data
+
+    def stats(self):
+        kinds = {kind: 0 for kind in KINDS}
+        for session in self.sessions.values():
+            kinds[session.kind] += 1
+        data = {"sessions": len(self.sessions), "by_kind": kinds, "connections": self.connections,
+                "requests": self.requests, "errors": self.errors, "offloaded_batches": self.offloaded}
+        if resource is not None:
+            # Linux 上单位为 KB
+            data["max_rss"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return data
+
+
+_SESSION_OPS = {
+    "close": SimulationServer.op_close,
+    "batch": SimulationServer.op_batch,
+    "snapshot": SimulationServer.op_snapshot,
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _engine_ops():
+    """各会话类型自己的单步操作：操作名 -> 会话类型。"""
+    ops = {}
+    for kind in ENGINE_SERVICES:
+        for op in _service(kind).OPS:
+            ops[op] = kind
+    return ops
+
+
+async def serve(host="127.0.0.1", port=DEFAULT_PORT, unix_path=None, max_workers=None,
+                offload_threshold=OFFLOAD_THRESHOLD, max_history=SESSION_HISTORY):
+    """启动服务并一直运行；unix_path 不为 None 时监听 Unix 套接字，否则监听 TCP。"""
+    server = SimulationServer(max_workers, offload_threshold, max_history)
+    if unix_path:
+        await server.start_unix(unix_path)
+        print(f"模拟服务已启动：unix:{unix_path}", flush=True)
+    else:
+        await server.start_tcp(host, port)
+        print(f"模拟服务已启动：{host}:{port}", flush=True)
+    await server.serve_forever()
@@ -0,0 +1,25 @@
+from benchmarks import run_benchmarks
+
+
+def test_missing_baseline_is_an_error(tmp_path, monkeypatch):
+    # 回归：基线不存在时自动保存并返回 0，CI 永远不会失败
+    def fail(*args, **kwargs):
+        raise AssertionError("基线不存在时不应运行基准")
+
+    monkeypatch.setattr(run_benchmarks, "run_benchmarks", fail)
+    path = str(tmp_path / "baseline.json")
+    assert run_benchmarks.main(["--baseline", path]) == 2
+    assert run_benchmarks.main(["--baseline", path, "--save", "--only", "paging"]) == 2
+    assert not (tmp_path / "baseline.json").exists()
+
+
+def test_only_save_updates_existing_baseline(tmp_path, monkeypatch):
+    path = str(tmp_path / "baseline.json")
+    full = {"partition.a": {"value": 10.0, "unit": run_benchmarks.UNIT_RATE},
+            "paging.b": {"value": 20.0, "unit": run_benchmarks.UNIT_RATE}}
+    run_benchmarks.save_baseline(path, full)
+    monkeypatch.setattr(run_benchmarks, "run_benchmarks",
+                        lambda only, repeat, log: {"paging.b": {"value": 30.0, "unit": run_benchmarks.UNIT_RATE}})
+    assert run_benchmarks.main(["--baseline", path, "--save", "--only", "paging"]) == 0
+    assert run_benchmarks.load_baseline(path) == dict(full, **{"paging.b": {"value": 30.0,
+                                                                            "unit": run_benchmarks.UNIT_RATE}})
@@ -0,0 +1,64 @@
+from dynamicpaging.simulation.paging_simulation import PagingSimulation, POLICY_FIFO
+
+
+def make_family():
+    parent = PagingSimulation(8, [0, 1, 2], POLICY_FIFO)
+    for p in (0, 1):
+        parent.execute("load", p, 0)
+    child = parent.fork([3, 4, 5])
+    return parent, child
+
+
+def test_fork_shares_parent_frames():
+    parent, child = make_family()
+    shared = parent.shared
+    assert child.shared is shared
+    for p in (0, 1):
+        frame = parent.page_table[p].frame
+        assert child.page_table[p].frame == frame
+        info = shared.frames[frame]
+        assert (info.owner, info.owner_maps, info.others, info.page_no) == (parent, True, {child}, p)
+        assert shared.refcount(frame) == 2
+    # 读共享页不复制
+    child.execute("load", 0, 0)
+    assert parent.cow_report()["cow_copies"] == 0
+    assert parent.cow_report()["shared_frames"] == 2
+
+
+def test_write_fault_splits_shared_page():
+    parent, child = make_family()
+    old = parent.page_table[0].frame
+    child.execute("save", 0, 0)
+    entry = child.page_table[0]
+    assert entry.frame in child.allocated_frames_list and entry.modified
+    assert list(child.fifo_queue) == [0]
+    # 只剩属主映射，取消登记，恢复为父作业的私有页
+    assert old not in parent.shared.frames
+    assert parent.page_table[0].frame == old and not parent.page_table[0].modified
+    assert parent.cow_report()["cow_copies"] == 1
+    assert parent.cow_report()["copies_avoided"] == 1
+
+
+def test_releasing_last_sharer_returns_frame_to_owner():
+    parent, child = make_family()
+    frame = parent.page_table[1].frame
+    # 父作业先写：复制出私有页，原帧只剩子作业映射，仍占着父作业的块
+    parent.execute("save", 1, 0)
+    info = parent.shared.frames[frame]
+    assert not info.owner_maps and info.others == {child}
+    assert frame in parent.used_frames and parent.page_table[1].frame != frame
+    # 只剩一个映射者时不再算共享，子作业原地写
+    assert parent.shared.refcount(frame) == 1
+    child.execute("save", 1, 0)
+    assert child.page_table[1].frame == frame
+    # 最后一个共享者放弃映射(重置)后，帧还给父作业，登记删除
+    child.reset()
+    assert frame not in parent.shared.frames
+    assert frame not in parent.used_frames
+
+
+def test_child_reset_detaches_from_family():
+    parent, child = make_family()
+    child.reset()
+    assert parent.shared.frames == {}
+    assert all(e.frame in parent.allocated_frames_list for _, e in parent.page_table.valid_items())
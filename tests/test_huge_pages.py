@@ -0,0 +1,84 @@
+import random
+
+from dynamicpaging.simulation.huge_pages import HugePageSimulation, compare_page_sizes, CONFIGS
+from dynamicpaging.simulation.tlb import TLB
+
+
+def make_sim(**kwargs):
+    options = {"promote_threshold": 1.0, "demote_threshold": 0.5, "sample_interval": 2}
+    options.update(kwargs)
+    return HugePageSimulation(16, 4, huge_factor=2, **options)
+
+
+def test_promote_then_demote():
+    sim = make_sim()
+    sim.access(0)
+    assert sim.base_frame == {0: 0} and not sim.huge_slot
+    # 区 0 的两页都驻留：升级为大页，原有基本页迁入
+    sim.access(1)
+    assert sim.huge_slot == {0: 0} and sim.slot_region == {0: 0}
+    assert sim.base_frame == {} and sim.promotions == 1 and sim.promotion_reads == 0
+    sim.access(2)
+    # 一个采样周期内没有访问区 0：降级，未访问的块释放
+    sim.access(4)
+    assert sim.demotions == 1 and sim.huge_slot == {} and sim.slot_region == {}
+    assert sorted(sim.base_frame) == [2, 4]
+
+
+def test_remapped_page_is_not_evicted_by_stale_fifo_key():
+    # 回归：升级时撤销的基本页仍在 FIFO 中，降级后重新映射的同一页被旧键提前淘汰
+    sim = make_sim()
+    for p in (0, 1, 2, 4, 0, 6):
+        sim.access(p)
+    assert sorted(sim.base_frame) == [0, 2, 4, 6]
+    # 物理块已满，最早装入的现存映射是页 2
+    sim.access(8)
+    assert sorted(sim.base_frame) == [0, 4, 6, 8]
+    sim.access(10)
+    assert sorted(sim.base_frame) == [0, 6, 8, 10]
+    sim.access(12)
+    assert sorted(sim.base_frame) == [6, 8, 10, 12]
+
+
+def test_fifo_stays_bounded_under_promote_demote_cycles():
+    sim = HugePageSimulation(64, 16, huge_factor=4, promote_threshold=0.5, demote_threshold=0.25,
+                             sample_interval=8)
+    rng = random.Random(1)
+    for _ in range(20000):
+        sim.access(rng.randrange(64))
+        assert len(sim.fifo) <= 2 * sim.num_frames + sim.huge_factor + 1
+    assert sim.promotions > 100 and sim.demotions > 100
+    live = {p << 1 for p in sim.base_frame} | {(r << 1) | 1 for r in sim.huge_slot}
+    assert set(sim.fifo_stamp) == live
+
+
+def test_promotion_evicts_other_pages_in_target_slot():
+    sim = HugePageSimulation(16, 4, huge_factor=2, promote_threshold=1.0, demote_threshold=None)
+    for p in (0, 2, 4, 6):
+        sim.access(p)
+    # 装满后再缺页先淘汰页 0；区 4 升级时要腾出一组对齐块
+    sim.access(8)
+    sim.access(9)
+    assert sim.huge_slot == {4: 0}
+    assert sorted(sim.base_frame) == [4, 6]
+    assert sim.evictions == 2
+
+
+def test_huge_pages_extend_tlb_reach():
+    pages = list(range(64)) * 20
+    results = compare_page_sizes(pages, 64, 64, huge_factor=8, tlb_entries=4)
+    assert set(results) == set(CONFIGS)
+    base, huge = results["base"], results["huge"]
+    assert base["faults"] == 64 and huge["faults"] == 8
+    assert huge["disk_reads"] == 64
+    assert huge["tlb_hit_rate"] > base["tlb_hit_rate"]
+    assert huge["peak_page_table_bytes"] < base["peak_page_table_bytes"]
+    assert huge["tlb_reach_bytes"] == 8 * base["tlb_reach_bytes"]
+
+
+def test_tlb_reach_counts_huge_entries():
+    sim = HugePageSimulation(16, 8, huge_factor=4, promote_threshold=0.25, demote_threshold=None,
+                             tlb=TLB(8))
+    sim.access(0)
+    sim.access(8)
+    assert sim.tlb_reach() == 2 * 4 * sim.page_size
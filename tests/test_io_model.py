@@ -0,0 +1,57 @@
+from dynamicpaging.simulation.io_model import IOCostModel
+from dynamicpaging.simulation.paging_simulation import PagingSimulation
+
+READ, WRITE, MEM, RECLAIM = 1000, 3000, 1, 10
+
+
+def make_model(**kwargs):
+    return IOCostModel(read_latency=READ, write_latency=WRITE, memory_time=MEM, reclaim_time=RECLAIM, **kwargs)
+
+
+def run(model, ops, pages, frames=1):
+    sim = PagingSimulation(8, list(range(frames)), io_model=model)
+    sim.run_trace(ops, pages, None)
+    return sim
+
+
+def test_unbuffered_costs_read_and_sync_write():
+    model = make_model()
+    run(model, ["save", "load", "load"], [0, 1, 0])
+    # 三次缺页都读盘，脏页 0 被淘汰时同步写回
+    assert (model.hard_faults, model.soft_faults, model.disk_reads, model.sync_writes) == (3, 0, 3, 1)
+    assert model.total_time == 3 * MEM + 3 * READ + WRITE
+    assert model.effective_access_time == model.total_time / 3
+    report = model.report()
+    assert report["disk_read_bytes"] == 3 * 1024 and report["disk_write_bytes"] == 1024
+
+
+def test_page_buffering_reclaims_without_disk_io():
+    model = make_model(free_list_size=4, modified_list_size=4)
+    sim = run(model, ["save", "load", "load", "load"], [0, 1, 0, 1])
+    # 页 0 从修改页链表收回，仍是脏页；页 1 从空闲页链表收回
+    assert (model.hard_faults, model.soft_faults, model.disk_writes) == (2, 2, 0)
+    assert model.total_time == 4 * MEM + 2 * READ + 2 * RECLAIM
+    assert 0 in model.modified_list
+    assert sim.page_table[1].valid
+
+
+def test_modified_list_overflow_writes_oldest_page():
+    model = make_model(free_list_size=4, modified_list_size=1)
+    run(model, ["save", "save", "save"], [0, 1, 2])
+    assert model.sync_writes == 1
+    assert list(model.modified_list) == [1]
+    # 写回后的页成为空闲页链表中的干净页
+    assert list(model.free_list) == [0]
+    assert model.page_in(0) is False and model.soft_faults == 1
+
+
+def test_background_flush_every_interval():
+    model = make_model(free_list_size=8, modified_list_size=8, flush_interval=2, flush_batch=1)
+    run(model, ["save"] * 4, [0, 1, 2, 3])
+    # 每 2 次访问在缺页处理之前后台写回一页：第 2 次时修改页链表还是空的，第 4 次写回页 0
+    assert model.background_writes == 1 and model.sync_writes == 0
+    assert list(model.modified_list) == [1, 2] and list(model.free_list) == [0]
+    # 后台写回不计入访问时间
+    assert model.total_time == 4 * MEM + 4 * READ
+    model.reset()
+    assert model.report()["accesses"] == 0 and not model.modified_list
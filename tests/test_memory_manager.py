@@ -0,0 +1,22 @@
+from dynamicparition.memory_manager import MemoryManager
+
+
+def blocks(m):
+    return ([(b['start'], b['size']) for b in m.free_blocks],
+            sorted((pid, b['start'], b['size']) for pid, b in m.allocated_blocks.items()))
+
+
+def test_undo_after_merge_restores_snapshot():
+    # 回归：合并空闲块时原地修改块字典，而历史快照只浅复制了列表，合并会改坏已保存的快照
+    m = MemoryManager(100)
+    a = m.allocate(10, 'first_fit')
+    b = m.allocate(10, 'first_fit')
+    m.deallocate(a)
+    before_merge = blocks(m)
+    m.deallocate(b)  # 与前后两个空闲块合并
+    assert blocks(m) == ([(0, 100)], [])
+    # 合并之前保存的快照必须保持原样：撤销再重做回到它
+    assert m.history[-1]['free_blocks'] == [{'start': 0, 'size': 10}, {'start': 20, 'size': 80}]
+    assert m.undo() and m.redo()
+    assert blocks(m) == before_merge
+    assert before_merge == ([(0, 10), (20, 80)], [(b, 10, 10)])
@@ -0,0 +1,52 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from dynamicpaging.cli import main
+
+TRACE = "save 2 5\nload 0 0\nload 1 0\nload 3 0\nload 4 0\nload 5 0\n"
+
+
+def run_cli(capsys, trace_path, *extra):
+    main(["run", "--trace", str(trace_path), "--pages", "8", "--frames", "2", "--json", *extra])
+    return json.loads(capsys.readouterr().out)
+
+
+@pytest.mark.parametrize("policy", ["FIFO", "OPT"])
+def test_trace_file_keeps_writes(tmp_path, capsys, policy):
+    # 回归：OPT 读访问串时丢掉了读写类型，save 被当作 load，脏页写回数为 0
+    trace = tmp_path / "trace.txt"
+    trace.write_text(TRACE)
+    assert run_cli(capsys, trace, "--policy", policy)["dirty_evictions"] == 1
+
+
+def test_trace_file_uses_cache(tmp_path, capsys):
+    # 回归：FIFO 流式读取的路径不打开结果缓存，--cache 被忽略
+    trace = tmp_path / "trace.txt"
+    trace.write_text(TRACE)
+    cache = tmp_path / "cache"
+    first = run_cli(capsys, trace, "--cache", str(cache))
+    assert any(cache.iterdir())
+    second = run_cli(capsys, trace, "--cache", str(cache))
+    for key in ("faults", "dirty_evictions"):
+        assert first[key] == second[key]
+
+
+def test_parser_does_not_import_server():
+    # 解析参数时不应导入服务端(asyncio、进程池、分区模块)，run 等子命令的启动时间不受影响
+    code = ("import sys; from dynamicpaging.cli import build_parser; build_parser(); "
+            "print(any(m in sys.modules for m in ('asyncio', 'simtools.server', 'dynamicparition')))")
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                         cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))).stdout
+    assert out.strip() == "False"
+
+
+def test_huge_compares_page_size_configs(capsys):
+    main(["huge", "--generate", "sequential", "--length", "256", "--pages", "64", "--frames", "64",
+          "--huge-factor", "8", "--tlb", "4", "--json"])
+    data = json.loads(capsys.readouterr().out)
+    assert list(data) == ["base", "huge", "adaptive"]
+    assert data["base"]["faults"] == 64 and data["huge"]["faults"] == 8
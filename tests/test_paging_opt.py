@@ -0,0 +1,77 @@
+import random
+
+from dynamicpaging.simulation.paging_simulation import PagingSimulation, POLICY_FIFO, POLICY_OPT
+from dynamicpaging.simulation.prefetch import SequentialPrefetcher
+
+
+def make_sim():
+    return PagingSimulation(16, [0, 1, 2, 3], POLICY_OPT, prefetcher=SequentialPrefetcher(2))
+
+
+def test_reloading_trace_discards_previous_occurrences():
+    # 回归：第二次 load_trace 没有清空 _occurrences，预取页的下一次访问位置用到了旧访问串
+    rng = random.Random(3)
+    first = [rng.randrange(16) for _ in range(200)]
+    second = [rng.randrange(16) for _ in range(200)]
+
+    reused = make_sim()
+    reused.load_trace(first)
+    reused.load_trace(second)
+    fresh = make_sim()
+    fresh.load_trace(second)
+    assert reused._occurrences == fresh._occurrences
+    assert all(occ == sorted(occ) for occ in reused._occurrences.values())
+
+    expected = fresh.run_trace(None, second, None)
+    result = reused.run_trace(None, second, None)
+    assert (result.faults, list(result.victims)) == (expected.faults, list(expected.victims))
+
+
+def test_next_occurrence_without_trace_means_never():
+    sim = make_sim()
+    sim.load_trace([1, 2, 1])
+    assert sim._next_occurrence(1) == 0
+    assert sim._next_occurrence(5) == 3
+    sim._clear_trace()
+    assert sim._next_occurrence(1) > 3
+
+
+def belady_faults(pages, frames):
+    """暴力求 Belady 最优置换的缺页数：每次淘汰下一次访问最远(或不再访问)的页。"""
+    resident = set()
+    faults = 0
+    for i, p in enumerate(pages):
+        if p in resident:
+            continue
+        faults += 1
+        if len(resident) == frames:
+            def next_use(q):
+                for j in range(i + 1, len(pages)):
+                    if pages[j] == q:
+                        return j
+                return len(pages)
+            resident.remove(max(resident, key=next_use))
+        resident.add(p)
+    return faults
+
+
+def test_opt_matches_brute_force_belady():
+    rng = random.Random(7)
+    for _ in range(60):
+        frames = rng.randint(1, 5)
+        pages = [rng.randrange(rng.randint(2, 10)) for _ in range(rng.randint(1, 60))]
+        expected = belady_faults(pages, frames)
+        fast = PagingSimulation(10, list(range(frames)), POLICY_OPT).run_trace(None, pages, None)
+        assert fast.faults == expected, (pages, frames)
+        results = PagingSimulation(10, list(range(frames)), POLICY_OPT).execute_trace(
+            ["load"] * len(pages), pages, [0] * len(pages))
+        assert sum(loaded is not None for _, _, loaded in results) == expected
+
+
+def test_opt_never_faults_more_than_fifo():
+    rng = random.Random(11)
+    pages = [rng.randrange(12) for _ in range(500)]
+    for frames in range(1, 12):
+        opt = PagingSimulation(12, list(range(frames)), POLICY_OPT).run_trace(None, pages, None)
+        fifo = PagingSimulation(12, list(range(frames)), POLICY_FIFO).run_trace(None, pages, None)
+        assert opt.faults <= fifo.faults
@@ -0,0 +1,19 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_replay_cache_and_profile_do_not_need_paging_package(tmp_path):
+    # 结果缓存和耗时统计在顶层的 simtools 包中，分区模拟不再依赖 dynamicpaging
+    ops = tmp_path / "ops.txt"
+    ops.write_text("allocate 100 best_fit\nallocate 50\ndeallocate 1\n")
+    code = ("import sys\n"
+            "from dynamicparition.cli import main\n"
+            f"main(['replay', {str(ops)!r}, '--cache', {str(tmp_path / 'cache')!r}])\n"
+            f"main(['run', '--ops', '200', '--profile', {str(tmp_path / 'profile.json')!r}])\n"
+            "assert not any(m.startswith('dynamicpaging') for m in sys.modules), sorted(sys.modules)\n")
+    subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True, capture_output=True)
+    assert (tmp_path / "profile.json").exists()
+    assert any((tmp_path / "cache").iterdir())
@@ -0,0 +1,33 @@
+import asyncio
+
+from dynamicparition.memory_manager import MemoryManager
+from simtools.server import SimulationServer
+
+
+def test_max_history_drops_oldest_snapshots():
+    manager = MemoryManager(1024, max_history=3)
+    pids = [manager.allocate(16, "first_fit") for _ in range(10)]
+    assert len(manager.history) == 3
+    assert manager.current_history_index == 2
+    # 仍能撤销到保留的最早快照，再往前则失败
+    assert manager.undo() and manager.undo()
+    assert not manager.undo()
+    assert manager.redo() and manager.redo()
+    assert not manager.redo()
+    assert sorted(manager.allocated_blocks) == pids[:-1]
+
+
+def test_partition_session_history_is_bounded():
+    async def run():
+        server = SimulationServer(max_workers=0, max_history=8)
+        session = server.create_session({"kind": "partition", "memory": 4096})["session"]
+        for _ in range(100):
+            pid = await server.dispatch({"op": "allocate", "session": session, "size": 8,
+                                         "algorithm": "first_fit"})
+            await server.dispatch({"op": "deallocate", "session": session, "pid": pid})
+        await server.dispatch({"op": "batch", "session": session, "ops": [["allocate", 8, "best_fit"]] * 10})
+        return server.sessions[session].engine
+
+    engine = asyncio.run(run())
+    assert len(engine.history) == 8
+    assert engine.current_history_index == 7
@@ -0,0 +1,29 @@
+import importlib
+import sys
+
+from simtools import result_cache
+from dynamicpaging.simulation.paging_simulation import PagingSimulation
+from dynamicpaging.simulation.tlb import TLB
+
+
+def test_engine_version_covers_whole_package(tmp_path, monkeypatch):
+    # 回归：扫描只对 paging_simulation.py 求摘要，改动页表、TLB 等同包模块后仍命中旧结果
+    package = tmp_path / "fakeengine"
+    package.mkdir()
+    (package / "__init__.py").write_text("")
+    (package / "engine.py").write_text("from .helper import VALUE\n\n\nclass Engine:\n    pass\n")
+    (package / "helper.py").write_text("VALUE = 1\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    engine = importlib.import_module("fakeengine.engine")
+    try:
+        before = result_cache.source_version(engine.Engine)
+        (package / "helper.py").write_text("VALUE = 2\n")
+        monkeypatch.setattr(result_cache, "_source_digests", {})
+        assert result_cache.source_version(engine.Engine) != before
+    finally:
+        for name in ("fakeengine", "fakeengine.engine", "fakeengine.helper"):
+            sys.modules.pop(name, None)
+
+
+def test_sweep_and_run_trace_share_engine_version():
+    assert result_cache.source_version(PagingSimulation) == result_cache.source_version(PagingSimulation, TLB(4))
@@ -0,0 +1,68 @@
+import random
+
+import pytest
+
+from dynamicpaging.simulation.page_table import PAGE_TABLE_TYPES
+from dynamicpaging.simulation.paging_simulation import (PagingSimulation, POLICIES, ACCESS_HIT, ACCESS_INVALID,
+                                                        ACCESS_MISS, BLOCK_SIZE)
+from dynamicpaging.simulation.tlb import TLB
+
+
+def random_trace(seed, n=400, num_pages=16):
+    rng = random.Random(seed)
+    ops = [rng.choice(("load", "save")) for _ in range(n)]
+    pages = [rng.randrange(num_pages) for _ in range(n)]
+    offsets = [rng.randrange(BLOCK_SIZE) for _ in range(n)]
+    return ops, pages, offsets
+
+
+def state(sim):
+    return sim.get_page_table_snapshot(), list(sim.fifo_queue), sorted(sim.used_frames), sim.dirty_evictions
+
+
+@pytest.mark.parametrize("policy", POLICIES)
+@pytest.mark.parametrize("page_table_type", PAGE_TABLE_TYPES)
+def test_run_trace_matches_execute(policy, page_table_type):
+    ops, pages, offsets = random_trace(5)
+    frames = [7, 2, 9, 4]
+
+    def make():
+        return PagingSimulation(16, frames, policy, page_table_type=page_table_type, tlb=TLB(4))
+
+    slow = make()
+    results = slow.execute_trace(ops, pages, offsets)
+    fast = make()
+    result = fast.run_trace(ops, pages, offsets)
+
+    for i, (_, replaced, loaded) in enumerate(results):
+        assert result.status[i] == (ACCESS_MISS if loaded is not None else ACCESS_HIT)
+        assert result.victims[i] == (-1 if replaced is None else replaced)
+    assert result.faults == sum(loaded is not None for _, _, loaded in results)
+    assert result.hits + result.faults == len(pages)
+    assert state(fast) == state(slow)
+    assert (fast.tlb.hits, fast.tlb.misses) == (slow.tlb.hits, slow.tlb.misses)
+    # 物理地址 = 帧号 * 页大小 + 页内地址，与页表一致
+    table = {p: frame for p, _, frame, _ in fast.get_page_table_snapshot()}
+    last = len(pages) - 1
+    assert result.phys_addrs[last] == table[pages[last]] * BLOCK_SIZE + offsets[last]
+
+
+def test_run_trace_in_segments_matches_one_run():
+    ops, pages, offsets = random_trace(9)
+    whole = PagingSimulation(16, [0, 1, 2], "FIFO")
+    expected = whole.run_trace(ops, pages, offsets)
+    split = PagingSimulation(16, [0, 1, 2], "FIFO")
+    result = split.run_trace(ops[:150], pages[:150], offsets[:150])
+    result.extend(split.run_trace(ops[150:], pages[150:], offsets[150:]))
+    assert result.status == expected.status and list(result.victims) == list(expected.victims)
+    assert state(split) == state(whole)
+
+
+def test_run_trace_skips_invalid_accesses():
+    sim = PagingSimulation(4, [0, 1], "FIFO")
+    result = sim.run_trace(None, [0, 9, -1, 1, 0], [0, 0, 0, BLOCK_SIZE, 5])
+    assert list(result.status) == [ACCESS_MISS, ACCESS_INVALID, ACCESS_INVALID, ACCESS_INVALID, ACCESS_HIT]
+    assert result.invalid == 3 and result.faults == 1
+    assert result.phys_addrs[1] == -1 and result.phys_addrs[4] == 5
+    with pytest.raises(ValueError):
+        sim.run_trace(["load"], [0, 1], None)
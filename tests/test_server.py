@@ -0,0 +1,89 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from simtools.server import SimulationServer
+
+# 第 3 步的操作名无效，引擎执行到一半时出错
+BAD_PARTITION_OPS = [["allocate", 8, "first_fit"], ["deallocate", 1], ["free", 1]]
+BAD_PAGING_PAGES = [0, 1, 2, 3, 4, "x"]
+
+
+def run_failing_batches(offload_threshold):
+    """两种会话各执行一个出错的 batch，返回 (响应, batch 前的快照, batch 后的快照, 分区引擎, batch 前的历史位置)。"""
+    async def run():
+        server = SimulationServer(max_workers=1, offload_threshold=offload_threshold)
+        try:
+            part = server.create_session({"kind": "partition", "memory": 1024})["session"]
+            await server.dispatch({"op": "allocate", "session": part, "size": 100, "algorithm": "first_fit"})
+            page = server.create_session({"kind": "paging", "num_pages": 8, "frames": [0, 1]})["session"]
+            await server.dispatch({"op": "access", "session": page, "page": 5, "access": "save"})
+            # 快照引用引擎的列表，按服务端的做法立即编码
+            before = [json.dumps(await server.dispatch({"op": "snapshot", "session": s})) for s in (part, page)]
+            engine = server.sessions[part].engine
+            position = (engine.current_history_index, len(engine.history))
+            responses = [
+                await server.handle_line(json.dumps({"op": "batch", "session": part, "ops": BAD_PARTITION_OPS})),
+                await server.handle_line(json.dumps({"op": "batch", "session": page, "pages": BAD_PAGING_PAGES})),
+            ]
+            after = [json.dumps(await server.dispatch({"op": "snapshot", "session": s})) for s in (part, page)]
+            engine = server.sessions[part].engine
+            assert server.offloaded == (2 if offload_threshold == 1 else 0)
+            return responses, before, after, engine, position
+        finally:
+            server.close()
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("offload_threshold", [10 ** 9, 1], ids=["in-loop", "offloaded"])
+def test_failing_batch_leaves_engine_unchanged(offload_threshold):
+    # 回归：在事件循环中执行的 batch 出错时，已执行的操作和保存的历史留在了引擎里；交给进程池时则不会
+    responses, before, after, engine, position = run_failing_batches(offload_threshold)
+    assert [r["ok"] for r in responses] == [False, False]
+    assert after == before
+    assert (engine.current_history_index, len(engine.history)) == position
+
+
+def test_engine_ops_are_checked_against_session_kind():
+    async def run():
+        server = SimulationServer(max_workers=0)
+        page = server.create_session({"kind": "paging", "num_pages": 8, "frames": [0, 1]})["session"]
+        wrong = await server.handle_line(json.dumps({"op": "allocate", "session": page, "size": 8}))
+        unknown = await server.handle_line(json.dumps({"op": "nope"}))
+        return wrong, unknown
+
+    wrong, unknown = asyncio.run(run())
+    assert "只适用于 partition 会话" in wrong["error"]
+    assert "未知的操作 nope" in unknown["error"] and "access" in unknown["error"]
+
+
+def test_server_does_not_import_engines_until_used():
+    # 服务端只依赖 simtools，引擎模块在创建对应会话时才导入
+    code = ("import sys; import simtools.server; "
+            "print(any(m in sys.modules for m in ('dynamicpaging', 'dynamicparition')))")
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                         cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))).stdout
+    assert out.strip() == "False"
+
+
+def test_spawned_loadgen_offloads_large_batches():
+    # 回归：--spawn 启动的服务不用进程池，大 batch 也全在事件循环中执行
+    from simtools.load_client import run_load
+    from simtools.protocol import OFFLOAD_THRESHOLD
+
+    data = asyncio.run(run_load(connections=1, sessions=1, requests=2, batch=OFFLOAD_THRESHOLD, spawn=True,
+                                workers=1))
+    assert data["errors"] == 0
+    assert data["server"]["offloaded_batches"] == 2
+
+
+def test_loadgen_spawns_server_with_workers_by_default():
+    from dynamicpaging.cli import build_parser
+
+    args = build_parser().parse_args(["loadgen", "--spawn"])
+    assert args.workers > 0
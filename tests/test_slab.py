@@ -0,0 +1,56 @@
+import pytest
+
+from dynamicparition.memory_manager import MemoryManager
+from dynamicparition.slab import SlabCache
+
+
+def make_manager(total=1024):
+    return MemoryManager(total, slab=SlabCache((8, 16, 32), slab_size=64))
+
+
+def test_small_requests_share_one_slab():
+    m = make_manager()
+    pids = [m.allocate(5, 'first_fit') for _ in range(8)]
+    slab = m.slab
+    assert len(slab.slabs) == 1
+    assert sorted(m.allocated_blocks[p]['start'] for p in pids) == list(range(0, 64, 8))
+    assert (slab.requests, slab.hits, slab.slabs_created) == (8, 7, 1)
+    assert slab.hit_rate == pytest.approx(7 / 8)
+    # 每个对象按大小类 8 向上取整，多占 3
+    assert slab.internal_waste() == 8 * 3
+    assert slab.free_slot_space() == 0
+    # 第 9 个同类请求切出第二个 slab
+    m.allocate(8, 'first_fit')
+    assert len(slab.slabs) == 2 and slab.free_slot_space() == 56
+
+
+def test_empty_slab_is_returned_to_partition_allocator():
+    m = make_manager()
+    a = m.allocate(16, 'first_fit')
+    b = m.allocate(16, 'first_fit')
+    m.deallocate(a)
+    assert m.free_blocks == [{'start': 64, 'size': 960}]
+    m.deallocate(b)
+    assert m.slab.slabs == {} and m.slab.slabs_released == 1
+    assert m.free_blocks == [{'start': 0, 'size': 1024}]
+
+
+def test_large_requests_and_full_memory_fall_back_to_partitions():
+    m = MemoryManager(64, slab=SlabCache((8, 16, 32), slab_size=64))
+    big = m.allocate(40, 'best_fit')
+    assert m.allocated_blocks[big] == {'start': 0, 'size': 40}
+    # 剩余 24 放不下一个 slab，退回分区分配
+    small = m.allocate(8, 'best_fit')
+    assert m.allocated_blocks[small] == {'start': 40, 'size': 8}
+    assert m.slab.fallbacks == 1 and m.slab.slabs == {}
+
+
+def test_usage_counts_carved_slab_space():
+    # 回归：slab 切出的空间既不算空闲也不算已分配，启用 slab 时使用率偏低
+    m = make_manager(1024)
+    m.allocate(4, 'first_fit')
+    m.allocate(100, 'first_fit')
+    assert m.get_memory_usage() == pytest.approx((64 + 100) / 1024 * 100)
+    assert m.slab.report()["slab_space"] == 64
+    # 碎片率只看空闲分区表：只有一个空闲块时为 0
+    assert m.get_fragmentation() == 0
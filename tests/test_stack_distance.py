@@ -0,0 +1,67 @@
+import csv
+import random
+
+from dynamicpaging.simulation.stack_distance import StackDistanceAnalyzer, compute_stack_distances
+
+
+def lru_stack_distances(pages):
+    """暴力维护 LRU 栈：栈距离为被访问页在栈中的深度(从 1 开始)，首次访问为 -1。"""
+    stack = []
+    distances = []
+    for p in pages:
+        if p in stack:
+            distances.append(stack.index(p) + 1)
+            stack.remove(p)
+        else:
+            distances.append(-1)
+        stack.insert(0, p)
+    return distances
+
+
+def lru_faults(pages, frames):
+    resident = []
+    faults = 0
+    for p in pages:
+        if p in resident:
+            resident.remove(p)
+        else:
+            faults += 1
+            if len(resident) == frames:
+                resident.pop(0)
+        resident.append(p)
+    return faults
+
+
+def random_pages(seed):
+    rng = random.Random(seed)
+    return [rng.randrange(rng.randint(1, 12)) for _ in range(rng.randint(0, 300))]
+
+
+def test_stack_distances_match_brute_force_lru():
+    for seed in range(40):
+        pages = random_pages(seed)
+        assert list(compute_stack_distances(pages)) == lru_stack_distances(pages)
+
+
+def test_fault_counts_match_lru_for_every_frame_count():
+    for seed in range(40):
+        pages = random_pages(seed)
+        analyzer = StackDistanceAnalyzer(pages)
+        distinct = len(set(pages))
+        assert analyzer.distinct_pages == distinct
+        faults = analyzer.fault_counts(distinct + 3)
+        assert faults == [lru_faults(pages, c) for c in range(1, distinct + 4)]
+
+
+def test_miss_ratio_curve_and_csv(tmp_path):
+    pages = [1, 2, 3, 1, 2, 3, 4, 1]
+    analyzer = StackDistanceAnalyzer(pages)
+    curve = analyzer.miss_ratio_curve()
+    assert [c for c, _, _ in curve] == [1, 2, 3, 4]
+    assert curve[-1] == (4, 4, 0.5)
+    path = tmp_path / "mrc.csv"
+    analyzer.export_csv(path)
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == ["frames", "faults", "miss_ratio"]
+    assert [int(r[1]) for r in rows[1:]] == [f for _, f, _ in curve]
@@ -0,0 +1,54 @@
+import pytest
+
+from dynamicpaging.simulation.system_simulation import (SystemPagingSimulation, REPLACE_LOCAL, REPLACE_GLOBAL,
+                                                        ALLOC_FIXED, ALLOC_WORKING_SET, ALLOC_PFF)
+
+
+def check_frames(sim):
+    """物理块记账一致：各作业驻留页的帧互不相同，且与位图中已用的块一致。"""
+    frames = [f for job in sim.jobs.values() for f in job.resident.values()]
+    assert len(frames) == len(set(frames))
+    assert sorted(frames) == [i for i, used in enumerate(sim.frames.used) if used]
+    assert sim.frames.free_count == sim.num_frames - len(frames)
+    for job in sim.jobs.values():
+        assert sorted(job.fifo) == sorted(job.resident)
+
+
+def test_idle_job_without_trace_does_not_hang():
+    # 回归：已 add_job 但没有访问串的作业一直算作活动作业，强制恢复的作业随即又被挂起，run 永不结束
+    sim = SystemPagingSimulation(4, REPLACE_LOCAL, ALLOC_WORKING_SET, ws_window=50, sample_interval=10)
+    sim.add_job("idle", 4)
+    result = sim.run({"a": list(range(10)) * 20})
+    assert result.jobs["a"]["accesses"] == 200
+    assert result.jobs["idle"]["accesses"] == 0
+    assert sim.jobs["idle"].finished
+    check_frames(sim)
+
+
+def test_forced_resume_is_not_suspended_again():
+    # 每个作业的工作集都超过内存，只能轮流强制恢复
+    sim = SystemPagingSimulation(4, REPLACE_LOCAL, ALLOC_WORKING_SET, ws_window=50, sample_interval=10)
+    traces = {job: list(range(8)) * 10 for job in ("a", "b", "c")}
+    result = sim.run(traces)
+    assert result.accesses == 240
+    assert all(j.finished for j in sim.jobs.values())
+    check_frames(sim)
+
+
+def test_all_policies_finish_and_release_frames():
+    for replacement, allocation in ((REPLACE_LOCAL, ALLOC_FIXED), (REPLACE_LOCAL, ALLOC_WORKING_SET),
+                                    (REPLACE_LOCAL, ALLOC_PFF), (REPLACE_GLOBAL, ALLOC_FIXED)):
+        sim = SystemPagingSimulation(6, replacement, allocation, ws_window=20, sample_interval=7, quantum=5)
+        sim.add_job("idle", 3)
+        traces = {job: [(i * (k + 1)) % 9 for i in range(150)] for k, job in enumerate("abc")}
+        result = sim.run(traces)
+        assert result.accesses == 450
+        check_frames(sim)
+        assert sim.frames.free_count == sim.num_frames
+
+
+@pytest.mark.parametrize("allocation", [ALLOC_WORKING_SET, ALLOC_PFF])
+def test_global_replacement_rejects_quota_allocation(allocation):
+    # 全局置换不设额度，工作集和 PFF 在该模式下不起作用，构造时直接拒绝
+    with pytest.raises(ValueError):
+        SystemPagingSimulation(4, REPLACE_GLOBAL, allocation)
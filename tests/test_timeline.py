@@ -0,0 +1,12 @@
+from dynamicpaging.simulation.paging_simulation import PagingSimulation
+from dynamicpaging.simulation.timeline import Timeline
+
+
+def test_record_does_not_modify_caller_lists():
+    # 回归：_as_list 原样返回传入的 list，Timeline.record 截断、追加时改动了调用者的访问串
+    ops, pages, offsets = ["load"] * 4, [0, 1, 2, 3], [0] * 4
+    timeline = Timeline(PagingSimulation(8, [0, 1]), ops, pages, offsets)
+    timeline.seek(2)
+    timeline.record("save", 5, 0)
+    assert (ops, pages, offsets) == (["load"] * 4, [0, 1, 2, 3], [0] * 4)
+    assert timeline.pages == [0, 1, 5]
@@ -0,0 +1,67 @@
+import random
+
+import pytest
+
+from dynamicpaging.simulation.paging_simulation import PagingSimulation
+from dynamicpaging.simulation.tlb import TLB, TLB_RANDOM, effective_access_time
+
+
+def test_lru_evicts_least_recently_used_entry():
+    tlb = TLB(2)
+    tlb.insert(1, 10)
+    tlb.insert(2, 20)
+    assert tlb.lookup(1) == 10
+    tlb.insert(3, 30)
+    assert tlb.lookup(2) is None
+    assert (tlb.lookup(1), tlb.lookup(3)) == (10, 30)
+    assert (tlb.hits, tlb.misses) == (3, 1)
+    assert tlb.hit_rate == 0.75
+
+
+def test_set_associative_mapping_by_page_number():
+    tlb = TLB(4, ways=2)
+    assert tlb.num_sets == 2
+    # 偶数页都落在组 0，组满后互相淘汰，不影响组 1
+    for p in (0, 2, 4):
+        tlb.insert(p, p)
+    tlb.insert(1, 1)
+    assert tlb.lookup(0) is None
+    assert all(tlb.lookup(p) == p for p in (1, 2, 4))
+
+
+def test_random_replacement_keeps_set_within_ways():
+    tlb = TLB(4, ways=4, policy=TLB_RANDOM, seed=3)
+    rng = random.Random(0)
+    for _ in range(1000):
+        p = rng.randrange(16)
+        if tlb.lookup(p) is None:
+            tlb.insert(p, p)
+        if rng.random() < 0.1:
+            tlb.invalidate(rng.randrange(16))
+        tlb_set = tlb.sets[0]
+        assert len(tlb_set) <= 4
+        assert sorted(tlb_set.keys) == sorted(tlb_set.frames)
+        assert all(tlb_set.keys[i] == k for k, i in tlb_set.pos.items())
+
+
+def test_invalid_geometry_is_rejected():
+    with pytest.raises(ValueError):
+        TLB(6, ways=4)
+    with pytest.raises(ValueError):
+        TLB(4, policy="FIFO")
+
+
+def test_evicted_page_is_invalidated_in_simulation():
+    tlb = TLB(8)
+    sim = PagingSimulation(8, [0, 1], tlb=tlb)
+    sim.run_trace(None, [0, 1, 2], None)
+    # 页 0 被淘汰，它的表项随之失效
+    assert tlb.lookup(0) is None
+    assert tlb.lookup(2) == sim.page_table[2].frame
+
+
+def test_effective_access_time():
+    assert effective_access_time(1.0, 0.0) == 101
+    assert effective_access_time(0.0, 0.0) == 201
+    assert effective_access_time(0.5, 0.0, tlb_time=0, memory_time=10) == 15
+    assert effective_access_time(1.0, 1.0, fault_time=1000) == 1000
@@ -0,0 +1,48 @@
+from collections import Counter
+
+import pytest
+
+from dynamicpaging.simulation.paging_simulation import PagingSimulation
+from dynamicpaging.simulation.trace_generator import (GENERATORS, loop_trace, phased_trace, sequential_trace,
+                                                      uniform_trace, zipf_trace)
+
+
+def as_list(pages):
+    return pages.tolist() if hasattr(pages, "tolist") else list(pages)
+
+
+@pytest.mark.parametrize("name", sorted(GENERATORS))
+def test_generators_stay_in_range_and_feed_run_trace(name):
+    args = {"sequential": (1000, 40), "loop": (1000, 40), "phased": (1000, 40, 8, 100)}.get(name, (1000, 40))
+    pages = GENERATORS[name](*args)
+    values = as_list(pages)
+    assert len(values) == 1000
+    assert all(0 <= p < 40 for p in values)
+    result = PagingSimulation(40, list(range(8))).run_trace(None, pages, None)
+    assert result.accesses == 1000 and result.invalid == 0
+
+
+def test_seeded_generators_are_reproducible():
+    assert as_list(uniform_trace(200, 30, seed=4)) == as_list(uniform_trace(200, 30, seed=4))
+    assert as_list(zipf_trace(200, 30, seed=4)) == as_list(zipf_trace(200, 30, seed=4))
+    assert as_list(phased_trace(200, 30, 5, 50, seed=4)) == as_list(phased_trace(200, 30, 5, 50, seed=4))
+
+
+def test_deterministic_patterns():
+    assert as_list(sequential_trace(7, 5, start=3)) == [3, 4, 0, 1, 2, 3, 4]
+    assert as_list(loop_trace(7, 3, base=10)) == [10, 11, 12, 10, 11, 12, 10]
+
+
+def test_zipf_concentrates_on_hot_pages():
+    counts = Counter(as_list(zipf_trace(20000, 100, alpha=1.2, seed=1)))
+    top = sum(c for _, c in counts.most_common(10))
+    assert top > 0.5 * 20000
+
+
+def test_phased_trace_uses_one_working_set_per_phase():
+    values = as_list(phased_trace(1000, 64, 6, 100, seed=2))
+    for start in range(0, 1000, 100):
+        phase = values[start:start + 100]
+        assert max(phase) - min(phase) < 6
+    with pytest.raises(ValueError):
+        phased_trace(10, 4, 5, 2)
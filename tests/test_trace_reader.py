@@ -0,0 +1,63 @@
+import io
+
+import pytest
+
+from dynamicpaging.simulation.paging_simulation import PagingSimulation
+from dynamicpaging.simulation.trace_reader import (TRACE_ADDRESS, TRACE_LACKEY, TRACE_TEXT, iter_trace,
+                                                   iter_trace_batches, run_trace_file)
+
+LACKEY = b"""==1234== Lackey, an example Valgrind tool
+I  04000800,3
+ L 04222cac,8
+ S 7ff000398,8
+ M 0421d2a0,4
+==1234== exit
+"""
+
+
+def test_lackey_maps_modify_to_write():
+    # M(读改写)计为一次写访问，脏页才能被统计
+    trace = list(iter_trace(io.BytesIO(LACKEY), TRACE_LACKEY, page_size=4096))
+    assert trace == [
+        ("load", 0x04000800 // 4096, 0x800),
+        ("load", 0x04222cac // 4096, 0xcac),
+        ("save", 0x7ff000398 // 4096, 0x398),
+        ("save", 0x0421d2a0 // 4096, 0x2a0),
+    ]
+    data = list(iter_trace(io.BytesIO(LACKEY), TRACE_LACKEY, page_size=4096, include_instructions=False))
+    assert [op for op, _, _ in data] == ["load", "save", "save"]
+
+
+def test_address_and_text_formats(tmp_path):
+    path = tmp_path / "addr.txt"
+    path.write_text("# 注释\n0x1004\nsave 2050\n\n")
+    assert list(iter_trace(str(path), TRACE_ADDRESS, page_size=1024)) == [("load", 4, 4), ("save", 2, 2)]
+    assert list(iter_trace(io.BytesIO(b"load 3 7\nsave 1 0"), TRACE_TEXT)) == [("load", 3, 7), ("save", 1, 0)]
+
+
+def test_lines_split_across_chunks():
+    text = b"".join(b"load %d %d\n" % (i % 7, i) for i in range(100))
+    expected = list(iter_trace(io.BytesIO(text), TRACE_TEXT))
+    assert list(iter_trace(io.BytesIO(text), TRACE_TEXT, chunk_size=5)) == expected
+    assert len(expected) == 100
+
+
+def test_malformed_line_reports_line_number():
+    with pytest.raises(ValueError, match="第 2 行"):
+        list(iter_trace(io.BytesIO(b"load 1 0\nload x\n"), TRACE_TEXT))
+    with pytest.raises(ValueError):
+        list(iter_trace(io.BytesIO(b""), "csv"))
+
+
+def test_run_trace_file_matches_one_run(tmp_path):
+    lines = [f"{'save' if i % 3 == 0 else 'load'} {(i * 5) % 11} {i % 100}" for i in range(500)]
+    path = tmp_path / "trace.txt"
+    path.write_text("\n".join(lines))
+    streamed = run_trace_file(PagingSimulation(11, [0, 1, 2]), str(path), batch_size=64)
+    ops, pages, offsets = zip(*(line.split() for line in lines))
+    whole = PagingSimulation(11, [0, 1, 2]).run_trace(list(ops), [int(p) for p in pages],
+                                                       [int(o) for o in offsets])
+    assert streamed.summary() == whole.summary()
+    assert [len(p) for _, p, _ in iter_trace_batches(str(path), batch_size=200)] == [200, 200, 100]
+    with pytest.raises(ValueError):
+        run_trace_file(PagingSimulation(11, [0, 1, 2], "OPT"), str(path))